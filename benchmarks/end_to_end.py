@@ -0,0 +1,168 @@
+"""
+End-to-end benchmark: throughput, latency and DNS queries per email against a local DNS authority and TLS server.
+
+Run from the repository root: python benchmarks/end_to_end.py [--emails N] [--baseline FILE] [--save FILE]
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+from collections import deque
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+from local_services import FakeDNSServer, FakeTLSServer, build_corpus, routed_socket_module
+
+SCENARIOS = ['sequential', 'stream', 'batch', 'async']
+
+
+def _summary(emails: int, seconds: float, latencies: list[float], queries: int) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        'emails': emails,
+        'seconds': round(seconds, 3),
+        'emails_per_sec': round(emails / seconds, 1),
+        'queries_per_email': round(queries / emails, 2),
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        result |= {'p50_ms': round(cuts[49], 2), 'p95_ms': round(cuts[94], 2), 'p99_ms': round(cuts[98], 2)}
+    return result
+
+
+class Bench:  # pylint: disable=too-many-instance-attributes
+    def __init__(self, package: str, args: argparse.Namespace) -> None:
+        self.models = importlib.import_module(f'{package}.models')
+        self.runner = importlib.import_module(f'{package}.runner')
+        self.batch = importlib.import_module(f'{package}.batch')
+        self.server = importlib.import_module(f'{package}.server')
+        self.ssl_module = importlib.import_module(f'{package}.ssl_')
+        self.args = args
+        self.zone, self.emails = build_corpus(args.emails, self.models.DKIM_SELECTORS, seed=args.seed)
+        self.dns = FakeDNSServer(self.zone, slow_ms=args.slow_ms, loss=args.loss, seed=args.seed)
+        self.tls = FakeTLSServer()
+
+    def options(self) -> Any:
+        # A fresh resolver without a cache per scenario, so every run starts cold.
+        resolver = self.dns.resolver(lifetime=self.args.timeout, attempt_timeout=self.args.attempt_timeout)
+        return self.models.ValidationOptions(timeout=self.args.timeout, resolver=resolver)
+
+    def sequential(self, options: Any) -> tuple[int, list[float]]:
+        latencies = []
+        for email in self.emails:
+            start = perf_counter()
+            self.runner.validate_email_and_domain(email, options=options)
+            latencies.append((perf_counter() - start) * 1000)
+        return len(self.emails), latencies
+
+    def stream(self, options: Any) -> tuple[int, list[float]]:
+        # Ordered results follow input order, so each one pairs with the oldest pull time (normalized_email is
+        # None for invalid addresses and may differ from the input).
+        pulled: deque[float] = deque()
+
+        def source() -> Iterator[str]:
+            for email in self.emails:
+                pulled.append(perf_counter())
+                yield email
+
+        latencies = []
+        for _ in self.runner.iter_validate(source(), options=options, window=self.args.concurrency):
+            latencies.append((perf_counter() - pulled.popleft()) * 1000)
+        return len(latencies), latencies
+
+    def batch_run(self, options: Any) -> tuple[int, list[float]]:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / 'emails.txt'
+            input_path.write_text('\n'.join(self.emails) + '\n', encoding='utf-8')
+            written = self.batch.run_batch(input_path, io.BytesIO(), options=options, window=self.args.concurrency)
+        return written, []
+
+    def async_run(self, options: Any) -> tuple[int, list[float]]:
+        latencies: list[float] = []
+
+        async def scenario() -> None:
+            concurrency = self.args.concurrency
+            server = self.server.ValidationServer(port=0, workers=concurrency, queue_size=concurrency * 2)
+            await server.start()
+            pending = iter(self.emails)
+
+            async def client() -> None:
+                for email in pending:
+                    start = perf_counter()
+                    await server.submit(email, options)
+                    latencies.append((perf_counter() - start) * 1000)
+
+            try:
+                await asyncio.gather(*(client() for _ in range(concurrency * 2)))
+            finally:
+                await server.close()
+
+        asyncio.run(scenario())
+        return len(latencies), latencies
+
+    def run(self, scenarios: list[str]) -> dict[str, dict[str, Any]]:
+        runs: dict[str, Callable[[Any], tuple[int, list[float]]]] = {
+            'sequential': self.sequential,
+            'stream': self.stream,
+            'batch': self.batch_run,
+            'async': self.async_run,
+        }
+        self.dns.start()
+        self.tls.start()
+        results: dict[str, dict[str, Any]] = {}
+        try:
+            with patch.object(self.ssl_module, 'socket', routed_socket_module(self.zone, self.tls)):
+                for name in scenarios:
+                    queries_before = self.dns.queries
+                    start = perf_counter()
+                    count, latencies = runs[name](self.options())
+                    seconds = perf_counter() - start
+                    results[name] = _summary(count, seconds, latencies, self.dns.queries - queries_before)
+        finally:
+            self.dns.stop()
+            self.tls.stop()
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--package', default='src', help='Import name of the package (default: src)')
+    parser.add_argument('--emails', type=int, default=400, help='Emails per scenario (default: 400)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Window / workers for concurrent scenarios')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f'Comma-separated subset of {SCENARIOS}')
+    parser.add_argument('--timeout', type=int, default=2, help='Validation timeout in seconds (default: 2)')
+    parser.add_argument('--attempt-timeout', type=float, default=0.2, help='Per-query UDP timeout before a retry')
+    parser.add_argument('--slow-ms', type=float, default=100, help='Answer delay of slow domains (default: 100)')
+    parser.add_argument('--loss', type=float, default=0.3, help='UDP drop rate of lossy domains (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus seed (default: 1)')
+    parser.add_argument('--baseline', type=Path, help='Compare against a previously saved result file')
+    parser.add_argument('--save', type=Path, help='Write results as JSON')
+    args = parser.parse_args()
+
+    scenarios = list(dict.fromkeys(name.strip() for name in args.scenarios.split(',') if name.strip()))
+    if unknown := set(scenarios) - set(SCENARIOS):
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+    # The package is imported from the working directory, like `python -m`.
+    sys.path.insert(0, str(Path.cwd()))
+    results = Bench(args.package, args).run(scenarios)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    for name, result in results.items():
+        line = f'{name:<12} {result["emails_per_sec"]:8.1f} emails/s  {result["queries_per_email"]:6.2f} queries/email'
+        if 'p50_ms' in result:
+            line += f'  p50 {result["p50_ms"]:.1f} / p95 {result["p95_ms"]:.1f} / p99 {result["p99_ms"]:.1f} ms'
+        if name in baseline:
+            line += f'  (baseline {baseline[name]["emails_per_sec"]:.1f} emails/s)'
+        print(line)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
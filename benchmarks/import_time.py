@@ -0,0 +1,79 @@
+"""
+Startup benchmark: import cost of the package entry points, measured with `python -X importtime`.
+
+Run from the repository root: python benchmarks/import_time.py [--repeat N] [--baseline FILE] [--save FILE]
+"""
+
+import argparse
+import json
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+from typing import Any
+
+HEAVY_MODULES = ['dns.resolver', 'email_validator', 'cryptography.x509', 'ssl']
+
+SCENARIOS: dict[str, str] = {
+    'package': 'import {pkg}',
+    'normalize_email': 'from {pkg}.email_validation import normalize_email',
+    'cli': 'from {pkg}.cli import main',
+    'runner_no_ssl_no_dkim': (
+        'from {pkg}.models import ValidationOptions\n'
+        'from {pkg}.runner import validate_email_and_domain\n'
+        'validate_email_and_domain("a@b.co", options=ValidationOptions('
+        'run_mx=False, run_spf=False, run_dmarc=False, run_dkim=False, run_ssl=False))'
+    ),
+}
+
+
+def _measure(code: str) -> tuple[int, list[str]]:
+    probe = f'{code}\nimport sys\nprint(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    proc = subprocess.run(  # nosec B603
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Only top-level imports; nested ones are already part of their parent's cumulative time.
+        if not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return total_us, loaded
+
+
+def run(package: str, repeat: int) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for name, template in SCENARIOS.items():
+        samples = [_measure(template.format(pkg=package)) for _ in range(repeat)]
+        best_us = min(us for us, _ in samples)
+        results[name] = {'import_us': best_us, 'heavy_modules': samples[0][1]}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--package', default='src', help='Import name of the package (default: src)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario; the fastest is kept (default: 5)')
+    parser.add_argument('--baseline', type=Path, help='Compare against a previously saved result file')
+    parser.add_argument('--save', type=Path, help='Write results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.package, args.repeat)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    for name, result in results.items():
+        line = f'{name:<24} {result["import_us"] / 1000:8.1f} ms'
+        if name in baseline:
+            line += f'  (baseline {baseline[name]["import_us"] / 1000:.1f} ms)'
+        heavy = ', '.join(result['heavy_modules']) or '-'
+        print(f'{line}  heavy: {heavy}')
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""
+Local stand-ins for the network used by the benchmarks: a synthetic DNS zone corpus, a UDP/TCP DNS authority
+serving it, and a TLS server with a generated certificate. Nothing here touches the real network.
+"""
+
+import multiprocessing
+import random
+import socket
+import socketserver
+import ssl
+import struct
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+import dns.exception
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.sharedctypes import Synchronized
+
+ZONE_SUFFIX = 'bench-mail.com'
+# Global unicast, so email_validator accepts it as an A fallback; connections are routed to the local TLS server.
+HOST_ADDRESS = '93.184.216.34'
+TTL = 300
+
+# Domain kinds and their share of the corpus.
+KIND_WEIGHTS: dict[str, float] = {
+    'full': 0.55,  # MX, SPF include tree, DMARC, DKIM at a varying selector position
+    'no_dkim': 0.15,  # every selector is tried and misses
+    'nxdomain': 0.10,
+    'slow': 0.10,  # authority answers after a delay
+    'lossy': 0.10,  # authority drops a share of UDP queries
+}
+
+
+def _txt(value: str) -> str:
+    # TXT strings are limited to 255 bytes; longer values are split into several strings.
+    return ' '.join(f'"{value[i : i + 255]}"' for i in range(0, len(value), 255))
+
+
+@dataclass
+class Zone:
+    # (lowercase name without trailing dot, rdtype) -> rdata in presentation format
+    records: dict[tuple[str, str], list[str]] = field(default_factory=dict)
+    # Names that exist (answer NOERROR/NODATA for other types); anything else is NXDOMAIN.
+    names: set[str] = field(default_factory=set)
+    # Registered domain -> 'slow' or 'lossy'
+    behaviour: dict[str, str] = field(default_factory=dict)
+
+    def add(self, name: str, rdtype: str, *rdata: str) -> None:
+        self.records.setdefault((name, rdtype), []).extend(rdata)
+        labels = name.split('.')
+        # Every ancestor of an existing name exists too (empty non-terminals answer NODATA).
+        for i in range(len(labels) - 1):
+            self.names.add('.'.join(labels[i:]))
+
+    def address(self, name: str) -> str | None:
+        records = self.records.get((name.lower().rstrip('.'), 'A'))
+        return records[0] if records else None
+
+
+def _add_domain(
+    zone: Zone, domain: str, rng: random.Random, selectors: Sequence[str], dkim_position: int | None
+) -> None:
+    zone.add(domain, 'A', HOST_ADDRESS)
+    zone.add(domain, 'MX', f'10 mx1.{domain}.', f'20 mx2.{domain}.')
+    zone.add(f'mx1.{domain}', 'A', HOST_ADDRESS)
+    zone.add(f'mx2.{domain}', 'A', HOST_ADDRESS)
+    includes = ' '.join(f'include:_spf{p}.{ZONE_SUFFIX}' for p in rng.sample(range(8), rng.randint(1, 3)))
+    catchall = rng.choice(['-all', '~all', '?all'])
+    zone.add(
+        domain,
+        'TXT',
+        _txt(f'v=spf1 ip4:198.51.100.{rng.randint(1, 254)}/32 {includes} {catchall}'),
+        _txt(f'google-site-verification={rng.getrandbits(128):032x}'),
+    )
+    zone.add(
+        f'_dmarc.{domain}',
+        'TXT',
+        _txt(f'v=DMARC1; p={rng.choice(["none", "quarantine", "reject"])}; rua=mailto:d@{domain}'),
+    )
+    if dkim_position is not None:
+        key = rng.randbytes(180).hex()
+        zone.add(f'{selectors[dkim_position]}._domainkey.{domain}', 'TXT', _txt(f'v=DKIM1; k=rsa; p={key}'))
+
+
+def build_corpus(emails: int, selectors: Sequence[str], seed: int = 1) -> tuple[Zone, list[str]]:
+    """
+    Synthetic zone and address list: about four addresses per domain, domain kinds drawn from KIND_WEIGHTS.
+    """
+    rng = random.Random(seed)
+    zone = Zone()
+    # Shared SPF providers, each with one nested include.
+    for p in range(8):
+        zone.add(
+            f'_spf{p}.{ZONE_SUFFIX}', 'TXT', _txt(f'v=spf1 ip4:203.0.113.{p}/32 include:_spf{p}b.{ZONE_SUFFIX} ~all')
+        )
+        zone.add(f'_spf{p}b.{ZONE_SUFFIX}', 'TXT', _txt(f'v=spf1 ip6:2001:db8::{p:x}/64 -all'))
+
+    positions = [0, 3, 10, 30, len(selectors) - 1]
+    addresses: list[str] = []
+    kinds, weights = zip(*KIND_WEIGHTS.items(), strict=True)
+    for d in range(max(1, emails // 4)):
+        domain = f'd{d:05d}.{ZONE_SUFFIX}'
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'full':
+            _add_domain(zone, domain, rng, selectors, rng.choice(positions))
+        elif kind == 'no_dkim':
+            _add_domain(zone, domain, rng, selectors, None)
+        elif kind in ('slow', 'lossy'):
+            # Early selector: the point is the authority's behaviour, not a long selector scan at its pace.
+            _add_domain(zone, domain, rng, selectors, 0)
+            zone.behaviour[domain] = kind
+        addresses.append(domain)
+    return zone, [f'user{i}@{addresses[i % len(addresses)]}' for i in range(emails)]
+
+
+class _UDPServer(socketserver.ThreadingUDPServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Authority:
+    def __init__(self, zone: Zone, slow_ms: float, loss: float, seed: int, queries: 'Synchronized[int]') -> None:
+        self.zone = zone
+        self.slow_ms = slow_ms
+        self.loss = loss
+        self.queries = queries
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def answer(self, wire: bytes, tcp: bool) -> bytes | None:
+        query = dns.message.from_wire(wire)
+        qname = query.question[0].name
+        name = qname.to_text(omit_final_dot=True).lower()
+        rdtype = dns.rdatatype.to_text(query.question[0].rdtype)
+        behaviour = self.zone.behaviour.get('.'.join(name.split('.')[-3:]))
+        with self.queries.get_lock():
+            self.queries.value += 1
+        with self._lock:
+            dropped = behaviour == 'lossy' and not tcp and self._rng.random() < self.loss
+        if dropped:
+            return None
+        if behaviour == 'slow':
+            time.sleep(self.slow_ms / 1000)
+
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        rdata = self.zone.records.get((name, rdtype))
+        if rdata:
+            response.answer.append(dns.rrset.from_text_list(qname, TTL, 'IN', rdtype, rdata))
+        elif name not in self.zone.names:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        if tcp:
+            return response.to_wire()
+        try:
+            return response.to_wire(max_size=query.payload if query.edns >= 0 else 512)
+        except dns.exception.TooBig:
+            response.answer = []
+            response.flags |= dns.flags.TC
+            return response.to_wire()
+
+    def serve(self, ready: 'Connection') -> None:
+        authority = self
+
+        class UDPHandler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                data, sock = self.request
+                reply = authority.answer(data, tcp=False)
+                if reply is not None:
+                    sock.sendto(reply, self.client_address)
+
+        class TCPHandler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                while header := self.request.recv(2):
+                    (length,) = struct.unpack('!H', header)
+                    data = b''
+                    while len(data) < length:
+                        chunk = self.request.recv(length - len(data))
+                        if not chunk:
+                            return
+                        data += chunk
+                    reply = authority.answer(data, tcp=True)
+                    assert reply is not None
+                    self.request.sendall(struct.pack('!H', len(reply)) + reply)
+
+        udp = _UDPServer(('127.0.0.1', 0), UDPHandler)
+        port = udp.server_address[1]
+        tcp = _TCPServer(('127.0.0.1', port), TCPHandler)
+        threading.Thread(target=tcp.serve_forever, daemon=True).start()
+        ready.send(port)
+        udp.serve_forever()
+
+
+def _serve_dns(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    zone: Zone, slow_ms: float, loss: float, seed: int, queries: 'Synchronized[int]', ready: 'Connection'
+) -> None:
+    _Authority(zone, slow_ms, loss, seed, queries).serve(ready)
+
+
+class FakeDNSServer:
+    """
+    Authoritative DNS for a Zone over UDP and TCP on one loopback port. Oversized UDP answers are truncated,
+    so resolvers retry them over TCP. Runs in a child process so that it does not compete for the GIL
+    with the code being measured.
+    """
+
+    def __init__(self, zone: Zone, slow_ms: float = 100, loss: float = 0.3, seed: int = 1) -> None:
+        self._args = (zone, slow_ms, loss, seed)
+        self._queries = multiprocessing.Value('q', 0)
+        self._process: multiprocessing.Process | None = None
+        self.port = 0
+
+    @property
+    def queries(self) -> int:
+        return int(self._queries.value)
+
+    def start(self) -> None:
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_serve_dns, args=(*self._args, self._queries, sender), daemon=True
+        )
+        self._process.start()
+        self.port = receiver.recv()
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+    def resolver(self, lifetime: float, attempt_timeout: float) -> dns.resolver.Resolver:
+        res = dns.resolver.Resolver(configure=False)
+        res.nameservers = ['127.0.0.1']
+        res.port = self.port
+        res.timeout = attempt_timeout
+        res.lifetime = lifetime
+        return res
+
+
+def _self_signed(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name(
+        [
+            x509.NameAttribute(NameOID.COMMON_NAME, ZONE_SUFFIX),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, 'Benchmark'),
+            x509.NameAttribute(NameOID.COUNTRY_NAME, 'US'),
+        ]
+    )
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=30))
+        .not_valid_after(now + timedelta(days=335))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(f'*.{ZONE_SUFFIX}')]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / 'cert.pem', directory / 'key.pem'
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    return cert_path, key_path
+
+
+class FakeTLSServer:
+    """TLS endpoint on loopback presenting a generated self-signed certificate."""
+
+    def __init__(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        cert_path, key_path = _self_signed(Path(self._tmp.name))
+        self._context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._context.load_cert_chain(cert_path, key_path)
+        self._server: _TCPServer | None = None
+        self.port = 0
+
+    def start(self) -> None:
+        context = self._context
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                try:
+                    with context.wrap_socket(self.request, server_side=True) as tls:
+                        tls.settimeout(5)
+                        tls.recv(1)
+                except OSError:
+                    pass
+
+        self._server = _TCPServer(('127.0.0.1', 0), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._tmp.cleanup()
+
+
+def routed_socket_module(zone: Zone, tls: FakeTLSServer) -> Any:
+    """
+    Stand-in for the `socket` module as seen by the SSL check: names resolve through the zone and every
+    connection to a zone address lands on the local TLS server.
+    """
+
+    def gethostbyname(host: str) -> str:
+        address = zone.address(host)
+        if address is None:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return address
+
+    class RoutedSocket(socket.socket):
+        def connect(self, address: Any) -> None:
+            gethostbyname(address[0])
+            super().connect(('127.0.0.1', tls.port))
+
+    return SimpleNamespace(
+        socket=RoutedSocket,
+        AF_INET=socket.AF_INET,
+        SOCK_STREAM=socket.SOCK_STREAM,
+        gethostbyname=gethostbyname,
+    )
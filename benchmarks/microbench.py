@@ -0,0 +1,201 @@
+"""
+CPU microbenchmarks of the parsing hot paths over realistic corpora, reporting ns/op and peak traced memory per op.
+
+Run from the repository root: python benchmarks/microbench.py [--baseline FILE] [--save FILE] [--fail-over PCT]
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509.oid import NameOID
+
+CORPUS = Path(__file__).parent / 'corpus'
+DEFAULT_BASELINE = Path(__file__).parent / 'microbench_baseline.json'
+
+
+def _lines(name: str) -> list[str]:
+    return [line for line in (CORPUS / name).read_text(encoding='utf-8').splitlines() if line.strip()]
+
+
+def _certificate(key: Any, names: int, *, days: int = 365, organization: bool = True) -> bytes:
+    subject = [x509.NameAttribute(NameOID.COMMON_NAME, 'www.example.com')]
+    if organization:
+        subject.append(x509.NameAttribute(NameOID.ORGANIZATION_NAME, 'Example Inc'))
+    issuer = x509.Name(
+        [
+            x509.NameAttribute(NameOID.COUNTRY_NAME, 'US'),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, 'Example Trust Services'),
+            x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, 'Certification Authority'),
+            x509.NameAttribute(NameOID.COMMON_NAME, 'Example TLS RSA CA G2'),
+        ]
+    )
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name(subject))
+        .issuer_name(issuer)
+        .public_key(key.public_key())
+        .serial_number(0x1F2E3D4C5B6A7988)
+        .not_valid_before(now - timedelta(days=30))
+        .not_valid_after(now + timedelta(days=days))
+    )
+    if names:
+        sans = [x509.DNSName(f'host{i}.example.com') for i in range(names)]
+        builder = builder.add_extension(x509.SubjectAlternativeName(sans), critical=False)
+    return builder.sign(key, hashes.SHA256()).public_bytes(Encoding.DER)
+
+
+def certificate_corpus() -> list[bytes]:
+    # Shapes seen in the wild: a plain DV cert, an OV cert with a long SAN list, an EC cert, an expired one.
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    return [
+        _certificate(rsa_key, 2, organization=False),
+        _certificate(rsa_key, 100),
+        _certificate(ec_key, 5),
+        _certificate(ec_key, 0, days=-1),
+    ]
+
+
+def cases(package: str) -> dict[str, tuple[Callable[[Any], Any], list[Any]]]:
+    """Benchmark name -> (function of one corpus item, corpus)."""
+    # pylint: disable=protected-access
+    spf = importlib.import_module(f'{package}.spf')
+    utils = importlib.import_module(f'{package}.utils')
+    ssl_ = importlib.import_module(f'{package}.ssl_')
+    models = importlib.import_module(f'{package}.models')
+    email_validation = importlib.import_module(f'{package}.email_validation')
+
+    spf_records, dmarc_records, dkim_records = _lines('spf.txt'), _lines('dmarc.txt'), _lines('dkim.txt')
+    policies = (
+        [(r, models.SPF_MARKER) for r in spf_records]
+        + [(r, models.DMARC_MARKER) for r in dmarc_records]
+        + [(r, models.DKIM_MARKER) for r in dkim_records]
+    )
+    result = models.EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email='user@example.com',
+        domain='example.com',
+        mx=models.MXVerificationReport(valid=True, records=['mx1.example.com', 'mx2.example.com']),
+        spf=models.SPFVerificationReport(
+            valid=True,
+            info=models.SPFRecordInfo(
+                record=spf_records[3],
+                catchall=models.CatchAllSecurityLevel.MEDIUM,
+                deprecated_mechanism=False,
+                ip_addresses=True,
+                includes=['_spf.google.com', 'mailgun.org', 'sendgrid.net'],
+            ),
+        ),
+        dmarc=models.DMARCVerificationReport(valid=True, record=dmarc_records[2]),
+        dkim=models.DKIMVerificationReport(valid=True, record=dkim_records[1]),
+        ssl=models.SSLVerificationReport(valid=False, info=None),
+    )
+
+    def cert_info(der: bytes) -> Any:
+        return ssl_._get_cert_info('www.example.com', x509.load_der_x509_certificate(der), '192.0.2.10', 'TLS 1.2')
+
+    return {
+        'spf_check_catchall': (spf._check_catchall, spf_records),
+        'spf_check_ip_addresses': (spf._check_ip_addresses, spf_records),
+        'spf_check_deprecated_mechanism': (spf._check_deprecated_mechanism, spf_records),
+        'is_policy_version_valid': (lambda item: utils._is_policy_version_valid(*item), policies),
+        'ssl_get_cert_info': (cert_info, certificate_corpus()),
+        'normalize_email': (email_validation.normalize_email, _lines('emails.txt')),
+        # Syntax validation itself, bypassing the memo that normalize_email serves repeats from.
+        'normalize_email_uncached': (email_validation._normalize_syntax.__wrapped__, _lines('emails.txt')),
+        'result_to_dict': (lambda item: item.to_dict(), [result]),
+    }
+
+
+def _ns_per_op(fn: Callable[[Any], Any], corpus: list[Any], repeat: int) -> float:
+    def over_corpus() -> None:
+        for item in corpus:
+            fn(item)
+
+    timer = timeit.Timer(over_corpus)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=loops))
+    return best / loops / len(corpus) * 1e9
+
+
+def _peak_bytes_per_op(fn: Callable[[Any], Any], corpus: list[Any]) -> float:
+    # Peak traced memory above the starting point while the op runs, averaged over the corpus. This stands in for
+    # an allocation count: the stdlib has no cumulative allocation counter, and block-count deltas only see what the
+    # op keeps alive.
+    fn(corpus[0])
+    total = 0
+    tracemalloc.start()
+    try:
+        for item in corpus:
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            fn(item)
+            total += tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return total / len(corpus)
+
+
+def run(package: str, repeat: int, only: set[str] | None = None) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for name, (fn, corpus) in cases(package).items():
+        if only and name not in only:
+            continue
+        results[name] = {
+            'ns_per_op': round(_ns_per_op(fn, corpus, repeat)),
+            'peak_bytes_per_op': round(_peak_bytes_per_op(fn, corpus)),
+            'corpus': len(corpus),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--package', default='src', help='Import name of the package (default: src)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per case; the fastest is kept (default: 5)')
+    parser.add_argument('--only', help='Comma-separated case names to run')
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f'Result file to compare against (default: {DEFAULT_BASELINE.name})',
+    )
+    parser.add_argument('--save', type=Path, help='Write results as JSON (e.g. to update the baseline)')
+    parser.add_argument('--fail-over', type=float, help='Exit with status 1 if any case is slower by more than PCT')
+    args = parser.parse_args()
+
+    # The package is imported from the working directory, like `python -m`.
+    sys.path.insert(0, str(Path.cwd()))
+    only = {name.strip() for name in args.only.split(',')} if args.only else None
+    results = run(args.package, args.repeat, only)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline and args.baseline.exists() else {}
+    regressed = []
+    for name, result in results.items():
+        line = f'{name:<32} {result["ns_per_op"]:>10,} ns/op {result["peak_bytes_per_op"]:>9,} peak B/op'
+        if name in baseline:
+            change = (result['ns_per_op'] / baseline[name]['ns_per_op'] - 1) * 100
+            line += f'  {change:+6.1f}% vs baseline'
+            if args.fail_over is not None and change > args.fail_over:
+                regressed.append(name)
+        print(line)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+    if regressed:
+        sys.exit(f'Slower than baseline by more than {args.fail_over}%: {", ".join(regressed)}')
+
+
+if __name__ == '__main__':
+    main()
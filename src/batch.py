@@ -0,0 +1,128 @@
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import IO
+
+from .cache import DomainReportCache
+from .email_validation import canonical_domain
+from .exceptions import CheckpointError
+from .models import EmailDomainValidationResult, ValidationOptions
+from .pipeline import BUILTIN_CHECKS
+from .runner import iter_validate
+
+
+@dataclass
+class BatchCheckpoint:
+    input: str
+    # Non-empty input lines whose results are durably written.
+    records_done: int = 0
+    # Output size covering exactly those results; anything past it is a partial write and is truncated.
+    output_bytes: int = 0
+    complete: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> 'BatchCheckpoint':
+        try:
+            return cls(**json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, TypeError, json.JSONDecodeError) as e:
+            raise CheckpointError(f'Cannot read checkpoint: {path}') from e
+
+    def save(self, path: Path) -> None:
+        # Write-then-rename so a crash never leaves a torn checkpoint behind.
+        tmp = path.with_name(f'{path.name}.tmp')
+        tmp.write_text(json.dumps(asdict(self)), encoding='utf-8')
+        os.replace(tmp, path)
+
+
+def _read_emails(lines: IO[str], skip: int) -> Iterator[str]:
+    seen = 0
+    for line in lines:
+        email = line.strip()
+        if not email:
+            continue
+        seen += 1
+        if seen > skip:
+            yield email
+
+
+def _seed_domain_cache(output: IO[bytes], limit: int, options: ValidationOptions) -> None:
+    # Reports of a previous run are reused only for checks it actually ran against the domain and that succeeded:
+    # a timeout or missing record is checked again rather than carried to every later email of the domain.
+    assert options.domain_cache is not None
+    output.seek(0)
+    remaining = limit
+    # Line by line, so that resuming a long run never holds its whole output in memory.
+    while remaining > 0 and (line := output.readline(remaining)):
+        remaining -= len(line)
+        result = EmailDomainValidationResult.from_dict(json.loads(line))
+        for check in BUILTIN_CHECKS:
+            if not check.per_domain or not getattr(options, str(check.option)):
+                continue
+            report = getattr(result, check.name)
+            if report.valid:
+                options.domain_cache.put(check.name, canonical_domain(result.domain), report)
+
+
+def _sync(output: IO[bytes]) -> None:
+    output.flush()
+    if not output.seekable():
+        return
+    try:
+        fd = output.fileno()
+    except OSError:
+        # In-memory buffers have no descriptor and nothing to make durable.
+        return
+    os.fsync(fd)
+
+
+def run_batch(  # pylint: disable=too-many-arguments
+    input_path: Path,
+    output: IO[bytes],
+    *,
+    options: ValidationOptions | None = None,
+    window: int = 16,
+    checkpoint_path: Path | None = None,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+) -> int:
+    """
+    Validate one email per input line and write NDJSON results in input order. Returns the number written.
+    With a checkpoint the output must be a seekable file; on resume it is truncated to the last checkpoint,
+    the already-written lines are skipped, and their domain reports pre-fill the domain cache.
+    """
+    if checkpoint_every < 1:
+        raise ValueError(f'checkpoint_every must be at least 1, got {checkpoint_every}')
+    opts = replace(options or ValidationOptions())
+    if opts.domain_cache is None:
+        opts.domain_cache = DomainReportCache()
+
+    checkpoint = BatchCheckpoint(input=str(input_path))
+    if checkpoint_path is not None and resume and checkpoint_path.exists():
+        checkpoint = BatchCheckpoint.load(checkpoint_path)
+        if checkpoint.input != str(input_path):
+            raise CheckpointError(f'Checkpoint belongs to a different input: {checkpoint.input}')
+        _seed_domain_cache(output, checkpoint.output_bytes, opts)
+    if checkpoint_path is not None:
+        output.seek(checkpoint.output_bytes)
+        output.truncate()
+
+    base, written = checkpoint.records_done, 0
+    with open(input_path, encoding='utf-8') as lines:
+        for result in iter_validate(_read_emails(lines, base), options=opts, window=window):
+            output.write(json.dumps(result.to_dict()).encode('utf-8') + b'\n')
+            written += 1
+            if checkpoint_path is not None and written % checkpoint_every == 0:
+                _sync(output)
+                checkpoint.records_done = base + written
+                checkpoint.output_bytes = output.tell()
+                checkpoint.save(checkpoint_path)
+
+    _sync(output)
+    if checkpoint_path is not None:
+        checkpoint.records_done = base + written
+        checkpoint.output_bytes = output.tell()
+        checkpoint.complete = True
+        checkpoint.save(checkpoint_path)
+    return written
@@ -0,0 +1,55 @@
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import ClassVar
+
+from .domain_index import DomainIndex, write_domain_index
+from .email_validation import canonical_domain
+from .exceptions import BlocklistError, DomainIndexError
+
+
+def _read_domains(lines: Iterable[str]) -> Iterator[str]:
+    # Plain-text lists: one domain per line, '#' comments; a leading '*.' or '.' is dropped, since every entry
+    # also matches its subdomains.
+    for line in lines:
+        entry = line.partition('#')[0].strip()
+        if entry:
+            yield canonical_domain(entry.split()[0].removeprefix('*.').lstrip('.'))
+
+
+def build_blocklist_index(sources: Iterable[Path], output: Path) -> int:
+    """Build an index for BlocklistIndex from plain-text domain lists. Returns the number of distinct entries."""
+    domains: set[str] = set()
+    try:
+        for source in sources:
+            with open(source, encoding='utf-8') as lines:
+                domains.update(domain for domain in _read_domains(lines) if domain)
+    except (OSError, UnicodeDecodeError) as e:
+        raise BlocklistError(f'Cannot read domain list: {e}') from e
+    return write_domain_index(domains, output, BlocklistIndex.MAGIC)
+
+
+class BlocklistIndex(DomainIndex):
+    """
+    Memory-mapped domain index built by build_blocklist_index() (see DomainIndex). A domain is listed when it or
+    one of its parent domains is an entry.
+    """
+
+    MAGIC: ClassVar[bytes] = b'EDVBLK01'
+
+    def __init__(self, path: Path) -> None:
+        try:
+            super().__init__(path)
+        except DomainIndexError as e:
+            raise BlocklistError(f'Invalid blocklist index: {e}') from e
+
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+
+    def match(self, domain: str) -> str | None:
+        """The most specific entry that is `domain` or one of its parent domains, or None."""
+        labels = canonical_domain(domain).split('.')
+        for start in range(len(labels)):
+            candidate = '.'.join(labels[start:])
+            if self.find(candidate):
+                return candidate
+        return None
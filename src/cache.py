@@ -0,0 +1,87 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+
+class DomainReportCache:
+    """
+    Thread-safe LRU of per-domain check reports, keyed by (check name, domain).
+    Concurrent lookups of the same key share one computation instead of querying the domain twice.
+    Cached reports are shared between results and must be treated as read-only.
+    With `max_age` (seconds), entries expire that long after they are stored, or when their report's DNS TTL runs
+    out if sooner; long-lived processes set it so that reports are re-checked. Without it entries stay until evicted.
+    """
+
+    def __init__(self, max_entries: int = 100_000, max_age: float | None = None) -> None:
+        self._max_entries = max_entries
+        self._max_age = max_age
+        # Key -> (report, monotonic expiry time; inf without max_age).
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, float]] = OrderedDict()
+        self._in_flight: dict[tuple[str, str], Future[Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, check: str, domain: str) -> Any | None:
+        with self._lock:
+            return self._lookup((check, domain))
+
+    def put(self, check: str, domain: str, report: Any) -> None:
+        with self._lock:
+            self._store((check, domain), report)
+
+    def get_or_compute(self, check: str, domain: str, compute: Callable[[], Any]) -> Any:
+        key = (check, domain)
+        with self._lock:
+            report = self._lookup(key)
+            if report is not None:
+                return report
+            waiting = self._in_flight.get(key)
+            if waiting is None:
+                self.misses += 1
+                owner: Future[Any] = Future()
+                self._in_flight[key] = owner
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            report = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            owner.set_exception(e)
+            raise
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self._store(key, report)
+        owner.set_result(report)
+        return report
+
+    def _lookup(self, key: tuple[str, str]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        report, expires = entry
+        if self._max_age is not None and expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return report
+
+    def _store(self, key: tuple[str, str], report: Any) -> None:
+        expires = math.inf
+        if self._max_age is not None:
+            ttl = getattr(report, 'ttl', None)
+            expires = time.monotonic() + (self._max_age if ttl is None else min(self._max_age, ttl))
+        self._entries[key] = (report, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -1,30 +1,298 @@
 import argparse
 import json
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING
 
+from .exceptions import BlocklistError, CheckpointError, RecordingError, SelectorStatsError
 from .models import ValidationOptions
+from .pipeline import POLICIES
 from .runner import validate_email_and_domain
 
+if TYPE_CHECKING:
+    from dns.resolver import Resolver
+
+    from .blocklist import BlocklistIndex
+    from .profiling import Profiler
+    from .selector_stats import SelectorStats
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'not an integer: {value!r}') from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1: {number}')
+    return number
+
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog='email-domain-validator',
         description='Validate an email address and its domain (MX, SPF, DMARC, DKIM, SSL).',
     )
-    parser.add_argument('email', help='Email address to validate')
+    parser.add_argument('email', nargs='?', help='Email address to validate')
     parser.add_argument('--timeout', type=int, default=5, help='Timeout in seconds for DNS/SSL lookups (default: 5)')
     parser.add_argument('--no-mx', action='store_true', help='Skip MX record check')
     parser.add_argument('--no-spf', action='store_true', help='Skip SPF record check')
     parser.add_argument('--no-dmarc', action='store_true', help='Skip DMARC record check')
     parser.add_argument('--no-dkim', action='store_true', help='Skip DKIM record check')
     parser.add_argument('--no-ssl', action='store_true', help='Skip SSL certificate check')
+    parser.add_argument(
+        '--policy',
+        choices=list(POLICIES),
+        default='full',
+        help='Skip checks after failed signals: syntax, tiered (DKIM/SSL need valid MX), fail_fast (default: full)',
+    )
     parser.add_argument('--compact', action='store_true', help='Print compact JSON (no indentation)')
+    parser.add_argument(
+        '--dkim-stats', type=Path, help='Learn the DKIM selector order across runs: load and update this file'
+    )
+    parser.add_argument(
+        '--blocklist', type=Path, help='Skip DNS checks for domains in this index (see build-blocklist)'
+    )
+    dns_group = parser.add_argument_group('DNS record/replay')
+    recording = dns_group.add_mutually_exclusive_group()
+    recording.add_argument('--record-dns', type=Path, help='Record every DNS answer, error and latency to this file')
+    recording.add_argument('--replay-dns', type=Path, help='Answer DNS queries from a --record-dns file, offline')
+    dns_group.add_argument('--replay-latency', action='store_true', help='Delay replayed answers by recorded latency')
+    profiling = parser.add_argument_group('profiling')
+    profiling.add_argument(
+        '--profile', action='store_true', help='Print time per stage (and per query, TLS step) to stderr'
+    )
+    profiling.add_argument('--profile-json', type=Path, help='Write the per-stage breakdown as JSON to this file')
+    profiling.add_argument(
+        '--pstats', type=Path, help='Write a cProfile dump (pstats format) of the main thread only to this file'
+    )
+    batch = parser.add_argument_group('batch')
+    batch.add_argument('--input', type=Path, help='Validate one email per line of this file (NDJSON output)')
+    batch.add_argument('--output', type=Path, help='Write NDJSON results to this file instead of stdout')
+    batch.add_argument('--concurrency', type=int, default=16, help='Validations in flight (default: 16)')
+    batch.add_argument('--checkpoint', type=Path, help='Record progress in this file (requires --output)')
+    batch.add_argument('--resume', action='store_true', help='Continue from --checkpoint after an interruption')
+    batch.add_argument(
+        '--checkpoint-every', type=_positive_int, default=100, help='Results per checkpoint (default: 100)'
+    )
+    revalidation = parser.add_argument_group('revalidation')
+    revalidation.add_argument(
+        '--revalidate', type=Path, help='Re-run only the expired checks of this previous NDJSON output'
+    )
+    revalidation.add_argument('--diff', type=Path, help='Write what changed per domain to this file as NDJSON')
+    revalidation.add_argument(
+        '--max-age-days', type=float, default=30, help='Age at which a report is re-checked (default: 30)'
+    )
+    revalidation.add_argument(
+        '--cert-margin-days', type=int, default=14, help='Re-check certificates expiring within N days (default: 14)'
+    )
+    revalidation.add_argument('--honor-ttl', action='store_true', help='Also re-check reports whose DNS TTL expired')
+    return parser
+
+
+def _run_batch(args: argparse.Namespace, options: ValidationOptions) -> None:
+    from .batch import run_batch  # pylint: disable=import-outside-toplevel
+
+    if args.checkpoint is None:
+        with open(args.output, 'wb') if args.output else nullcontext(sys.stdout.buffer) as output:
+            run_batch(args.input, output, options=options, window=args.concurrency)
+        return
+    mode = 'r+b' if args.resume and args.output.exists() else 'w+b'
+    with open(args.output, mode) as output:
+        run_batch(
+            args.input,
+            output,
+            options=options,
+            window=args.concurrency,
+            checkpoint_path=args.checkpoint,
+            resume=args.resume,
+            checkpoint_every=args.checkpoint_every,
+        )
+
+
+def _run_revalidation(args: argparse.Namespace, options: ValidationOptions) -> None:
+    from .revalidate import DAY, run_revalidation  # pylint: disable=import-outside-toplevel
+
+    max_age = dict.fromkeys(('mx', 'spf', 'dmarc', 'dkim', 'ssl'), args.max_age_days * DAY)
+    with (
+        open(args.output, 'wb') if args.output else nullcontext(sys.stdout.buffer) as output,
+        open(args.diff, 'wb') if args.diff else nullcontext() as diff,
+    ):
+        summary = run_revalidation(
+            args.revalidate,
+            output,
+            diff=diff,
+            options=options,
+            window=args.concurrency,
+            max_age=max_age,
+            cert_margin_days=args.cert_margin_days,
+            honor_ttl=args.honor_ttl,
+        )
+    rechecked = ', '.join(f'{name}={count}' for name, count in summary.rechecked.items()) or 'none'
+    sys.stderr.write(
+        f'revalidated {summary.results} results; rechecked: {rechecked}; changed domains: {summary.changed_domains}\n'
+    )
+
+
+def _dns_resolver(args: argparse.Namespace) -> 'Resolver | None':
+    if args.record_dns is None and args.replay_dns is None:
+        return None
+    from .replay import RecordingResolver, ReplayResolver  # pylint: disable=import-outside-toplevel
+
+    if args.replay_dns is not None:
+        return ReplayResolver(args.replay_dns, latency=args.replay_latency)
+    return RecordingResolver()
+
+
+def _save_recording(resolver: 'Resolver | None', path: Path) -> None:
+    from .replay import RecordingResolver  # pylint: disable=import-outside-toplevel
+
+    assert isinstance(resolver, RecordingResolver)
+    resolver.save(path)
+
+
+def _selector_stats(path: Path | None) -> 'SelectorStats | None':
+    if path is None:
+        return None
+    from .selector_stats import SelectorStats  # pylint: disable=import-outside-toplevel
+
+    return SelectorStats.load(path) if path.exists() else SelectorStats()
+
+
+def _blocklist(path: Path | None) -> 'BlocklistIndex | None':
+    if path is None:
+        return None
+    from .blocklist import BlocklistIndex  # pylint: disable=import-outside-toplevel
+
+    return BlocklistIndex(path)
+
+
+def _profiler(args: argparse.Namespace) -> 'Profiler | None':
+    if not args.profile and args.profile_json is None:
+        return None
+    from .profiling import Profiler  # pylint: disable=import-outside-toplevel
+
+    return Profiler()
+
+
+def _report_profile(profiler: 'Profiler', args: argparse.Namespace) -> None:
+    if args.profile:
+        sys.stderr.write(profiler.render())
+    if args.profile_json is not None:
+        args.profile_json.write_text(json.dumps(profiler.snapshot(), indent=2) + '\n', encoding='utf-8')
+
+
+@contextmanager
+def _cprofile(path: Path | None) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+    import cProfile  # pylint: disable=import-outside-toplevel
+
+    # cProfile profiles the thread that enables it: the dump covers the main thread only, not the check and batch
+    # worker threads, whose time is in the per-stage breakdown of --profile.
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+
+
+def _build_serve_parser() -> argparse.ArgumentParser:
+    # The server (asyncio, dnspython) is imported only for `serve` to keep one-shot runs fast to start.
+    from .server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_REPORT_MAX_AGE  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(
+        prog='email-domain-validator serve',
+        description='Serve validations over HTTP (POST /validate, POST /batch) with warm DNS caches.',
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to bind (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent validations (default: 8)')
+    parser.add_argument(
+        '--queue-size', type=int, default=64, help='Queued validations before backpressure (default: 64)'
+    )
+    parser.add_argument('--timeout', type=int, default=5, help='Default DNS/SSL timeout in seconds (default: 5)')
+    parser.add_argument('--cache-size', type=int, default=100_000, help='DNS cache entries (default: 100000)')
+    parser.add_argument(
+        '--report-max-age',
+        type=float,
+        default=DEFAULT_REPORT_MAX_AGE,
+        help=f"Seconds a domain's reports are reused across requests, at most their DNS TTL "
+        f'(default: {DEFAULT_REPORT_MAX_AGE})',
+    )
     return parser
 
 
+def _serve(argv: list[str]) -> None:
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    from .server import serve  # pylint: disable=import-outside-toplevel
+
+    args = _build_serve_parser().parse_args(argv)
+    try:
+        asyncio.run(
+            serve(
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                queue_size=args.queue_size,
+                timeout=args.timeout,
+                cache_size=args.cache_size,
+                report_max_age=args.report_max_age,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def _build_blocklist(argv: list[str]) -> None:
+    from .blocklist import build_blocklist_index  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(
+        prog='email-domain-validator build-blocklist',
+        description='Build a memory-mapped domain index for --blocklist from plain-text lists (one domain per line).',
+    )
+    parser.add_argument('output', type=Path, help='Index file to write')
+    parser.add_argument('lists', type=Path, nargs='+', help='Domain lists; "#" starts a comment')
+    args = parser.parse_args(argv)
+    try:
+        count = build_blocklist_index(args.lists, args.output)
+    except BlocklistError as e:
+        parser.exit(1, f'{parser.prog}: error: {e}\n')
+    sys.stderr.write(f'indexed {count} domains into {args.output}\n')
+
+
+def _check_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if [args.email, args.input, args.revalidate].count(None) != 2:
+        parser.error('provide either an email, --input or --revalidate')
+    if args.revalidate is not None and args.checkpoint is not None:
+        parser.error('--checkpoint is not supported with --revalidate')
+    if args.diff is not None and args.revalidate is None:
+        parser.error('--diff requires --revalidate')
+    if args.checkpoint is not None and args.output is None:
+        parser.error('--checkpoint requires --output')
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume requires --checkpoint')
+    if args.replay_latency and args.replay_dns is None:
+        parser.error('--replay-latency requires --replay-dns')
+
+
 def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['serve']:
+        _serve(argv[1:])
+        return
+    if argv[:1] == ['build-blocklist']:
+        _build_blocklist(argv[1:])
+        return
+
     parser = _build_parser()
     args = parser.parse_args(argv)
+    _check_args(parser, args)
 
     options = ValidationOptions(
         timeout=args.timeout,
@@ -33,9 +301,39 @@ def main(argv: list[str] | None = None) -> None:
         run_dmarc=not args.no_dmarc,
         run_dkim=not args.no_dkim,
         run_ssl=not args.no_ssl,
+        policy=args.policy,
     )
+    try:
+        options.resolver = _dns_resolver(args)
+        options.dkim_selector_stats = _selector_stats(args.dkim_stats)
+        options.blocklist = _blocklist(args.blocklist)
+    except (RecordingError, SelectorStatsError, BlocklistError) as e:
+        parser.exit(1, f'{parser.prog}: error: {e}\n')
+
+    # One profiler for the whole run, so batch mode reports the breakdown aggregated over all inputs.
+    profiler = _profiler(args)
+    options.hooks = profiler
 
-    result = validate_email_and_domain(args.email, options=options)
+    try:
+        with _cprofile(args.pstats):
+            if args.input is not None:
+                try:
+                    _run_batch(args, options)
+                except CheckpointError as e:
+                    parser.exit(1, f'{parser.prog}: error: {e}\n')
+                return
+            if args.revalidate is not None:
+                _run_revalidation(args, options)
+                return
+            result = validate_email_and_domain(args.email, options=options)
+    finally:
+        if args.record_dns is not None:
+            # Saved even after an interruption, so a partial run still yields a usable recording.
+            _save_recording(options.resolver, args.record_dns)
+        if profiler is not None:
+            _report_profile(profiler, args)
+        if options.dkim_selector_stats is not None:
+            options.dkim_selector_stats.save(args.dkim_stats)
 
     indent = None if args.compact else 2
     json.dump(result.to_dict(), sys.stdout, indent=indent)
@@ -0,0 +1,318 @@
+import csv
+import json
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, fields, replace
+from typing import IO, Any
+
+from .models import (
+    CatchAllSecurityLevel,
+    CheckStats,
+    DKIMKeyInfo,
+    DKIMVerificationReport,
+    DMARCRecordInfo,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFRecordInfo,
+    SPFVerificationReport,
+    SSLCertInfo,
+    SSLVerificationReport,
+)
+
+_REPORT_TYPES: dict[str, type] = {
+    'mx': MXVerificationReport,
+    'spf': SPFVerificationReport,
+    'dmarc': DMARCVerificationReport,
+    'dkim': DKIMVerificationReport,
+    'ssl': SSLVerificationReport,
+}
+REPORTS = tuple(_REPORT_TYPES)
+# Per-row report fields (SSL reports carry no DNS TTL). They are kept in float columns, NaN for None, so that
+# reports differing only in when they were fetched are still stored once.
+_STAMPS = {
+    name: tuple(f.name for f in fields(t) if f.name in ('fetched_at', 'ttl')) for name, t in _REPORT_TYPES.items()
+}
+_STATS_FIELDS = tuple(f.name for f in fields(CheckStats))
+# Bit 0 is email_valid, bits 1-5 the valid flag of each report, bit 6 marks rows with stats.
+_EMAIL_BIT = 1
+_REPORT_BITS = {name: 1 << i for i, name in enumerate(REPORTS, start=1)}
+_STATS_BIT = 1 << (len(REPORTS) + 1)
+
+CSV_COLUMNS = (
+    'email_valid',
+    'normalized_email',
+    'domain',
+    'skipped',
+    'mx_valid',
+    'mx_fetched_at',
+    'mx_ttl',
+    'mx_records',
+    'spf_valid',
+    'spf_fetched_at',
+    'spf_ttl',
+    *(f'spf_{f.name}' for f in fields(SPFRecordInfo)),
+    'dmarc_valid',
+    'dmarc_fetched_at',
+    'dmarc_ttl',
+    'dmarc_record',
+    'dmarc_org_domain',
+    *(f'dmarc_{f.name}' for f in fields(DMARCRecordInfo)),
+    'dkim_valid',
+    'dkim_fetched_at',
+    'dkim_ttl',
+    'dkim_record',
+    *(f'dkim_{f.name}' for f in fields(DKIMKeyInfo)),
+    'ssl_valid',
+    'ssl_fetched_at',
+    *(f'ssl_{f.name}' for f in fields(SSLCertInfo)),
+)
+
+
+# Report type -> the type of its `info`, flattened into one CSV column per field.
+_INFO_TYPES: dict[type, type] = {
+    SPFVerificationReport: SPFRecordInfo,
+    DMARCVerificationReport: DMARCRecordInfo,
+    DKIMVerificationReport: DKIMKeyInfo,
+    SSLVerificationReport: SSLCertInfo,
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ' '.join(value)
+    return value.value if isinstance(value, CatchAllSecurityLevel) else value
+
+
+class _StringPool:
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def add(self, value: str | None) -> int:
+        if value is None:
+            return -1
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def get(self, index: int) -> str | None:
+        return None if index < 0 else self.values[index]
+
+
+class _ReportPool:  # pylint: disable=too-many-instance-attributes
+    """
+    One report column: each distinct report value is stored once, found through its JSON without the stamps, and
+    every row keeps an index into the stored reports plus its own stamps.
+    """
+
+    def __init__(self, stamps: tuple[str, ...]) -> None:
+        self.stamps = stamps
+        self.reports: list[Any] = []
+        self.index = array('q')
+        self._columns = {stamp: array('d') for stamp in stamps}
+        # Stamp-free JSON of each stored report, without the closing brace; the rows' stamps are appended to it.
+        self._json: list[str] = []
+        self._by_json: dict[str, int] = {}
+        self._csv: dict[int, tuple[Any, list[Any]]] = {}
+        # The last report added per domain: rows sharing one report object (domain cache) skip the JSON lookup.
+        self._last: dict[int, tuple[Any, int]] = {}
+
+    def append(self, domain: int, report: Any) -> None:
+        for stamp in self.stamps:
+            value = getattr(report, stamp)
+            self._columns[stamp].append(math.nan if value is None else value)
+        last = self._last.get(domain)
+        if last is not None and last[0] is report:
+            self.index.append(last[1])
+            return
+        data = asdict(report)
+        for stamp in self.stamps:
+            del data[stamp]
+        text = json.dumps(data)[:-1]
+        index = self._by_json.get(text)
+        if index is None:
+            index = self._by_json[text] = len(self.reports)
+            self.reports.append(replace(report, **dict.fromkeys(self.stamps)))
+            self._json.append(text)
+        self._last[domain] = (report, index)
+        self.index.append(index)
+
+    def get(self, row: int) -> Any:
+        report = self.reports[self.index[row]]
+        stamps = {stamp: self._stamp(stamp, row) for stamp in self.stamps}
+        if all(value is None for value in stamps.values()):
+            return report
+        return replace(report, **stamps)
+
+    def json(self, row: int) -> str:
+        stamps = ''.join(f', "{stamp}": {json.dumps(self._stamp(stamp, row))}' for stamp in self.stamps)
+        return f'{self._json[self.index[row]]}{stamps}}}'
+
+    def csv(self, row: int) -> list[Any]:
+        index = self.index[row]
+        cells = self._csv.get(index)
+        if cells is None:
+            cells = self._csv[index] = self._csv_cells(self.reports[index])
+        valid, rest = cells
+        return [valid, *(_csv_value(self._stamp(stamp, row)) for stamp in self.stamps), *rest]
+
+    def _stamp(self, stamp: str, row: int) -> float | None:
+        value = self._columns[stamp][row]
+        if math.isnan(value):
+            return None
+        # TTLs are whole seconds.
+        return int(value) if stamp == 'ttl' else value
+
+    @staticmethod
+    def _csv_cells(report: Any) -> tuple[Any, list[Any]]:
+        if isinstance(report, MXVerificationReport):
+            return report.valid, [_csv_value(report.records)]
+        rest: list[Any] = []
+        if isinstance(report, DMARCVerificationReport):
+            rest += [_csv_value(report.record), _csv_value(report.org_domain)]
+        elif isinstance(report, DKIMVerificationReport):
+            rest.append(_csv_value(report.record))
+        info = report.info
+        rest += [_csv_value(getattr(info, f.name)) if info else '' for f in fields(_INFO_TYPES[type(report)])]
+        return report.valid, rest
+
+
+class ResultTable:  # pylint: disable=too-many-instance-attributes
+    """
+    Column-wise store for large numbers of validation results: interned strings, one flag byte per row, reports
+    stored once per distinct value with per-row fetch stamps, and array-backed stats. Rows are read back as
+    EmailDomainValidationResult views whose reports may be shared between rows and must be treated as read-only.
+    """
+
+    def __init__(self, results: Iterable[EmailDomainValidationResult] = ()) -> None:
+        self._strings = _StringPool()
+        self._normalized_email = array('q')
+        self._domain = array('q')
+        self._flags = bytearray()
+        self._reports = {name: _ReportPool(_STAMPS[name]) for name in REPORTS}
+        # Sparse: most results carry no custom check reports and skip no checks.
+        self._extra: dict[int, dict[str, Any]] = {}
+        self._skipped: dict[int, list[str]] = {}
+        # Stage -> field -> one value per row, NaN where the row has no stats for the stage.
+        self._stats: dict[str, dict[str, 'array[float]']] = {}
+        self.extend(results)
+
+    def __len__(self) -> int:
+        return len(self._flags)
+
+    def __iter__(self) -> Iterator[EmailDomainValidationResult]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def append(self, result: EmailDomainValidationResult) -> None:
+        row = len(self)
+        domain = self._strings.add(result.domain)
+        self._normalized_email.append(self._strings.add(result.normalized_email))
+        self._domain.append(domain)
+        flags = _EMAIL_BIT if result.email_valid else 0
+        for name in REPORTS:
+            report = getattr(result, name)
+            self._reports[name].append(domain, report)
+            if report.valid:
+                flags |= _REPORT_BITS[name]
+        if result.extra:
+            self._extra[row] = result.extra
+        if result.skipped:
+            self._skipped[row] = result.skipped
+        if result.stats is not None:
+            flags |= _STATS_BIT
+        self._append_stats(row, result.stats or {})
+        self._flags.append(flags)
+
+    def extend(self, results: Iterable[EmailDomainValidationResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def _append_stats(self, row: int, stats: dict[str, CheckStats]) -> None:
+        for stage in [stage for stage in stats if stage not in self._stats]:
+            self._stats[stage] = {name: array('d', [math.nan]) * row for name in _STATS_FIELDS}
+        for stage, columns in self._stats.items():
+            stage_stats = stats.get(stage)
+            for name, column in columns.items():
+                column.append(math.nan if stage_stats is None else getattr(stage_stats, name))
+
+    def __getitem__(self, row: int) -> EmailDomainValidationResult:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('ResultTable index out of range')
+        flags = self._flags[row]
+        return EmailDomainValidationResult(
+            email_valid=bool(flags & _EMAIL_BIT),
+            normalized_email=self._strings.get(self._normalized_email[row]),
+            domain=self._strings.values[self._domain[row]],
+            skipped=self._skipped.get(row, []),
+            extra=self._extra.get(row, {}),
+            stats=self._row_stats(row) if flags & _STATS_BIT else None,
+            **{name: self._reports[name].get(row) for name in REPORTS},
+        )
+
+    def _row_stats(self, row: int) -> dict[str, CheckStats]:
+        stats = {}
+        for stage, columns in self._stats.items():
+            if math.isnan(columns['wall_time_ms'][row]):
+                continue
+            values: dict[str, Any] = {name: int(column[row]) for name, column in columns.items()}
+            values['wall_time_ms'] = columns['wall_time_ms'][row]
+            stats[stage] = CheckStats(**values)
+        return stats
+
+    def count_valid(self, check: str = 'email') -> int:
+        """Rows whose email (check='email') or given report is valid, counted from the flag column alone."""
+        bit = _EMAIL_BIT if check == 'email' else _REPORT_BITS[check]
+        return sum(1 for flags in self._flags if flags & bit)
+
+    def write_ndjson(self, output: IO[bytes]) -> int:
+        """Write one JSON object per row, as `to_dict()` would produce it. Returns the number of rows."""
+        for row in range(len(self)):
+            flags = self._flags[row]
+            parts = [
+                f'"email_valid": {json.dumps(bool(flags & _EMAIL_BIT))}',
+                f'"normalized_email": {json.dumps(self._strings.get(self._normalized_email[row]))}',
+                f'"domain": {json.dumps(self._strings.values[self._domain[row]])}',
+                *(f'"{name}": {self._reports[name].json(row)}' for name in REPORTS),
+                f'"skipped": {json.dumps(self._skipped.get(row, []))}',
+                # Reports of the blocklist and custom checks may be dataclasses, which to_dict() also converts.
+                f'"extra": {json.dumps(self._extra.get(row, {}), default=asdict)}',
+            ]
+            if flags & _STATS_BIT:
+                stats = {stage: asdict(value) for stage, value in self._row_stats(row).items()}
+                parts.append(f'"stats": {json.dumps(stats)}')
+            output.write(('{' + ', '.join(parts) + '}\n').encode('utf-8'))
+        return len(self)
+
+    def write_csv(self, output: IO[str]) -> int:
+        """Write a header and one flattened row per result (lists space-separated). Returns the number of rows."""
+        writer = csv.writer(output)
+        writer.writerow(CSV_COLUMNS)
+        for row in range(len(self)):
+            cells: list[Any] = [
+                bool(self._flags[row] & _EMAIL_BIT),
+                self._strings.get(self._normalized_email[row]) or '',
+                self._strings.values[self._domain[row]],
+                ' '.join(self._skipped.get(row, [])),
+            ]
+            for name in REPORTS:
+                cells.extend(self._reports[name].csv(row))
+            writer.writerow(cells)
+        return len(self)
+
+    @classmethod
+    def read_ndjson(cls, lines: Iterable[str | bytes]) -> 'ResultTable':
+        """Build a table from NDJSON results, e.g. the output of run_batch(), one line at a time."""
+        table = cls()
+        for line in lines:
+            if line.strip():
+                table.append(EmailDomainValidationResult.from_dict(json.loads(line)))
+        return table
@@ -1,26 +1,79 @@
+import base64
+import binascii
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 from .exceptions import DomainPolicyError
-from .models import DKIM_MARKER, DKIM_SELECTORS, DKIMVerificationReport
-from .utils import get_domain_policy_record
+from .models import DKIM_MARKER, DKIM_SELECTORS, DKIMKeyInfo, DKIMVerificationReport
+from .utils import get_domain_policy_record, parse_tag_list
 
 if TYPE_CHECKING:
     from dns.resolver import Resolver
 
+    from .selector_stats import SelectorStats
 
-def extract_dkim_record_info(
+
+# Distinct records whose parsed tags are remembered.
+PARSE_CACHE_SIZE = 4096
+
+
+def _key_bits(key_type: str, key: str) -> int | None:
+    try:
+        data = base64.b64decode(''.join(key.split()), validate=True)
+    except binascii.Error:
+        return None
+    if key_type == 'ed25519':
+        # RFC 8463: the raw 32-byte public key.
+        return 256 if len(data) == 32 else None
+    # cryptography is only loaded once an RSA key has been found.
+    from cryptography.exceptions import UnsupportedAlgorithm  # pylint: disable=import-outside-toplevel
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey  # pylint: disable=import-outside-toplevel
+    from cryptography.hazmat.primitives.serialization import (  # pylint: disable=import-outside-toplevel
+        load_der_public_key,
+    )
+
+    try:
+        public_key = load_der_public_key(data)
+    except ValueError, UnsupportedAlgorithm:
+        return None
+    return public_key.key_size if isinstance(public_key, RSAPublicKey) else None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_dkim_record(record: str) -> DKIMKeyInfo:
+    """Tags of a DKIM key record (RFC 6376, section 3.6.1), including the type and size of its public key."""
+    tags = parse_tag_list(record)
+    key_type = tags.get('k', 'rsa').lower() or 'rsa'
+    key = tags.get('p', '')
+    return DKIMKeyInfo(
+        key_type=key_type,
+        key_bits=_key_bits(key_type, key) if key else None,
+        revoked=not key,
+        hash_algorithms=[name.strip().lower() for name in tags.get('h', '').split(':') if name.strip()],
+        flags=[flag.strip().lower() for flag in tags.get('t', '').split(':') if flag.strip()],
+    )
+
+
+def extract_dkim_record_info(  # pylint: disable=too-many-arguments
     domain: str,
     resolver: 'Resolver | None' = None,
     timeout: int = 5,
     selectors: list[str] | None = None,
+    *,
+    stats: 'SelectorStats | None' = None,
+    stats_key: str = '',
 ) -> DKIMVerificationReport:
     """
     Look up DKIM policy record for the domain by trying selectors until one matches.
     Performs up to one DNS query per selector (default list size ~76).
+    With `stats`, selectors are probed in the order learned from earlier lookups of `stats_key`,
+    and the selector that matched is recorded.
     For more strict validation, use magicspoofing (magichk).
     """
     selectors = selectors or DKIM_SELECTORS
-    for selector in selectors:
+    if stats is not None:
+        selectors = stats.order(selectors, stats_key)
+    for queries, selector in enumerate(selectors, start=1):
         try:
             if dkim_record := get_domain_policy_record(
                 f'{selector}._domainkey.{domain}',
@@ -28,7 +81,11 @@ def extract_dkim_record_info(
                 resolver=resolver,
                 timeout=timeout,
             ):
-                return DKIMVerificationReport(valid=True, record=dkim_record)
+                if stats is not None:
+                    stats.record(selector, queries, stats_key)
+                return DKIMVerificationReport(valid=True, record=dkim_record, info=parse_dkim_record(dkim_record))
         except DomainPolicyError:
             continue
+    if stats is not None:
+        stats.record(None, len(selectors), stats_key)
     return DKIMVerificationReport(valid=False, record=None)
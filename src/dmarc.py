@@ -1,21 +1,47 @@
+from dataclasses import replace
+from functools import lru_cache, partial
 from typing import TYPE_CHECKING
 
-from .exceptions import DomainPolicyError
-from .models import DMARC_MARKER, DMARCVerificationReport
-from .utils import get_domain_policy_record
+from .exceptions import DomainPolicyError, DomainPolicyLookupError
+from .instrumentation import current_probe
+from .models import DMARC_MARKER, DMARCRecordInfo, DMARCVerificationReport
+from .utils import get_domain_policy_record, parse_tag_list
 
 if TYPE_CHECKING:
     from dns.resolver import Resolver
 
+    from .cache import DomainReportCache
 
-def extract_dmarc_record_info(
-    domain: str,
-    resolver: 'Resolver | None' = None,
-    timeout: int = 5,
-) -> DMARCVerificationReport:
-    """
-    For more strict validation, use checkdmarc (domainaware), magicspoofing (magichk).
-    """
+
+_POLICIES = frozenset({'none', 'quarantine', 'reject'})
+# Distinct records whose parsed tags are remembered; many domains publish the same few policies.
+PARSE_CACHE_SIZE = 4096
+
+
+def _uris(value: str | None) -> list[str]:
+    return [uri.strip() for uri in value.split(',') if uri.strip()] if value else []
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_dmarc_record(record: str) -> DMARCRecordInfo:
+    """Tags of a DMARC record (RFC 7489, section 6.3), with defaults applied; unknown values become defaults."""
+    tags = parse_tag_list(record)
+    requested, subdomain_requested = tags.get('p', '').lower(), tags.get('sp', '').lower()
+    policy = requested if requested in _POLICIES else None
+    pct = tags.get('pct', '')
+    return DMARCRecordInfo(
+        policy=policy,
+        subdomain_policy=subdomain_requested if subdomain_requested in _POLICIES else policy,
+        pct=min(int(pct), 100) if pct.isdigit() else 100,
+        rua=_uris(tags.get('rua')),
+        ruf=_uris(tags.get('ruf')),
+        adkim='s' if tags.get('adkim', '').lower() == 's' else 'r',
+        aspf='s' if tags.get('aspf', '').lower() == 's' else 'r',
+    )
+
+
+def _lookup(domain: str, resolver: 'Resolver | None', timeout: int) -> DMARCVerificationReport:
+    # A failed query (timeout, no nameservers) raises DomainPolicyLookupError: it tells nothing about the record.
     try:
         if dmarc_record := get_domain_policy_record(
             f'_dmarc.{domain}',
@@ -23,7 +49,58 @@ def extract_dmarc_record_info(
             resolver=resolver,
             timeout=timeout,
         ):
-            return DMARCVerificationReport(valid=True, record=dmarc_record)
+            return DMARCVerificationReport(valid=True, record=dmarc_record, info=parse_dmarc_record(dmarc_record))
+    except DomainPolicyLookupError:
+        raise
     except DomainPolicyError:
         pass
     return DMARCVerificationReport(valid=False, record=None)
+
+
+def _org_lookup(org_domain: str, resolver: 'Resolver | None', timeout: int) -> DMARCVerificationReport:
+    # The organizational report is shared by every subdomain, so it carries the TTL of its own answers, which the
+    # probe of the check collects apart from the subdomain's.
+    probe = current_probe()
+    if probe is None:
+        return _lookup(org_domain, resolver, timeout)
+    negative_ttl, probe.ttl = probe.ttl, None
+    try:
+        return replace(_lookup(org_domain, resolver, timeout), ttl=probe.ttl)
+    finally:
+        probe.ttl = min((ttl for ttl in (negative_ttl, probe.ttl) if ttl is not None), default=None)
+
+
+def extract_dmarc_record_info(
+    domain: str,
+    resolver: 'Resolver | None' = None,
+    timeout: int = 5,
+    *,
+    org_domain: str | None = None,
+    cache: 'DomainReportCache | None' = None,
+) -> DMARCVerificationReport:
+    """
+    For more strict validation, use checkdmarc (domainaware), magicspoofing (magichk).
+    When `domain` has no record and `org_domain` (its organizational domain) differs, the record of `org_domain`
+    applies. That lookup is shared through `cache` by every subdomain of the organization; failed lookups are not
+    cached. A failed lookup of `domain` itself leaves the report invalid without a fallback.
+    """
+    try:
+        report = _lookup(domain, resolver, timeout)
+        if report.valid or org_domain is None or org_domain == domain:
+            return report
+        negative_ttl = None if (probe := current_probe()) is None else probe.ttl
+        if cache is None:
+            fallback = _org_lookup(org_domain, resolver, timeout)
+        else:
+            fallback = cache.get_or_compute(
+                'dmarc_org', org_domain, partial(_org_lookup, org_domain, resolver, timeout)
+            )
+    except DomainPolicyLookupError:
+        return DMARCVerificationReport(valid=False, record=None)
+    if not fallback.valid:
+        return report
+    # The report expires with the first of the subdomain's negative answer and the organizational record.
+    ttl = min((ttl for ttl in (negative_ttl, fallback.ttl) if ttl is not None), default=None)
+    return DMARCVerificationReport(
+        valid=True, record=fallback.record, org_domain=org_domain, info=fallback.info, ttl=ttl
+    )
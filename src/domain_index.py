@@ -0,0 +1,88 @@
+import mmap
+import os
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, ClassVar, Self
+
+from .exceptions import DomainIndexError
+
+# File layout: header (magic, entry count), count + 1 little-endian uint32 offsets into the data area (the last
+# one is its end), then the sorted entries back to back as UTF-8.
+_HEADER = struct.Struct('<8sI')
+_OFFSET = struct.Struct('<I')
+
+
+def write_domain_index(entries: Iterable[str], output: Path, magic: bytes) -> int:
+    """Write the distinct `entries` as a sorted index file for a DomainIndex with this magic. Returns their number."""
+    packed = sorted({entry.encode('utf-8') for entry in entries})
+    offsets = [0]
+    for entry in packed:
+        offsets.append(offsets[-1] + len(entry))
+    # Write-then-rename, so processes that map the old index never see a torn file.
+    tmp = output.with_name(f'{output.name}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(magic, len(packed)))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(b''.join(packed))
+    os.replace(tmp, output)
+    return len(packed)
+
+
+class DomainIndex:
+    """
+    Read-only, memory-mapped set of strings written by write_domain_index(). Opening maps the file without reading
+    it, lookups binary-search the mapping, and every process that opens the file shares its pages.
+    """
+
+    # Identifies the kind of index, so that one kind is never loaded as another.
+    MAGIC: ClassVar[bytes] = b'EDVIDX01'
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise DomainIndexError(f'Cannot read index: {path}') from e
+        if len(self._map) < _HEADER.size or self._map[: len(self.MAGIC)] != self.MAGIC:
+            self._map.close()
+            raise DomainIndexError(f'Not a {type(self).__name__} file: {path}')
+        _, self.entries = _HEADER.unpack_from(self._map)
+        self._data = _HEADER.size + _OFFSET.size * (self.entries + 1)
+        if len(self._map) < self._data or len(self._map) != self._data + self._offset(self.entries):
+            self._map.close()
+            raise DomainIndexError(f'Truncated index: {path}')
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickled as its path: worker processes map the same file instead of receiving a copy.
+        return type(self), (self.path,)
+
+    def find(self, entry: str) -> bool:
+        key = entry.encode('utf-8')
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            found = self._entry(middle)
+            if found == key:
+                return True
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _offset(self, index: int) -> int:
+        return int(_OFFSET.unpack_from(self._map, _HEADER.size + _OFFSET.size * index)[0])
+
+    def _entry(self, index: int) -> bytes:
+        return self._map[self._data + self._offset(index) : self._data + self._offset(index + 1)]
@@ -1,9 +1,40 @@
+import re
+from functools import lru_cache
+
+import idna
 from email_validator import EmailNotValidError, validate_email
 
+# Distinct addresses whose syntax result is remembered; duplicates in bulk input skip the validator.
+NORMALIZE_CACHE_SIZE = 65_536
+
+_WHITESPACE = re.compile(r'\s')
+
+
+def _is_trivially_invalid(email: str) -> bool:
+    # Structural rejects email_validator would also make: quoted local parts (the only place '@' or
+    # whitespace may appear) are not allowed by default.
+    local, at, domain = email.rpartition('@')
+    return not at or not local or not domain or '@' in local or _WHITESPACE.search(email) is not None
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_syntax(email: str) -> str | None:
+    if _is_trivially_invalid(email):
+        return None
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
+
 
 def normalize_email(email: str, *, check_deliverability: bool = False) -> str | None:
+    email = email.strip()
+    if not check_deliverability:
+        return _normalize_syntax(email)
+    if _is_trivially_invalid(email):
+        return None
     try:
-        result = validate_email(email.strip(), check_deliverability=check_deliverability)
+        result = validate_email(email, check_deliverability=True)
         return result.normalized
     except EmailNotValidError:
         return None
@@ -11,3 +42,18 @@ def normalize_email(email: str, *, check_deliverability: bool = False) -> str |
 
 def get_domain_from_email(email: str) -> str:
     return email.strip().split('@')[-1].strip()
+
+
+def canonical_domain(domain: str) -> str:
+    """
+    Lowercase, IDNA-encoded domain without a trailing dot: the key every check, cache and batch run uses,
+    so that equivalent spellings of a domain share one set of lookups.
+    """
+    domain = domain.strip().rstrip('.')
+    if domain.isascii():
+        return domain.lower()
+    try:
+        return idna.encode(domain, uts46=True).decode('ascii')
+    except idna.IDNAError:
+        # Not a valid IDN; the checks will fail on it either way, so any stable key will do.
+        return domain.lower()
@@ -1,3 +1,49 @@
 class DomainPolicyError(Exception):
     def __init__(self, message: str = 'Policy not found') -> None:
         super().__init__(message)
+
+
+class DomainPolicyLookupError(DomainPolicyError):
+    def __init__(self, message: str = 'Policy lookup failed') -> None:
+        super().__init__(message)
+
+
+class RequestError(Exception):
+    def __init__(self, status: int = 400, message: str = 'Bad request') -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class PipelineError(Exception):
+    def __init__(self, message: str = 'Invalid check pipeline') -> None:
+        super().__init__(message)
+
+
+class CheckpointError(Exception):
+    def __init__(self, message: str = 'Invalid checkpoint') -> None:
+        super().__init__(message)
+
+
+class RecordingError(Exception):
+    def __init__(self, message: str = 'Invalid DNS recording') -> None:
+        super().__init__(message)
+
+
+class SelectorStatsError(Exception):
+    def __init__(self, message: str = 'Invalid DKIM selector stats') -> None:
+        super().__init__(message)
+
+
+class DomainIndexError(Exception):
+    def __init__(self, message: str = 'Invalid domain index') -> None:
+        super().__init__(message)
+
+
+class BlocklistError(Exception):
+    def __init__(self, message: str = 'Invalid blocklist index') -> None:
+        super().__init__(message)
+
+
+class PublicSuffixError(Exception):
+    def __init__(self, message: str = 'Invalid public suffix index') -> None:
+        super().__init__(message)
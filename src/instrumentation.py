@@ -0,0 +1,165 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from .models import CheckStats
+
+if TYPE_CHECKING:
+    from dns.resolver import Answer
+
+    from .metrics import ValidationMetrics
+
+
+@dataclass
+class CheckEvent:
+    check: str
+    domain: str
+    duration_ms: float
+
+
+@dataclass
+class DNSQueryEvent:  # pylint: disable=too-many-instance-attributes
+    check: str
+    # Domain under validation, as opposed to the queried name.
+    domain: str
+    name: str
+    rdtype: str
+    # Nameserver that answered; None for cache hits and failed queries.
+    upstream: str | None
+    duration_ms: float
+    # 'ok', 'nxdomain', 'no_answer', 'no_nameservers', 'timeout' or 'error'.
+    outcome: str
+    ttl: int | None
+    cached: bool
+
+
+@dataclass
+class TLSProbeEvent:  # pylint: disable=too-many-instance-attributes
+    check: str
+    domain: str
+    host: str
+    ip: str | None
+    port: int
+    duration_ms: float
+    connect_ms: float
+    handshake_ms: float
+    # Protocol negotiated by the handshake (e.g. 'TLSv1.3'); None when it failed.
+    tls_version: str | None
+    # 'ok', 'timeout' or 'error'.
+    outcome: str
+
+
+class ValidationHooks:
+    """
+    Callbacks for every check, DNS query and TLS probe, registered through ValidationOptions.hooks.
+    Checks run concurrently, so implementations must be thread-safe and should return quickly.
+    """
+
+    def on_check(self, event: CheckEvent) -> None:
+        pass
+
+    def on_dns_query(self, event: DNSQueryEvent) -> None:
+        pass
+
+    def on_tls_probe(self, event: TLSProbeEvent) -> None:
+        pass
+
+
+@dataclass
+class Probe:
+    check: str
+    domain: str = ''
+    stats: CheckStats | None = None
+    hooks: ValidationHooks | None = None
+    metrics: 'ValidationMetrics | None' = None
+    # Lowest TTL of the answers seen, negative ones included; None until one carried a TTL.
+    ttl: int | None = None
+
+    @property
+    def observed(self) -> bool:
+        # A bare probe only collects TTLs; stats, hooks and metrics also want cache hits, timings and TLS probes.
+        return self.stats is not None or self.hooks is not None or self.metrics is not None
+
+    def record_dns(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        name: str,
+        rdtype: str,
+        cached: bool,
+        answer: 'Answer | None',
+        outcome: str,
+        ttl: int | None,
+        duration_ms: float,
+    ) -> None:
+        if ttl is not None:
+            self.ttl = ttl if self.ttl is None else min(self.ttl, ttl)
+        if self.stats is not None:
+            if cached:
+                self.stats.cache_hits += 1
+            else:
+                self.stats.dns_queries += 1
+            if outcome == 'timeout':
+                self.stats.timeouts += 1
+            if not cached and answer is not None and answer.response is not None:
+                self.stats.bytes_received += len(answer.response.to_wire())
+        if self.metrics is not None:
+            if cached:
+                self.metrics.dns_cache_hits.inc(rdtype)
+            else:
+                self.metrics.dns_queries.inc(rdtype, outcome)
+            if outcome == 'timeout':
+                self.metrics.dns_timeouts.inc(rdtype)
+        if self.hooks is not None:
+            self.hooks.on_dns_query(
+                DNSQueryEvent(
+                    check=self.check,
+                    domain=self.domain,
+                    name=name,
+                    rdtype=rdtype,
+                    upstream=None if cached or answer is None else getattr(answer, 'nameserver', None),
+                    duration_ms=duration_ms,
+                    outcome=outcome,
+                    ttl=ttl,
+                    cached=cached,
+                )
+            )
+
+    def record_tls(self, event: TLSProbeEvent, cert_bytes: int) -> None:
+        if self.stats is not None:
+            # connect() resolves the host once; a successful probe also looks up the reported IP.
+            self.stats.dns_queries += 2 if event.outcome == 'ok' else 1
+            self.stats.timeouts += event.outcome == 'timeout'
+            self.stats.bytes_received += cert_bytes
+        if self.metrics is not None:
+            self.metrics.tls_probes.inc(event.outcome)
+        if self.hooks is not None:
+            self.hooks.on_tls_probe(event)
+
+
+# Probe of the check running in the current thread; None (the default) keeps every call site a single lookup.
+_active: ContextVar[Probe | None] = ContextVar('probe', default=None)
+
+
+def current_probe() -> Probe | None:
+    return _active.get()
+
+
+@contextmanager
+def probing(probe: Probe) -> Iterator[Probe]:
+    token = _active.set(probe)
+    start = perf_counter()
+    try:
+        yield probe
+    finally:
+        if probe.stats is not None:
+            probe.stats.wall_time_ms = round((perf_counter() - start) * 1000, 3)
+        _active.reset(token)
+
+
+@contextmanager
+def collect_stats(stats: CheckStats, check: str = '') -> Iterator[CheckStats]:
+    with probing(Probe(check=check, stats=stats)):
+        yield stats
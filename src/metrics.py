@@ -0,0 +1,183 @@
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+
+PREFIX = 'email_domain_validator'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; DNS and TLS round trips dominate, so the range spans a cache hit up to a full timeout.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: _Labels, values: _Labels, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(ABC):  # pylint: disable=too-few-public-methods
+    kind = ''
+
+    def __init__(self, lock: threading.Lock, name: str, documentation: str, labels: _Labels = ()) -> None:
+        self._lock = lock
+        self.name = f'{PREFIX}_{name}'
+        self.documentation = documentation
+        self.labels = labels
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]: ...
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, lock: threading.Lock, name: str, documentation: str, labels: _Labels = ()) -> None:
+        super().__init__(lock, name, documentation, labels)
+        self._values: dict[_Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}_total{_format_labels(self.labels, labels)} {_format_value(value)}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}'
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        lock: threading.Lock,
+        name: str,
+        documentation: str,
+        labels: _Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(lock, name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum, and count.
+        self._series: dict[_Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            counts, totals = series
+            counts[bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return int(series[1][1]) if series else 0
+
+    def _samples(self) -> Iterator[str]:
+        for labels, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, float('inf')), counts, strict=True):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{_format_value(bound)}"'
+                yield f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labels, labels)} {int(count)}'
+
+
+class ValidationMetrics:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    Thread-safe metrics registry updated by the runner and checks when set as ValidationOptions.metrics.
+    render() returns the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        lock = threading.Lock()
+        self.validations = Counter(lock, 'validations', 'Completed validations.', ('email_valid',))
+        self.validation_duration = Histogram(
+            lock, 'validation_duration_seconds', 'Latency of a whole validation.', buckets=buckets
+        )
+        self.validations_in_flight = Gauge(lock, 'validations_in_flight', 'Validations currently running.')
+        self.check_duration = Histogram(
+            lock, 'check_duration_seconds', 'Latency of each check.', ('check',), buckets=buckets
+        )
+        self.checks_in_flight = Gauge(lock, 'checks_in_flight', 'Checks currently running.', ('check',))
+        self.dns_queries = Counter(
+            lock, 'dns_queries', 'DNS queries sent upstream, by record type and outcome.', ('rdtype', 'outcome')
+        )
+        self.dns_timeouts = Counter(lock, 'dns_timeouts', 'DNS queries that timed out.', ('rdtype',))
+        self.dns_cache_hits = Counter(
+            lock, 'dns_cache_hits', 'DNS queries answered by the resolver cache.', ('rdtype',)
+        )
+        self.domain_cache_lookups = Counter(
+            lock, 'domain_cache_lookups', 'Domain report cache lookups, by check and result.', ('check', 'result')
+        )
+        self.tls_probes = Counter(lock, 'tls_probes', 'TLS probes, by outcome.', ('outcome',))
+        self._metrics: list[_Metric] = [
+            self.validations,
+            self.validation_duration,
+            self.validations_in_flight,
+            self.check_duration,
+            self.checks_in_flight,
+            self.dns_queries,
+            self.dns_timeouts,
+            self.dns_cache_hits,
+            self.domain_cache_lookups,
+            self.tls_probes,
+        ]
+        self._lock = lock
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [line for metric in self._metrics for line in metric.render()]
+        return '\n'.join(lines) + '\n'
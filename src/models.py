@@ -1,12 +1,32 @@
-from dataclasses import asdict, dataclass
+import sys
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from dns.resolver import Resolver
 
+    from .blocklist import BlocklistIndex
+    from .cache import DomainReportCache
+    from .instrumentation import ValidationHooks
+    from .metrics import ValidationMetrics
+    from .pipeline import Check, ValidationPolicy
+    from .public_suffix import PublicSuffixIndex
+    from .selector_stats import SelectorStats
 
-@dataclass
+
+# Host names, include domains, issuer names and protocol labels repeat across many reports; interning keeps one copy.
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+def _intern_all(values: list[str] | None) -> list[str] | None:
+    return None if values is None else [sys.intern(value) for value in values]
+
+
+@dataclass(slots=True)
 class SSLCertInfo:  # pylint: disable=too-many-instance-attributes
     host: str
     resolved_ip: str
@@ -28,17 +48,43 @@ class SSLCertInfo:  # pylint: disable=too-many-instance-attributes
     validity_days: int
     days_left: int
 
+    def __post_init__(self) -> None:
+        self.tls_version = sys.intern(self.tls_version)
+        self.issuer_c = _intern(self.issuer_c)
+        self.issuer_o = _intern(self.issuer_o)
+        self.issuer_ou = _intern(self.issuer_ou)
+        self.issuer_cn = _intern(self.issuer_cn)
+        self.cert_alg = sys.intern(self.cert_alg)
 
-@dataclass
+
+@dataclass(slots=True)
 class SSLVerificationReport:
-    valid: bool
+    # None when the check was skipped (see EmailDomainValidationResult.skipped); a disabled check reports False.
+    valid: bool | None
     info: SSLCertInfo | None
+    # Unix time the report was produced by its check; None for defaults of disabled or skipped checks.
+    fetched_at: float | None = field(default=None, compare=False)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'SSLVerificationReport':
+        info = data.get('info')
+        return cls(**{**data, 'info': SSLCertInfo(**info) if info else None})
 
-@dataclass
+
+@dataclass(slots=True)
 class MXVerificationReport:
-    valid: bool
+    valid: bool | None
     records: list[str] | None
+    fetched_at: float | None = field(default=None, compare=False)
+    # Lowest TTL in seconds of the DNS answers behind the report, negative answers included.
+    ttl: int | None = field(default=None, compare=False)
+
+    def __post_init__(self) -> None:
+        self.records = _intern_all(self.records)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'MXVerificationReport':
+        return cls(**data)
 
 
 class CatchAllSecurityLevel(str, Enum):
@@ -48,7 +94,7 @@ class CatchAllSecurityLevel(str, Enum):
     NONE = 'none'
 
 
-@dataclass
+@dataclass(slots=True)
 class SPFRecordInfo:
     record: str
     catchall: CatchAllSecurityLevel | None
@@ -56,23 +102,111 @@ class SPFRecordInfo:
     ip_addresses: bool
     includes: list[str]
 
+    def __post_init__(self) -> None:
+        self.includes = [sys.intern(include) for include in self.includes]
 
-@dataclass
+
+@dataclass(slots=True)
 class SPFVerificationReport:
-    valid: bool
+    valid: bool | None
     info: SPFRecordInfo | None
+    fetched_at: float | None = field(default=None, compare=False)
+    ttl: int | None = field(default=None, compare=False)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'SPFVerificationReport':
+        info = data.get('info')
+        if info:
+            catchall = info.get('catchall')
+            info = SPFRecordInfo(**{**info, 'catchall': CatchAllSecurityLevel(catchall) if catchall else None})
+        return cls(**{**data, 'info': info or None})
 
-@dataclass
+
+@dataclass(slots=True)
+class DMARCRecordInfo:
+    # p=: 'none', 'quarantine' or 'reject'; None when missing or unknown.
+    policy: str | None
+    # sp=, defaulting to the policy.
+    subdomain_policy: str | None
+    # Percentage of failing mail the policy applies to (pct=, default 100).
+    pct: int
+    # Aggregate (rua=) and failure (ruf=) report URIs.
+    rua: list[str]
+    ruf: list[str]
+    # DKIM and SPF identifier alignment: 'r' (relaxed, the default) or 's' (strict).
+    adkim: str
+    aspf: str
+
+    def __post_init__(self) -> None:
+        self.policy = _intern(self.policy)
+        self.subdomain_policy = _intern(self.subdomain_policy)
+        self.adkim = sys.intern(self.adkim)
+        self.aspf = sys.intern(self.aspf)
+
+
+@dataclass(slots=True)
 class DMARCVerificationReport:
-    valid: bool
+    valid: bool | None
     record: str | None
+    # Set when the record was found at the organizational domain (RFC 7489 fallback) instead of the domain.
+    org_domain: str | None = None
+    # Tags parsed from the record when it was fetched.
+    info: DMARCRecordInfo | None = None
+    fetched_at: float | None = field(default=None, compare=False)
+    ttl: int | None = field(default=None, compare=False)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'DMARCVerificationReport':
+        info = data.get('info')
+        return cls(**{**data, 'info': DMARCRecordInfo(**info) if info else None})
 
-@dataclass
+
+@dataclass(slots=True)
+class DKIMKeyInfo:
+    # k=: 'rsa' (the default) or 'ed25519'.
+    key_type: str
+    # Public key size in bits; None when p= does not decode as a key of key_type.
+    key_bits: int | None
+    # An empty p= marks a revoked key.
+    revoked: bool
+    # h= hash algorithms the key may be used with (empty: any).
+    hash_algorithms: list[str]
+    # t= flags: 'y' (testing), 's' (no subdomains).
+    flags: list[str]
+
+    def __post_init__(self) -> None:
+        self.key_type = sys.intern(self.key_type)
+
+
+@dataclass(slots=True)
 class DKIMVerificationReport:
-    valid: bool
+    valid: bool | None
     record: str | None
+    # Tags parsed from the record when it was fetched.
+    info: DKIMKeyInfo | None = None
+    fetched_at: float | None = field(default=None, compare=False)
+    ttl: int | None = field(default=None, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'DKIMVerificationReport':
+        info = data.get('info')
+        return cls(**{**data, 'info': DKIMKeyInfo(**info) if info else None})
+
+
+@dataclass(slots=True)
+class BlocklistReport:
+    # False when the domain or one of its parent domains is listed.
+    valid: bool
+    # The listed entry that matched.
+    match: str | None = None
+
+
+@dataclass(slots=True)
+class CheckErrorReport:
+    # Always False: the check raised instead of returning a report.
+    valid: bool
+    # Exception type and message.
+    error: str
 
 
 # Common DKIM selectors used for discovery (bounded lookups to avoid abuse).
@@ -179,8 +313,18 @@ DMARC_MARKER = 'v=DMARC1'
 DKIM_MARKER = 'v=DKIM1'
 
 
+@dataclass(slots=True)
+class CheckStats:
+    wall_time_ms: float = 0.0
+    # Queries sent upstream; answers served from the resolver cache count as cache_hits instead.
+    dns_queries: int = 0
+    cache_hits: int = 0
+    timeouts: int = 0
+    bytes_received: int = 0
+
+
 @dataclass
-class ValidationOptions:
+class ValidationOptions:  # pylint: disable=too-many-instance-attributes
     timeout: int = 5
     run_mx: bool = True
     run_spf: bool = True
@@ -188,9 +332,34 @@ class ValidationOptions:
     run_dkim: bool = True
     run_ssl: bool = True
     resolver: 'Resolver | None' = None
+    # User-supplied checks, scheduled alongside the built-in ones (see pipeline.Check).
+    checks: list['Check'] = field(default_factory=list)
+    check_workers: int = 5
+    # Runs the checks; None uses the pool shared by every validation in the process (see pipeline.CHECK_EXECUTOR).
+    check_executor: 'Executor | None' = None
+    # Which checks are skipped instead of run: a name from pipeline.POLICIES or a pipeline.ValidationPolicy.
+    policy: 'str | ValidationPolicy' = 'full'
+    # Probe only the DKIM selectors of providers detected from MX and SPF (see providers.prioritize_selectors).
+    dkim_narrow_selectors: bool = False
+    # Learns the DKIM selector probe order from observed hits (see selector_stats.SelectorStats).
+    dkim_selector_stats: 'SelectorStats | None' = None
+    # Domain index looked up before the DNS checks; a listed domain skips them (see blocklist.BlocklistIndex).
+    blocklist: 'BlocklistIndex | None' = None
+    # Look up the organizational domain's DMARC record when the domain has none (RFC 7489, section 6.6.3).
+    dmarc_org_fallback: bool = True
+    # Public suffixes that determine the organizational domain; None uses the bundled list (see public_suffix).
+    public_suffixes: 'PublicSuffixIndex | None' = None
+    # Shares per-domain reports between emails of the same domain (see cache.DomainReportCache).
+    domain_cache: 'DomainReportCache | None' = None
+    # Per-check timing and DNS accounting in EmailDomainValidationResult.stats.
+    collect_stats: bool = False
+    # Receives an event for every DNS query and TLS probe (see instrumentation.ValidationHooks).
+    hooks: 'ValidationHooks | None' = None
+    # Registry updated by the runner and checks (see metrics.ValidationMetrics).
+    metrics: 'ValidationMetrics | None' = None
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailDomainValidationResult:  # pylint: disable=too-many-instance-attributes
     email_valid: bool
     normalized_email: str | None
@@ -200,6 +369,36 @@ class EmailDomainValidationResult:  # pylint: disable=too-many-instance-attribut
     dmarc: DMARCVerificationReport
     dkim: DKIMVerificationReport
     ssl: SSLVerificationReport
+    # Checks skipped because their inputs never appeared or by ValidationOptions.policy; their reports have valid=None.
+    skipped: list[str] = field(default_factory=list)
+    # Reports of the blocklist check and user-supplied checks, and CheckErrorReport of checks that raised, keyed by
+    # check name.
+    extra: dict[str, Any] = field(default_factory=dict)
+    # Present only when ValidationOptions.collect_stats is set; keyed by 'syntax' and check name.
+    stats: dict[str, CheckStats] | None = None
+
+    def __post_init__(self) -> None:
+        self.domain = sys.intern(self.domain)
+        self.skipped = [sys.intern(name) for name in self.skipped]
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        data = asdict(self)
+        if self.stats is None:
+            del data['stats']
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'EmailDomainValidationResult':
+        return cls(
+            email_valid=data['email_valid'],
+            normalized_email=data['normalized_email'],
+            domain=data['domain'],
+            mx=MXVerificationReport.from_dict(data['mx']),
+            spf=SPFVerificationReport.from_dict(data['spf']),
+            dmarc=DMARCVerificationReport.from_dict(data['dmarc']),
+            dkim=DKIMVerificationReport.from_dict(data['dkim']),
+            ssl=SSLVerificationReport.from_dict(data['ssl']),
+            skipped=data.get('skipped', []),
+            extra=data.get('extra', {}),
+            stats={name: CheckStats(**stats) for name, stats in data['stats'].items()} if data.get('stats') else None,
+        )
@@ -1,14 +1,40 @@
-from email_validator import EmailNotValidError, validate_email
+from typing import TYPE_CHECKING
 
+import dns.resolver
+from email_validator import EmailNotValidError
+from email_validator.deliverability import validate_email_deliverability
+
+from .email_validation import canonical_domain, normalize_email
+from .instrumentation import current_probe
 from .models import MXVerificationReport
+from .utils import AccountedResolver
+
+if TYPE_CHECKING:
+    from dns.resolver import Resolver
 
 
-def extract_mx_record_info(email: str, timeout: int = 5) -> MXVerificationReport:
+def extract_mx_record_info(
+    email: str, timeout: int = 5, resolver: 'Resolver | None' = None, *, normalized_email: str | None = None
+) -> MXVerificationReport:
+    # The runner passes the address normalized by the syntax stage; only the deliverability lookups run here.
+    normalized = normalized_email or normalize_email(email)
+    if normalized is None:
+        return MXVerificationReport(valid=False, records=None)
+    domain_i18n = normalized.rpartition('@')[2]
+    domain = canonical_domain(domain_i18n)
     try:
-        validated = validate_email(email.strip(), check_deliverability=True, timeout=timeout)
-        if not hasattr(validated, 'mx'):
-            return MXVerificationReport(valid=False, records=None)
-        mx_records = [mx_record for _, mx_record in validated.mx]
-        return MXVerificationReport(valid=True, records=mx_records)
+        if current_probe() is not None:
+            # Route the MX/A/AAAA lookups through the accounted resolver path.
+            accounted = AccountedResolver(resolver or dns.resolver.get_default_resolver(), timeout)
+            info = validate_email_deliverability(domain, domain_i18n, dns_resolver=accounted)
+        # email_validator rejects timeout together with a resolver; the resolver's lifetime applies instead.
+        elif resolver is not None:
+            info = validate_email_deliverability(domain, domain_i18n, dns_resolver=resolver)
+        else:
+            info = validate_email_deliverability(domain, domain_i18n, timeout=timeout)
     except EmailNotValidError:
         return MXVerificationReport(valid=False, records=None)
+    if 'mx' not in info:
+        # Timeouts and other unknown outcomes are reported without MX data.
+        return MXVerificationReport(valid=False, records=None)
+    return MXVerificationReport(valid=True, records=[mx_record for _, mx_record in info['mx']])
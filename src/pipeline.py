@@ -0,0 +1,521 @@
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, is_dataclass, replace
+from functools import partial
+from time import perf_counter
+from typing import Any
+
+from .exceptions import PipelineError
+from .instrumentation import CheckEvent, Probe, current_probe, probing
+from .models import (
+    BlocklistReport,
+    CheckErrorReport,
+    CheckStats,
+    DKIMVerificationReport,
+    DMARCVerificationReport,
+    MXVerificationReport,
+    SPFVerificationReport,
+    SSLVerificationReport,
+    ValidationOptions,
+)
+
+# Threads shared by the checks of every validation in the process, so that concurrent validations (iter_validate()
+# windows, server workers) reuse them instead of each starting a pool; threads start on first use.
+CHECK_EXECUTOR: Executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix='check')
+
+# Check modules are imported on first use so that disabled checks never load their dependencies.
+# pylint: disable=import-outside-toplevel
+
+
+@dataclass
+class CheckContext:
+    email: str
+    domain: str
+    options: ValidationOptions
+    # Named values published so far: 'email', 'domain', 'normalized_email' and whatever checks provide.
+    inputs: dict[str, Any] = field(default_factory=dict)
+    # Reports of checks that are not run again (revalidation carries them forward); policy gates and fail-fast
+    # treat them as checks that already ran.
+    reports: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Check:  # pylint: disable=too-many-instance-attributes
+    name: str
+    run: Callable[[CheckContext], Any]
+    # Inputs that must be available before the check runs; if one can no longer appear, the check is skipped.
+    requires: tuple[str, ...] = ('domain',)
+    # Optional inputs: the check waits until each is available or can no longer appear, then runs either way.
+    uses: tuple[str, ...] = ()
+    # Inputs published from the check's report; an extractor returning None publishes nothing.
+    provides: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+    # ValidationOptions flag that enables the check; None means always enabled.
+    option: str | None = None
+    # Report used when the check is disabled or skipped.
+    default: Callable[[], Any] | None = None
+    # The report depends only on the domain, so ValidationOptions.domain_cache may share it between emails.
+    per_domain: bool = False
+    # Runs before every other enabled check; when its report is not valid, the other checks are skipped.
+    precheck: bool = False
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """Which checks are skipped rather than run; see POLICIES for the built-in modes."""
+
+    name: str
+    # Skip every check when the address fails syntax validation.
+    require_syntax: bool = False
+    # Check name -> checks whose reports must be valid; the check waits for them and is skipped if one is not.
+    gates: Mapping[str, tuple[str, ...]] = field(default_factory=dict)
+    # Once a report is invalid, checks that have not been started are skipped.
+    fail_fast: bool = False
+
+
+# DKIM sweeps and TLS handshakes are the expensive checks; they are only worth it for domains that accept mail.
+_EXPENSIVE_CHECK_GATES = {'dkim': ('mx',), 'ssl': ('mx',)}
+
+POLICIES: dict[str, ValidationPolicy] = {
+    policy.name: policy
+    for policy in (
+        ValidationPolicy('full'),
+        ValidationPolicy('syntax', require_syntax=True),
+        ValidationPolicy('tiered', require_syntax=True, gates=_EXPENSIVE_CHECK_GATES),
+        ValidationPolicy('fail_fast', require_syntax=True, gates=_EXPENSIVE_CHECK_GATES, fail_fast=True),
+    )
+}
+
+
+def _run_mx(ctx: CheckContext) -> MXVerificationReport:
+    from .mx import extract_mx_record_info
+
+    return extract_mx_record_info(
+        ctx.email,
+        timeout=ctx.options.timeout,
+        resolver=ctx.options.resolver,
+        normalized_email=ctx.inputs['normalized_email'],
+    )
+
+
+def _run_spf(ctx: CheckContext) -> SPFVerificationReport:
+    from .spf import extract_spf_record_info
+
+    return extract_spf_record_info(ctx.domain, resolver=ctx.options.resolver, timeout=ctx.options.timeout)
+
+
+def _run_dmarc(ctx: CheckContext) -> DMARCVerificationReport:
+    from .dmarc import extract_dmarc_record_info
+
+    opts = ctx.options
+    if not opts.dmarc_org_fallback:
+        return extract_dmarc_record_info(ctx.domain, resolver=opts.resolver, timeout=opts.timeout)
+    from .public_suffix import bundled_public_suffixes
+
+    suffixes = opts.public_suffixes or bundled_public_suffixes()
+    return extract_dmarc_record_info(
+        ctx.domain,
+        resolver=opts.resolver,
+        timeout=opts.timeout,
+        org_domain=suffixes.organizational_domain(ctx.domain),
+        cache=opts.domain_cache,
+    )
+
+
+def _run_dkim(ctx: CheckContext) -> DKIMVerificationReport:
+    from .dkim import extract_dkim_record_info
+    from .providers import detect_providers, prioritize_selectors
+
+    # Selectors of the providers seen in the MX hosts and SPF includes are probed first.
+    mx_hosts, spf_includes = ctx.inputs.get('mx_hosts'), ctx.inputs.get('spf_includes')
+    selectors = prioritize_selectors(mx_hosts, spf_includes, narrow=ctx.options.dkim_narrow_selectors)
+    if (stats := ctx.options.dkim_selector_stats) is None:
+        return extract_dkim_record_info(
+            ctx.domain, resolver=ctx.options.resolver, timeout=ctx.options.timeout, selectors=selectors
+        )
+    # Hit rates are learned per detected provider, so each provider's domains get their own order.
+    providers = detect_providers(mx_hosts, spf_includes)
+    return extract_dkim_record_info(
+        ctx.domain,
+        resolver=ctx.options.resolver,
+        timeout=ctx.options.timeout,
+        selectors=selectors,
+        stats=stats,
+        stats_key=providers[0].name if providers else '',
+    )
+
+
+def _run_ssl(ctx: CheckContext) -> SSLVerificationReport:
+    from .ssl_ import extract_ssl_cert_info
+
+    return extract_ssl_cert_info(ctx.domain, timeout=ctx.options.timeout)
+
+
+def _run_blocklist(ctx: CheckContext) -> BlocklistReport:
+    assert ctx.options.blocklist is not None
+    match = ctx.options.blocklist.match(ctx.domain)
+    return BlocklistReport(valid=match is None, match=match)
+
+
+# Zero-DNS lookup of ValidationOptions.blocklist; a listed domain short-circuits the DNS checks.
+BLOCKLIST_CHECK = Check(
+    name='blocklist',
+    run=_run_blocklist,
+    provides={'blocklist_match': lambda r: r.match},
+    option='blocklist',
+    precheck=True,
+)
+
+BUILTIN_CHECKS: tuple[Check, ...] = (
+    Check(
+        name='mx',
+        run=_run_mx,
+        requires=('normalized_email',),
+        provides={'mx_hosts': lambda r: r.records if r.valid else None},
+        option='run_mx',
+        per_domain=True,
+        default=lambda: MXVerificationReport(valid=False, records=None),
+    ),
+    Check(
+        name='spf',
+        run=_run_spf,
+        provides={
+            'spf_record': lambda r: r.info.record if r.valid and r.info else None,
+            'spf_includes': lambda r: r.info.includes if r.valid and r.info else None,
+        },
+        option='run_spf',
+        per_domain=True,
+        default=lambda: SPFVerificationReport(valid=False, info=None),
+    ),
+    Check(
+        name='dmarc',
+        run=_run_dmarc,
+        provides={'dmarc_record': lambda r: r.record if r.valid else None},
+        option='run_dmarc',
+        per_domain=True,
+        default=lambda: DMARCVerificationReport(valid=False, record=None),
+    ),
+    Check(
+        name='dkim',
+        run=_run_dkim,
+        uses=('mx_hosts', 'spf_includes'),
+        provides={'dkim_record': lambda r: r.record if r.valid else None},
+        option='run_dkim',
+        per_domain=True,
+        default=lambda: DKIMVerificationReport(valid=False, record=None),
+    ),
+    Check(
+        name='ssl',
+        run=_run_ssl,
+        provides={'ssl_cert': lambda r: r.info if r.valid else None},
+        option='run_ssl',
+        per_domain=True,
+        default=lambda: SSLVerificationReport(valid=False, info=None),
+    ),
+)
+
+
+def default_report(check: Check, skipped: bool = False) -> Any:
+    """The report of a built-in check that did not run: its default, with valid=None if it was skipped."""
+    assert check.default is not None
+    report = check.default()
+    return replace(report, valid=None) if skipped else report
+
+
+def _enabled_checks(checks: Iterable[Check], options: ValidationOptions) -> list[Check]:
+    enabled: list[Check] = []
+    names: set[str] = set()
+    for check in checks:
+        if check.name in names:
+            raise PipelineError(f'Duplicate check name: {check.name}')
+        names.add(check.name)
+        if check.option is None or getattr(options, check.option):
+            enabled.append(check)
+    return enabled
+
+
+def _policy(options: ValidationOptions) -> ValidationPolicy:
+    if isinstance(options.policy, ValidationPolicy):
+        return options.policy
+    try:
+        return POLICIES[options.policy]
+    except KeyError as e:
+        raise PipelineError(f'Unknown validation policy: {options.policy}') from e
+
+
+def _gates(policy: ValidationPolicy, check: Check, prechecks: list[str]) -> tuple[str, ...]:
+    # Every check but a precheck is gated on all prechecks, before the policy's own gates.
+    gates = policy.gates.get(check.name, ())
+    return gates if check.precheck else (*prechecks, *gates)
+
+
+def _passed(report: Any) -> bool:
+    # Reports without a `valid` flag (custom checks) never count as failed.
+    return bool(getattr(report, 'valid', True))
+
+
+def _publish(ctx: CheckContext, check: Check, report: Any) -> None:
+    if isinstance(report, CheckErrorReport):
+        return
+    for key, extract in check.provides.items():
+        value = extract(report)
+        if value is not None:
+            ctx.inputs[key] = value
+
+
+def _fetch(check: Check, ctx: CheckContext) -> Any:
+    probe = current_probe()
+    if probe is None:
+        # A bare probe still collects the TTLs of the check's DNS answers.
+        with probing(Probe(check=check.name, domain=ctx.domain)) as probe:
+            report = check.run(ctx)
+    else:
+        report = check.run(ctx)
+    # Reports with an unset `fetched_at` (the built-in ones) are stamped here, once per computation, so cached
+    # reports keep the time their data was fetched and the TTLs it was fetched with.
+    if is_dataclass(report) and not isinstance(report, type) and getattr(report, 'fetched_at', False) is None:
+        stamps: dict[str, Any] = {'fetched_at': time.time()}
+        if getattr(report, 'ttl', False) is None:
+            stamps['ttl'] = probe.ttl
+        report = replace(report, **stamps)
+    return report
+
+
+def _run_once(check: Check, ctx: CheckContext) -> Any:
+    cache = ctx.options.domain_cache
+    if cache is None or not check.per_domain:
+        return _fetch(check, ctx)
+    metrics = ctx.options.metrics
+    if metrics is None:
+        return cache.get_or_compute(check.name, ctx.domain, partial(_fetch, check, ctx))
+    computed = False
+
+    def compute() -> Any:
+        nonlocal computed
+        computed = True
+        return _fetch(check, ctx)
+
+    report = cache.get_or_compute(check.name, ctx.domain, compute)
+    metrics.domain_cache_lookups.inc(check.name, 'miss' if computed else 'hit')
+    return report
+
+
+def _execute(check: Check, ctx: CheckContext) -> tuple[Any, CheckStats | None]:
+    try:
+        return _measure(check, ctx)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # A raising check (typically a user-supplied one) fails alone instead of aborting the whole validation.
+        return CheckErrorReport(valid=False, error=f'{type(e).__name__}: {e}'), None
+
+
+def _measure(check: Check, ctx: CheckContext) -> tuple[Any, CheckStats | None]:
+    opts = ctx.options
+    if not opts.collect_stats and opts.hooks is None and opts.metrics is None:
+        return _run_once(check, ctx), None
+    stats = CheckStats() if opts.collect_stats else None
+    start = perf_counter()
+    try:
+        with probing(Probe(check=check.name, domain=ctx.domain, stats=stats, hooks=opts.hooks, metrics=opts.metrics)):
+            if opts.metrics is None:
+                report = _run_once(check, ctx)
+            else:
+                with opts.metrics.checks_in_flight.track(check.name), opts.metrics.check_duration.time(check.name):
+                    report = _run_once(check, ctx)
+    finally:
+        if opts.hooks is not None:
+            duration_ms = round((perf_counter() - start) * 1000, 3)
+            opts.hooks.on_check(CheckEvent(check=check.name, domain=ctx.domain, duration_ms=duration_ms))
+    return report, stats
+
+
+def run_checks(  # pylint: disable=too-many-locals
+    ctx: CheckContext,
+    checks: Iterable[Check],
+    max_workers: int = 5,
+    stats: dict[str, CheckStats] | None = None,
+    skipped: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Run every enabled check as soon as its required inputs are available, up to max_workers at a time, on
+    options.check_executor (CHECK_EXECUTOR by default).
+    Returns the reports of the checks that ran; skipped and disabled checks are absent, and a check that raised
+    reports a CheckErrorReport.
+    Skipped checks (missing inputs or options.policy) are added to `skipped` in declaration order.
+    With options.collect_stats, per-check stats are added to `stats`.
+    """
+    policy = _policy(ctx.options)
+    pending = _enabled_checks(checks, ctx.options)
+    enabled = [check.name for check in pending]
+    prechecks = [check.name for check in pending if check.precheck]
+    reports: dict[str, Any] = {}
+    running: dict[Future[tuple[Any, CheckStats | None]], Check] = {}
+    dropped: set[str] = set()
+    failed = not all(map(_passed, ctx.reports.values()))
+    if policy.require_syntax and 'normalized_email' not in ctx.inputs:
+        dropped.update(enabled)
+        pending.clear()
+
+    def can_appear(key: str) -> bool:
+        return key in ctx.inputs or any(key in c.provides for c in (*pending, *running.values()))
+
+    def gate(check: Check) -> bool | None:
+        # True once every enabled gating check has passed, False if one failed or was skipped, None while waiting.
+        waiting = False
+        for name in _gates(policy, check, prechecks):
+            if name in dropped or not _passed(reports.get(name, ctx.reports.get(name))):
+                return False
+            waiting = waiting or (name in enabled and name not in reports)
+        return None if waiting else True
+
+    workers = max(1, max_workers)
+    pool = ctx.options.check_executor or CHECK_EXECUTOR
+    while pending or running:
+        # Repeat until stable: skipping one check can strand the checks that wait on its outputs.
+        changed = True
+        while changed:
+            changed = False
+            for check in list(pending):
+                opened = gate(check)
+                if (failed and policy.fail_fast) or opened is False or not all(map(can_appear, check.requires)):
+                    pending.remove(check)
+                    dropped.add(check.name)
+                    changed = True
+                    continue
+                settled = all(key in ctx.inputs or not can_appear(key) for key in check.uses)
+                # Submitted only when a worker is free, so fail-fast can still skip checks that would queue.
+                ready = opened and settled and all(key in ctx.inputs for key in check.requires)
+                if ready and len(running) < workers:
+                    pending.remove(check)
+                    # Each check gets a snapshot, so inputs published meanwhile never race with its reads.
+                    running[pool.submit(_execute, check, replace(ctx, inputs=dict(ctx.inputs)))] = check
+                    changed = True
+        if not running:
+            # Whatever is left waits on inputs only other pending checks could provide (a cycle).
+            dropped.update(check.name for check in pending)
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            check = running.pop(future)
+            reports[check.name], check_stats = future.result()
+            if stats is not None and check_stats is not None:
+                stats[check.name] = check_stats
+            failed = failed or not _passed(reports[check.name])
+            _publish(ctx, check, reports[check.name])
+    if skipped is not None:
+        skipped.extend(name for name in enabled if name in dropped)
+    return reports
+
+
+class OnDemandChecks:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs each enabled check the first time its report is requested, after the checks it depends on: the providers
+    of its required and optional inputs and its policy gates. Reports are memoized, and concurrent requests for the
+    same check share one run. Checks that depend on each other in a cycle are skipped.
+    """
+
+    def __init__(self, ctx: CheckContext, checks: Iterable[Check], stats: dict[str, CheckStats] | None = None) -> None:
+        self._ctx = ctx
+        self._policy = _policy(ctx.options)
+        self._checks = {check.name: check for check in _enabled_checks(checks, ctx.options)}
+        self._prechecks = [name for name, check in self._checks.items() if check.precheck]
+        self._stats = stats
+        self._futures: dict[str, Future[Any]] = {}
+        self._dropped: set[str] = set(self._cyclic())
+        self._failed = not all(map(_passed, ctx.reports.values()))
+        self._lock = threading.Lock()
+        if self._policy.require_syntax and 'normalized_email' not in ctx.inputs:
+            self._dropped.update(self._checks)
+
+    @property
+    def skipped(self) -> list[str]:
+        """Checks skipped so far, in declaration order."""
+        with self._lock:
+            return [name for name in self._checks if name in self._dropped]
+
+    def report(self, name: str) -> Any:
+        """The check's report, running it first if needed; None when the check is disabled or skipped."""
+        if name not in self._checks:
+            return None
+        with self._lock:
+            waiting = self._futures.get(name)
+            if waiting is None:
+                owner: Future[Any] = Future()
+                self._futures[name] = owner
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            report = self._run(self._checks[name])
+        except BaseException as e:
+            owner.set_exception(e)
+            raise
+        owner.set_result(report)
+        return report
+
+    def reports(self) -> dict[str, Any]:
+        """Run every remaining check; returns the reports of the checks that ran, like run_checks()."""
+        for name in self._checks:
+            self.report(name)
+        with self._lock:
+            return {name: self._futures[name].result() for name in self._checks if name not in self._dropped}
+
+    def prefetch(self, max_workers: int = 5) -> None:
+        """Start every remaining check in the background; later requests wait for the running checks."""
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='prefetch')
+        for name in self._checks:
+            pool.submit(self.report, name)
+        pool.shutdown(wait=False)
+
+    def _run(self, check: Check) -> Any:
+        if check.name in self._dropped:
+            return None
+        for name in self._dependencies(check):
+            self.report(name)
+        gates = _gates(self._policy, check, self._prechecks)
+        with self._lock:
+            if (
+                (self._failed and self._policy.fail_fast)
+                or any(name in self._dropped or not _passed(self._gate_report(name)) for name in gates)
+                or not all(key in self._ctx.inputs for key in check.requires)
+            ):
+                self._dropped.add(check.name)
+                return None
+            # The check reads a snapshot, so inputs published by concurrent checks never race with its reads.
+            ctx = replace(self._ctx, inputs=dict(self._ctx.inputs))
+        report, check_stats = _execute(check, ctx)
+        with self._lock:
+            if self._stats is not None and check_stats is not None:
+                self._stats[check.name] = check_stats
+            self._failed = self._failed or not _passed(report)
+            _publish(self._ctx, check, report)
+        return report
+
+    def _gate_report(self, name: str) -> Any:
+        # Gates are reported by enabled checks, which ran before this one, or carried in the context.
+        return self._futures[name].result() if name in self._checks else self._ctx.reports.get(name)
+
+    def _dependencies(self, check: Check) -> list[str]:
+        keys = {*check.requires, *check.uses}
+        gates = _gates(self._policy, check, self._prechecks)
+        return [
+            other.name
+            for other in self._checks.values()
+            if other is not check and (other.name in gates or not keys.isdisjoint(other.provides))
+        ]
+
+    def _cyclic(self) -> set[str]:
+        dependencies = {name: self._dependencies(check) for name, check in self._checks.items()}
+        cyclic: set[str] = set()
+        for name, direct in dependencies.items():
+            seen: set[str] = set()
+            stack = list(direct)
+            while stack:
+                current = stack.pop()
+                if current == name:
+                    cyclic.add(name)
+                    break
+                if current not in seen:
+                    seen.add(current)
+                    stack.extend(dependencies[current])
+        return cyclic
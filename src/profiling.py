@@ -0,0 +1,95 @@
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from .instrumentation import CheckEvent, DNSQueryEvent, TLSProbeEvent, ValidationHooks
+
+# Report order; checks added through ValidationOptions.checks follow in the order they were first seen.
+STAGES = ('syntax', 'mx', 'spf', 'dmarc', 'dkim', 'ssl')
+
+
+@dataclass
+class StageTiming:
+    calls: int = 0
+    total_ms: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'calls': self.calls, 'total_ms': round(self.total_ms, 3), 'mean_ms': round(self.mean_ms, 3)}
+
+
+def _dns_label(event: DNSQueryEvent) -> str:
+    # Labels name what was looked up rather than the full query, so a batch aggregates across domains.
+    name = event.name.rstrip('.').lower()
+    if event.check == 'mx':
+        return event.rdtype
+    if event.check == 'spf':
+        return 'record' if name == event.domain.lower() else f'include {name}'
+    if event.check == 'dmarc':
+        return 'record'
+    if event.check == 'dkim':
+        return f'selector {name.split(".", 1)[0]}'
+    return f'{event.rdtype} {name}'
+
+
+class Profiler(ValidationHooks):
+    """
+    Hooks that add up the time spent per stage and per step within it: each DNS query (SPF include,
+    DKIM selector, ...) and the TLS connect, handshake and certificate parse. Share one instance across
+    a batch to aggregate over all inputs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageTiming] = {}
+        self._steps: dict[str, dict[str, StageTiming]] = {}
+
+    def _add(self, stage: str, step: str | None, duration_ms: float) -> None:
+        with self._lock:
+            if step is None:
+                timing = self._stages.setdefault(stage, StageTiming())
+            else:
+                timing = self._steps.setdefault(stage, {}).setdefault(step, StageTiming())
+            timing.calls += 1
+            timing.total_ms += duration_ms
+
+    def on_check(self, event: CheckEvent) -> None:
+        self._add(event.check, None, event.duration_ms)
+
+    def on_dns_query(self, event: DNSQueryEvent) -> None:
+        self._add(event.check, _dns_label(event), event.duration_ms)
+
+    def on_tls_probe(self, event: TLSProbeEvent) -> None:
+        self._add(event.check, 'connect', event.connect_ms)
+        # A probe that failed to connect never reached the handshake.
+        if event.outcome == 'ok' or event.handshake_ms:
+            self._add(event.check, 'handshake', event.handshake_ms)
+        if event.outcome == 'ok':
+            # Reading and decoding the certificate, and looking up the reported address.
+            self._add(event.check, 'parse', event.duration_ms - event.connect_ms - event.handshake_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            order = {name: i for i, name in enumerate(STAGES)}
+            names = sorted(dict.fromkeys([*self._stages, *self._steps]), key=lambda name: order.get(name, len(order)))
+            stages = {}
+            for name in names:
+                entry = self._stages.get(name, StageTiming()).to_dict()
+                steps = sorted(self._steps.get(name, {}).items(), key=lambda item: -item[1].total_ms)
+                if steps:
+                    entry['steps'] = {step: timing.to_dict() for step, timing in steps}
+                stages[name] = entry
+            return {'validations': self._stages.get('syntax', StageTiming()).calls, 'stages': stages}
+
+    def render(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f'{"stage":<48} {"calls":>7} {"total ms":>12} {"mean ms":>10}']
+        for name, entry in snapshot['stages'].items():
+            rows = [(name, entry), *((f'  {step}', timing) for step, timing in entry.get('steps', {}).items())]
+            for label, timing in rows:
+                lines.append(f'{label:<48} {timing["calls"]:>7} {timing["total_ms"]:>12.2f} {timing["mean_ms"]:>10.2f}')
+        lines.append(f'{snapshot["validations"]} validation(s)')
+        return '\n'.join(lines) + '\n'
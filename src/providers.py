@@ -0,0 +1,122 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .models import DKIM_SELECTORS
+
+
+@dataclass(frozen=True)
+class ProviderFingerprint:
+    name: str
+    # Domain suffixes of the provider's MX hosts and SPF include targets.
+    mx_suffixes: tuple[str, ...] = ()
+    spf_includes: tuple[str, ...] = ()
+    # DKIM selectors the provider signs with, most common first.
+    selectors: tuple[str, ...] = ()
+
+
+PROVIDER_FINGERPRINTS: tuple[ProviderFingerprint, ...] = (
+    ProviderFingerprint(
+        'google',
+        mx_suffixes=('google.com', 'googlemail.com'),
+        spf_includes=('_spf.google.com',),
+        selectors=('google', '20230601', '20221208', '20210112', '20161025', '20150623', '20120113'),
+    ),
+    ProviderFingerprint(
+        'microsoft',
+        mx_suffixes=('protection.outlook.com', 'outlook.com', 'hotmail.com'),
+        spf_includes=('spf.protection.outlook.com', 'outlook.com'),
+        selectors=('selector1', 'selector2', 'selector3', 's1-microsoft', 's2-microsoft'),
+    ),
+    ProviderFingerprint(
+        'amazonses',
+        mx_suffixes=('amazonaws.com',),
+        spf_includes=('amazonses.com',),
+        selectors=('amazonses',),
+    ),
+    ProviderFingerprint('sendgrid', spf_includes=('sendgrid.net',), selectors=('s1', 's2', 'sendgrid', 'smtpapi')),
+    ProviderFingerprint(
+        'mailchimp',
+        spf_includes=('servers.mcsv.net', 'mandrillapp.com'),
+        selectors=('k1', 'k2', 'k3', 'mandrill'),
+    ),
+    ProviderFingerprint('mailgun', spf_includes=('mailgun.org',), selectors=('mg', 'k1', 'smtp', 'mailo', 'krs')),
+    ProviderFingerprint(
+        'fastmail',
+        mx_suffixes=('messagingengine.com',),
+        spf_includes=('messagingengine.com',),
+        selectors=('fm1', 'fm2', 'fm3', 'mesmtp'),
+    ),
+    ProviderFingerprint('postmark', spf_includes=('mtasv.net',), selectors=('pm', 'postmark')),
+    ProviderFingerprint('mailjet', spf_includes=('mailjet.com',), selectors=('mailjet',)),
+    ProviderFingerprint('sparkpost', spf_includes=('sparkpostmail.com',), selectors=('sparkpost',)),
+    ProviderFingerprint('campaign_monitor', spf_includes=('createsend.com',), selectors=('cm',)),
+    ProviderFingerprint(
+        'protonmail',
+        mx_suffixes=('protonmail.ch', 'proton.me'),
+        spf_includes=('protonmail.ch',),
+        selectors=('protonmail', 'protonmail2', 'protonmail3'),
+    ),
+    ProviderFingerprint(
+        'zoho',
+        mx_suffixes=('zoho.com', 'zoho.eu', 'zohomail.com'),
+        spf_includes=('zoho.com', 'zoho.eu', 'zohomail.com'),
+        selectors=('zoho', 'zmail'),
+    ),
+    ProviderFingerprint(
+        'yahoo',
+        mx_suffixes=('yahoodns.net',),
+        spf_includes=('mail.yahoo.com',),
+        selectors=('s1024', 's2048'),
+    ),
+    ProviderFingerprint(
+        'rackspace',
+        mx_suffixes=('emailsrvr.com',),
+        spf_includes=('emailsrvr.com',),
+        selectors=('rackspace1', 'rackspace2'),
+    ),
+    ProviderFingerprint('hubspot', spf_includes=('hubspotemail.net',), selectors=('hs1', 'hs2')),
+    ProviderFingerprint('salesforce', spf_includes=('salesforce.com',), selectors=('sf1', 'sf2')),
+    ProviderFingerprint('turbosmtp', spf_includes=('turbo-smtp.com',), selectors=('turbo-smtp',)),
+)
+
+
+def _matches(name: str, suffixes: tuple[str, ...]) -> bool:
+    name = name.rstrip('.').lower()
+    return any(name == suffix or name.endswith(f'.{suffix}') for suffix in suffixes)
+
+
+def detect_providers(
+    mx_hosts: Iterable[str] | None = None,
+    spf_includes: Iterable[str] | None = None,
+    fingerprints: Iterable[ProviderFingerprint] = PROVIDER_FINGERPRINTS,
+) -> list[ProviderFingerprint]:
+    """Providers whose MX hosts or SPF includes appear for the domain; MX matches first, then SPF in include order."""
+    fingerprints = tuple(fingerprints)
+    found: dict[str, ProviderFingerprint] = {}
+    for host in mx_hosts or ():
+        for provider in fingerprints:
+            if provider.name not in found and _matches(host, provider.mx_suffixes):
+                found[provider.name] = provider
+    for include in spf_includes or ():
+        for provider in fingerprints:
+            if provider.name not in found and _matches(include, provider.spf_includes):
+                found[provider.name] = provider
+    return list(found.values())
+
+
+def prioritize_selectors(
+    mx_hosts: Iterable[str] | None = None,
+    spf_includes: Iterable[str] | None = None,
+    selectors: Iterable[str] | None = None,
+    *,
+    narrow: bool = False,
+) -> list[str]:
+    """
+    DKIM selectors to probe for a domain: those of the providers detected from its MX hosts and SPF includes
+    first, then the rest of `selectors` (default: DKIM_SELECTORS). With narrow=True only the providers'
+    selectors are returned when any provider was detected.
+    """
+    preferred = [selector for provider in detect_providers(mx_hosts, spf_includes) for selector in provider.selectors]
+    if narrow and preferred:
+        return list(dict.fromkeys(preferred))
+    return list(dict.fromkeys([*preferred, *(DKIM_SELECTORS if selectors is None else selectors)]))
@@ -0,0 +1,73 @@
+from collections.abc import Iterable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import ClassVar
+
+from .domain_index import DomainIndex, write_domain_index
+from .email_validation import canonical_domain
+from .exceptions import DomainIndexError, PublicSuffixError
+
+# Compiled from https://publicsuffix.org/list/public_suffix_list.dat (Mozilla Public License 2.0).
+BUNDLED_INDEX = Path(__file__).with_name('public_suffix.idx')
+
+
+def _read_rules(lines: Iterable[str]) -> Iterator[str]:
+    # One rule per line, '//' comments; wildcard ('*.') and exception ('!') markers are kept around the
+    # canonical (IDNA-encoded) name.
+    for line in lines:
+        rule = line.split(maxsplit=1)[0] if line.strip() else ''
+        if not rule or rule.startswith('//'):
+            continue
+        for marker in ('!', '*.'):
+            if rule.startswith(marker):
+                yield marker + canonical_domain(rule.removeprefix(marker))
+                break
+        else:
+            yield canonical_domain(rule)
+
+
+def compile_public_suffix_list(source: Path, output: Path) -> int:
+    """Compile a public suffix list (public_suffix_list.dat) into an index for PublicSuffixIndex."""
+    try:
+        with open(source, encoding='utf-8') as lines:
+            rules = list(_read_rules(lines))
+    except (OSError, UnicodeDecodeError) as e:
+        raise PublicSuffixError(f'Cannot read public suffix list: {e}') from e
+    return write_domain_index(rules, output, PublicSuffixIndex.MAGIC)
+
+
+class PublicSuffixIndex(DomainIndex):
+    """
+    Memory-mapped public suffix rules compiled by compile_public_suffix_list() (see DomainIndex). Each lookup
+    probes the rules for the domain's suffixes, longest first, so loading never parses the list.
+    """
+
+    MAGIC: ClassVar[bytes] = b'EDVPSL01'
+
+    def __init__(self, path: Path) -> None:
+        try:
+            super().__init__(path)
+        except DomainIndexError as e:
+            raise PublicSuffixError(f'Invalid public suffix index: {e}') from e
+
+    def public_suffix(self, domain: str) -> str:
+        """The longest matching rule's suffix of `domain`; exception rules win, and unlisted TLDs are suffixes."""
+        labels = canonical_domain(domain).split('.')
+        for start in range(len(labels)):
+            candidate = '.'.join(labels[start:])
+            if self.find(f'!{candidate}'):
+                return '.'.join(labels[start + 1 :])
+            if self.find(candidate) or (start + 1 < len(labels) and self.find(f'*.{".".join(labels[start + 1 :])}')):
+                return candidate
+        return labels[-1]
+
+    def organizational_domain(self, domain: str) -> str:
+        """RFC 7489 organizational domain: the public suffix plus one label (the domain itself if it is a suffix)."""
+        labels = canonical_domain(domain).split('.')
+        return '.'.join(labels[-(self.public_suffix(domain).count('.') + 2) :])
+
+
+@cache
+def bundled_public_suffixes() -> PublicSuffixIndex:
+    """The index compiled from the public suffix list shipped with the package, mapped once per process."""
+    return PublicSuffixIndex(BUNDLED_INDEX)
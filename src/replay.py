@@ -0,0 +1,179 @@
+import base64
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, cast
+
+import dns.message
+import dns.name
+import dns.resolver
+from dns.rdataclass import RdataClass
+from dns.rdatatype import RdataType
+
+from .exceptions import RecordingError
+
+if TYPE_CHECKING:
+    from dns.resolver import Answer, Resolver
+
+FORMAT = 'email-domain-validator/dns-recording'
+VERSION = 1
+
+_ERRORS: dict[type[Exception], str] = {
+    dns.resolver.NXDOMAIN: 'nxdomain',
+    dns.resolver.NoAnswer: 'no_answer',
+    dns.resolver.NoNameservers: 'no_nameservers',
+    dns.resolver.LifetimeTimeout: 'timeout',
+}
+
+
+@dataclass
+class RecordedQuery:
+    name: str
+    rdtype: str
+    # 'ok' or the error kind: 'nxdomain', 'no_answer', 'no_nameservers', 'timeout'.
+    outcome: str
+    latency_ms: float
+    # Wire-format response of an 'ok' query.
+    response: bytes | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {'q': self.name, 't': self.rdtype, 'o': self.outcome, 'ms': self.latency_ms}
+        if self.response is not None:
+            data['w'] = base64.b64encode(self.response).decode('ascii')
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'RecordedQuery':
+        wire = data.get('w')
+        return cls(
+            name=data['q'],
+            rdtype=data['t'],
+            outcome=data['o'],
+            latency_ms=data['ms'],
+            response=base64.b64decode(wire) if wire is not None else None,
+        )
+
+
+def _key(qname: 'dns.name.Name | str', rdtype: RdataType) -> tuple[str, str]:
+    name = qname.to_text() if isinstance(qname, dns.name.Name) else qname
+    return name.rstrip('.').lower(), rdtype.name
+
+
+def _rdtype_arg(args: tuple[Any, ...], kwargs: dict[str, Any]) -> RdataType:
+    return RdataType.make(args[0] if args else kwargs.get('rdtype', RdataType.A))
+
+
+def save_recording(path: Path, queries: list[RecordedQuery]) -> None:
+    # Gzipped NDJSON: a header line, then one line per (name, type).
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({'format': FORMAT, 'version': VERSION}) + '\n')
+        for query in queries:
+            f.write(json.dumps(query.to_dict(), separators=(',', ':')) + '\n')
+
+
+def load_recording(path: Path) -> dict[tuple[str, str], RecordedQuery]:
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != FORMAT or header.get('version') != VERSION:
+                raise RecordingError(f'Not a DNS recording: {path}')
+            queries = (RecordedQuery.from_dict(json.loads(line)) for line in f if line.strip())
+            return {(q.name, q.rdtype): q for q in queries}
+    except (OSError, EOFError, KeyError, AttributeError, ValueError) as e:
+        raise RecordingError(f'Cannot read DNS recording: {path}') from e
+
+
+class RecordingResolver(dns.resolver.Resolver):
+    """
+    Resolver that forwards every query to `resolver` and records its answer or error and latency.
+    The first observation of each (name, type) is kept, so later cache hits do not mask upstream latency.
+    """
+
+    def __init__(self, resolver: 'Resolver | None' = None) -> None:
+        super().__init__(configure=False)
+        self._resolver = resolver or dns.resolver.get_default_resolver()
+        self._recorded: dict[tuple[str, str], RecordedQuery] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recorded(self) -> int:
+        # Not __len__: an empty recorder must stay truthy for `resolver or default` call sites.
+        return len(self._recorded)
+
+    def resolve(self, qname: 'dns.name.Name | str', *args: Any, **kwargs: Any) -> 'Answer':
+        name, rdtype = _key(qname, _rdtype_arg(args, kwargs))
+        start = perf_counter()
+        try:
+            answer = self._resolver.resolve(qname, *args, **kwargs)
+        except (
+            dns.resolver.NXDOMAIN,
+            dns.resolver.NoAnswer,
+            dns.resolver.NoNameservers,
+            dns.resolver.LifetimeTimeout,
+        ) as e:
+            self._record(
+                RecordedQuery(
+                    name,
+                    rdtype,
+                    next(kind for error, kind in _ERRORS.items() if isinstance(e, error)),
+                    _elapsed_ms(start),
+                )
+            )
+            raise
+        response = answer.response.to_wire() if answer.response is not None else None
+        self._record(RecordedQuery(name, rdtype, 'ok', _elapsed_ms(start), response))
+        return answer
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            queries = list(self._recorded.values())
+        save_recording(path, queries)
+
+    def _record(self, query: RecordedQuery) -> None:
+        with self._lock:
+            self._recorded.setdefault((query.name, query.rdtype), query)
+
+
+class ReplayResolver(dns.resolver.Resolver):
+    """
+    Resolver that answers from a recording made by RecordingResolver, without network access.
+    With `latency`, each answer is delayed by its recorded latency. Queries missing from the recording
+    fail with NoNameservers and are counted in `misses`.
+    """
+
+    def __init__(self, path: Path, *, latency: bool = False) -> None:
+        super().__init__(configure=False)
+        self._recorded = load_recording(path)
+        self._latency = latency
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def resolve(self, qname: 'dns.name.Name | str', *args: Any, **kwargs: Any) -> 'Answer':
+        rdtype = _rdtype_arg(args, kwargs)
+        query = self._recorded.get(_key(qname, rdtype))
+        name = dns.name.from_text(qname) if isinstance(qname, str) else qname
+        if query is None:
+            with self._lock:
+                self.misses += 1
+            request = dns.message.make_query(name, rdtype)
+            raise dns.resolver.NoNameservers(request=request, errors=[])
+        if self._latency:
+            time.sleep(query.latency_ms / 1000)
+        if query.outcome == 'ok' and query.response is not None:
+            response = cast(dns.message.QueryMessage, dns.message.from_wire(query.response))
+            return dns.resolver.Answer(name, rdtype, RdataClass.IN, response)
+        if query.outcome == 'nxdomain':
+            raise dns.resolver.NXDOMAIN(qnames=[name])
+        if query.outcome == 'timeout':
+            raise dns.resolver.LifetimeTimeout(timeout=query.latency_ms / 1000, errors={})
+        if query.outcome == 'no_nameservers':
+            raise dns.resolver.NoNameservers(request=dns.message.make_query(name, rdtype), errors=[])
+        raise dns.resolver.NoAnswer()
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((perf_counter() - start) * 1000, 3)
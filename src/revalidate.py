@@ -0,0 +1,225 @@
+import json
+import time
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import IO, Any
+
+from .cache import DomainReportCache
+from .models import CheckErrorReport, CheckStats, EmailDomainValidationResult, SSLVerificationReport, ValidationOptions
+from .pipeline import BUILTIN_CHECKS, Check, CheckContext, default_report, run_checks
+
+DAY = 86_400
+
+# How long a report is carried forward before its check runs again, in seconds.
+DEFAULT_MAX_AGE: dict[str, float] = {
+    'mx': 30 * DAY,
+    'spf': 30 * DAY,
+    'dmarc': 30 * DAY,
+    'dkim': 30 * DAY,
+    'ssl': 30 * DAY,
+}
+
+# Fields that change without the domain changing; they never count as a difference.
+_VOLATILE_FIELDS = frozenset({'fetched_at', 'ttl', 'info.days_left', 'info.cert_age'})
+
+
+@dataclass
+class Revalidation:
+    result: EmailDomainValidationResult
+    # Checks that ran again; every other report was carried forward.
+    rechecked: list[str]
+    # Check name -> changed field (dotted path) -> [before, after].
+    changes: dict[str, dict[str, list[Any]]] = field(default_factory=dict)
+
+
+@dataclass
+class RevalidationSummary:
+    results: int = 0
+    # Check name -> results whose report was re-run.
+    rechecked: dict[str, int] = field(default_factory=dict)
+    changed_domains: int = 0
+
+
+def _flatten(data: dict[str, Any], prefix: str = '') -> dict[str, Any]:
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def _diff(before: Any, after: Any) -> dict[str, list[Any]]:
+    old, new = _flatten(asdict(before)), _flatten(asdict(after))
+    return {
+        key: [old.get(key), new.get(key)]
+        for key in dict.fromkeys([*old, *new])
+        if key not in _VOLATILE_FIELDS and old.get(key) != new.get(key)
+    }
+
+
+def stale_checks(
+    result: EmailDomainValidationResult,
+    now: float,
+    max_age: Mapping[str, float] | None = None,
+    cert_margin_days: int = 14,
+    honor_ttl: bool = False,
+) -> list[str]:
+    """
+    Built-in checks of a previous result that must run again: reports never fetched (skipped or disabled),
+    reports older than `max_age` (seconds per check, default: DEFAULT_MAX_AGE), and certificates that expire
+    within `cert_margin_days`. With honor_ttl=True, reports whose DNS TTL has run out are stale as well.
+    """
+    limits = {**DEFAULT_MAX_AGE, **(max_age or {})}
+    stale: list[str] = []
+    for check in BUILTIN_CHECKS:
+        report = getattr(result, check.name)
+        if report.fetched_at is None or now - report.fetched_at >= limits[check.name]:
+            stale.append(check.name)
+        elif honor_ttl and (ttl := getattr(report, 'ttl', None)) is not None and now - report.fetched_at >= ttl:
+            stale.append(check.name)
+        elif isinstance(report, SSLVerificationReport) and report.info is not None:
+            days_left = report.info.days_left - (now - report.fetched_at) / DAY
+            if days_left <= cert_margin_days:
+                stale.append(check.name)
+    return stale
+
+
+def _context(previous: EmailDomainValidationResult, options: ValidationOptions, rerun: list[Check]) -> CheckContext:
+    email = previous.normalized_email or previous.domain
+    context = CheckContext(
+        email=email, domain=previous.domain, options=options, inputs={'email': email, 'domain': previous.domain}
+    )
+    if previous.normalized_email is not None:
+        context.inputs['normalized_email'] = previous.normalized_email
+    # Carried reports publish their inputs, so that a re-run DKIM check still orders its selectors by MX and SPF,
+    # and gate the re-run checks like reports of the same run, so that tiered DKIM and SSL wait for a valid MX.
+    for check in BUILTIN_CHECKS:
+        if check not in rerun:
+            context.reports[check.name] = getattr(previous, check.name)
+            for key, extract in check.provides.items():
+                if (value := extract(getattr(previous, check.name))) is not None:
+                    context.inputs[key] = value
+    return context
+
+
+def _revalidate(
+    previous: EmailDomainValidationResult,
+    options: ValidationOptions,
+    enabled: set[str],
+    stale: list[str],
+) -> Revalidation:
+    rerun = [check for check in BUILTIN_CHECKS if check.name in stale and check.name in enabled]
+    context = _context(previous, options, rerun)
+    skipped: list[str] = []
+    stats: dict[str, CheckStats] | None = {} if options.collect_stats else None
+    reports = run_checks(context, rerun, max_workers=options.check_workers, stats=stats, skipped=skipped)
+    updated: dict[str, Any] = {}
+    for check in rerun:
+        if isinstance(reports.get(check.name), CheckErrorReport):
+            # A check that raised keeps its previous report, which stays stale for the next run.
+            continue
+        if check.name in skipped and check.name in previous.skipped:
+            # Still skipped by the policy: nothing ran, so the previous report is carried.
+            continue
+        report = reports.get(check.name)
+        updated[check.name] = default_report(check, check.name in skipped) if report is None else report
+    result = replace(
+        previous,
+        skipped=[
+            check.name
+            for check in BUILTIN_CHECKS
+            if check.name in (skipped if check.name in updated else previous.skipped)
+        ],
+        stats=stats,
+        **updated,
+    )
+    changes = {name: diff for name, report in updated.items() if (diff := _diff(getattr(previous, name), report))}
+    return Revalidation(result=result, rechecked=list(updated), changes=changes)
+
+
+def iter_revalidate(  # pylint: disable=too-many-arguments
+    previous: Iterable[EmailDomainValidationResult],
+    *,
+    options: ValidationOptions | None = None,
+    window: int = 16,
+    max_age: Mapping[str, float] | None = None,
+    cert_margin_days: int = 14,
+    honor_ttl: bool = False,
+    now: float | None = None,
+) -> Generator[Revalidation]:
+    """
+    Bring previous results up to date in input order, re-running only their stale checks (see stale_checks())
+    and carrying the other reports forward. Checks disabled in `options` are always carried. A domain is
+    re-checked once per run: the reports are shared through options.domain_cache, which is created when unset.
+    """
+    opts = replace(options or ValidationOptions())
+    if opts.domain_cache is None:
+        opts.domain_cache = DomainReportCache()
+    now = time.time() if now is None else now
+    enabled = {check.name for check in BUILTIN_CHECKS if check.option is None or getattr(opts, check.option)}
+
+    window = max(1, window)
+    with ThreadPoolExecutor(max_workers=window, thread_name_prefix='revalidator') as pool:
+        queue: deque[Future[Revalidation]] = deque()
+        for result in previous:
+            stale = stale_checks(result, now, max_age, cert_margin_days, honor_ttl)
+            queue.append(pool.submit(_revalidate, result, opts, enabled, stale))
+            if len(queue) >= window:
+                yield queue.popleft().result()
+        while queue:
+            yield queue.popleft().result()
+
+
+def _read_results(lines: Iterable[str]) -> Iterator[EmailDomainValidationResult]:
+    for line in lines:
+        if line.strip():
+            yield EmailDomainValidationResult.from_dict(json.loads(line))
+
+
+def run_revalidation(  # pylint: disable=too-many-arguments
+    previous_path: Path,
+    output: IO[bytes],
+    *,
+    diff: IO[bytes] | None = None,
+    options: ValidationOptions | None = None,
+    window: int = 16,
+    max_age: Mapping[str, float] | None = None,
+    cert_margin_days: int = 14,
+    honor_ttl: bool = False,
+) -> RevalidationSummary:
+    """
+    Revalidate the NDJSON results of a previous run into `output`, in the same order. The changes of each domain
+    are written to `diff` as one NDJSON line per changed domain: {"domain": ..., "changes": {check: {field: [before,
+    after]}}}.
+    """
+    summary = RevalidationSummary()
+    changed: set[str] = set()
+    with open(previous_path, encoding='utf-8') as lines:
+        for revalidation in iter_revalidate(
+            _read_results(lines),
+            options=options,
+            window=window,
+            max_age=max_age,
+            cert_margin_days=cert_margin_days,
+            honor_ttl=honor_ttl,
+        ):
+            output.write(json.dumps(revalidation.result.to_dict()).encode('utf-8') + b'\n')
+            summary.results += 1
+            for name in revalidation.rechecked:
+                summary.rechecked[name] = summary.rechecked.get(name, 0) + 1
+            domain = revalidation.result.domain
+            if revalidation.changes and domain not in changed:
+                changed.add(domain)
+                if diff is not None:
+                    line = {'domain': domain, 'changes': revalidation.changes}
+                    diff.write(json.dumps(line).encode('utf-8') + b'\n')
+    output.flush()
+    if diff is not None:
+        diff.flush()
+    summary.changed_domains = len(changed)
+    return summary
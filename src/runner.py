@@ -1,7 +1,13 @@
-from .dkim import extract_dkim_record_info
-from .dmarc import extract_dmarc_record_info
-from .email_validation import get_domain_from_email, normalize_email
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import Any, cast
+
+from .instrumentation import CheckEvent, collect_stats
 from .models import (
+    CheckErrorReport,
+    CheckStats,
     DKIMVerificationReport,
     DMARCVerificationReport,
     EmailDomainValidationResult,
@@ -10,9 +16,7 @@ from .models import (
     SSLVerificationReport,
     ValidationOptions,
 )
-from .mx import extract_mx_record_info
-from .spf import extract_spf_record_info
-from .ssl_ import extract_ssl_cert_info
+from .pipeline import BLOCKLIST_CHECK, BUILTIN_CHECKS, CheckContext, OnDemandChecks, default_report, run_checks
 
 
 def validate_email_and_domain(
@@ -20,41 +24,197 @@ def validate_email_and_domain(
     *,
     options: ValidationOptions | None = None,
 ) -> EmailDomainValidationResult:
-    opts = options or ValidationOptions()
-    timeout = opts.timeout
-    resolver = opts.resolver
-    domain = get_domain_from_email(email)
+    metrics = options.metrics if options is not None else None
+    if metrics is None:
+        return _validate(email, options)
+    with metrics.validations_in_flight.track(), metrics.validation_duration.time():
+        result = _validate(email, options)
+    metrics.validations.inc(str(result.email_valid).lower())
+    return result
+
+
+def _normalize(email: str, domain: str, opts: ValidationOptions) -> tuple[str | None, dict[str, CheckStats] | None]:
+    from .email_validation import normalize_email  # pylint: disable=import-outside-toplevel
 
-    normalized_email: str | None = normalize_email(email, check_deliverability=False)
-    email_valid = normalized_email is not None
+    stats: dict[str, CheckStats] | None = None
+    start = perf_counter()
+    if opts.collect_stats:
+        with collect_stats(CheckStats()) as syntax_stats:
+            normalized_email = normalize_email(email, check_deliverability=False)
+        stats = {'syntax': syntax_stats}
+    else:
+        normalized_email = normalize_email(email, check_deliverability=False)
+    if opts.hooks is not None:
+        opts.hooks.on_check(
+            CheckEvent(check='syntax', domain=domain, duration_ms=round((perf_counter() - start) * 1000, 3))
+        )
+    return normalized_email, stats
 
-    mx = MXVerificationReport(valid=False, records=None)
-    if opts.run_mx and email_valid:
-        mx = extract_mx_record_info(email, timeout=timeout)
 
-    spf = SPFVerificationReport(valid=False, info=None)
-    if opts.run_spf:
-        spf = extract_spf_record_info(domain, resolver=resolver, timeout=timeout)
+def _context(email: str, opts: ValidationOptions) -> tuple[CheckContext, dict[str, CheckStats] | None]:
+    # Imported on first use so that importing the package stays cheap.
+    from .email_validation import canonical_domain, get_domain_from_email  # pylint: disable=import-outside-toplevel
 
-    dmarc = DMARCVerificationReport(valid=False, record=None)
-    if opts.run_dmarc:
-        dmarc = extract_dmarc_record_info(domain, resolver=resolver, timeout=timeout)
+    domain = canonical_domain(get_domain_from_email(email))
+    normalized_email, stats = _normalize(email, domain, opts)
+    context = CheckContext(email=email, domain=domain, options=opts, inputs={'email': email, 'domain': domain})
+    if normalized_email is not None:
+        context.inputs['normalized_email'] = normalized_email
+    return context, stats
 
-    dkim = DKIMVerificationReport(valid=False, record=None)
-    if opts.run_dkim:
-        dkim = extract_dkim_record_info(domain, resolver=resolver, timeout=timeout)
 
-    ssl = SSLVerificationReport(valid=False, info=None)
-    if opts.run_ssl:
-        ssl = extract_ssl_cert_info(domain, timeout=timeout)
+def _builtin_reports(reports: dict[str, Any], skipped: list[str]) -> dict[str, Any]:
+    # Pops the built-in reports, so that only custom check reports and check errors remain in `reports`.
+    builtin: dict[str, Any] = {}
+    for check in BUILTIN_CHECKS:
+        report = reports.get(check.name)
+        if report is None or isinstance(report, CheckErrorReport):
+            builtin[check.name] = default_report(check, skipped=check.name in skipped)
+        else:
+            builtin[check.name] = reports.pop(check.name)
+    return builtin
 
+
+def _validate(email: str, options: ValidationOptions | None) -> EmailDomainValidationResult:
+    opts = options or ValidationOptions()
+    context, stats = _context(email, opts)
+    skipped: list[str] = []
+    reports = run_checks(
+        context,
+        [BLOCKLIST_CHECK, *BUILTIN_CHECKS, *opts.checks],
+        max_workers=opts.check_workers,
+        stats=stats,
+        skipped=skipped,
+    )
+    normalized_email = context.inputs.get('normalized_email')
     return EmailDomainValidationResult(
-        email_valid=email_valid,
+        email_valid=normalized_email is not None,
         normalized_email=normalized_email,
-        domain=domain,
-        mx=mx,
-        spf=spf,
-        dmarc=dmarc,
-        dkim=dkim,
-        ssl=ssl,
+        domain=context.domain,
+        skipped=skipped,
+        extra=reports,
+        stats=stats,
+        **_builtin_reports(reports, skipped),
     )
+
+
+class LazyValidationResult:
+    """
+    Result whose syntax fields are computed up front and whose reports are computed on first access: reading
+    `dkim` runs the DKIM check (after the MX and SPF checks it uses) and memoizes the report. Reports of disabled
+    checks are the defaults and those of skipped checks have valid=None, as in EmailDomainValidationResult.
+    """
+
+    def __init__(self, context: CheckContext, checks: OnDemandChecks, stats: dict[str, CheckStats] | None) -> None:
+        self.normalized_email: str | None = context.inputs.get('normalized_email')
+        self.email_valid = self.normalized_email is not None
+        self.domain = context.domain
+        # Filled in as checks run.
+        self.stats = stats
+        self._checks = checks
+
+    @property
+    def mx(self) -> MXVerificationReport:
+        return cast(MXVerificationReport, self._builtin('mx'))
+
+    @property
+    def spf(self) -> SPFVerificationReport:
+        return cast(SPFVerificationReport, self._builtin('spf'))
+
+    @property
+    def dmarc(self) -> DMARCVerificationReport:
+        return cast(DMARCVerificationReport, self._builtin('dmarc'))
+
+    @property
+    def dkim(self) -> DKIMVerificationReport:
+        return cast(DKIMVerificationReport, self._builtin('dkim'))
+
+    @property
+    def ssl(self) -> SSLVerificationReport:
+        return cast(SSLVerificationReport, self._builtin('ssl'))
+
+    @property
+    def skipped(self) -> list[str]:
+        """Checks skipped so far; complete once every report has been read or after materialize()."""
+        return self._checks.skipped
+
+    def materialize(self) -> EmailDomainValidationResult:
+        """Run the remaining checks and return the complete result."""
+        reports = self._checks.reports()
+        skipped = self._checks.skipped
+        return EmailDomainValidationResult(
+            email_valid=self.email_valid,
+            normalized_email=self.normalized_email,
+            domain=self.domain,
+            skipped=skipped,
+            extra=reports,
+            stats=self.stats,
+            **_builtin_reports(reports, skipped),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.materialize().to_dict()
+
+    def _builtin(self, name: str) -> Any:
+        report = self._checks.report(name)
+        if report is None or isinstance(report, CheckErrorReport):
+            check = next(check for check in BUILTIN_CHECKS if check.name == name)
+            report = default_report(check, skipped=name in self._checks.skipped)
+        return report
+
+
+def validate_lazily(
+    email: str,
+    *,
+    options: ValidationOptions | None = None,
+    prefetch: bool = False,
+) -> LazyValidationResult:
+    """
+    Normalize the email now and defer every check until its report is read (see LazyValidationResult).
+    With prefetch=True the checks start in the background right away, up to options.check_workers at a time,
+    and reading a report waits only for the checks it needs.
+    """
+    opts = options or ValidationOptions()
+    context, stats = _context(email, opts)
+    checks = OnDemandChecks(context, [BLOCKLIST_CHECK, *BUILTIN_CHECKS, *opts.checks], stats=stats)
+    if prefetch:
+        checks.prefetch(opts.check_workers)
+    return LazyValidationResult(context, checks, stats)
+
+
+def iter_validate(
+    emails: Iterable[str],
+    *,
+    options: ValidationOptions | None = None,
+    window: int = 16,
+    ordered: bool = True,
+) -> Generator[EmailDomainValidationResult]:
+    """
+    Validate a stream of emails with at most `window` validations in flight.
+    Input is pulled only when a slot frees up, so a slow consumer stops the producer and memory stays bounded.
+    With ordered=True results follow input order (the in-flight window doubles as the reorder buffer);
+    otherwise they are yielded as they complete.
+    """
+    window = max(1, window)
+    with ThreadPoolExecutor(max_workers=window, thread_name_prefix='validator') as pool:
+        if ordered:
+            queue: deque[Future[EmailDomainValidationResult]] = deque()
+            for email in emails:
+                queue.append(pool.submit(validate_email_and_domain, email, options=options))
+                if len(queue) >= window:
+                    yield queue.popleft().result()
+            while queue:
+                yield queue.popleft().result()
+            return
+
+        in_flight: set[Future[EmailDomainValidationResult]] = set()
+        for email in emails:
+            in_flight.add(pool.submit(validate_email_and_domain, email, options=options))
+            if len(in_flight) >= window:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,97 @@
+import json
+import random
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from .exceptions import SelectorStatsError
+
+FORMAT = 'email-domain-validator/dkim-selector-stats'
+VERSION = 1
+
+
+class SelectorStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Thread-safe DKIM selector hit counts, learned from the lookups of `extract_dkim_record_info`.
+    Counts are kept per key (the detected provider, '' when none was detected). The probe order of a key is
+    re-ranked by hit count every `resort_every` lookups of that key and stays fixed in between; selectors
+    without hits keep their given order after the ranked ones. With probability `exploration` a lookup probes
+    a random later selector first, so selectors behind a popular one still get counted.
+    """
+
+    def __init__(self, *, resort_every: int = 100, exploration: float = 0.05, seed: int | None = None) -> None:
+        self.resort_every = resort_every
+        self.exploration = exploration
+        self._hits: dict[str, Counter[str]] = {}
+        self._lookups: Counter[str] = Counter()
+        self._queries: Counter[str] = Counter()
+        self._ranks: dict[str, dict[str, int]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def lookups(self) -> int:
+        with self._lock:
+            return self._lookups.total()
+
+    @property
+    def queries_per_lookup(self) -> float:
+        """Mean DNS queries per recorded lookup; tends towards one as the ranking converges."""
+        with self._lock:
+            lookups = self._lookups.total()
+            return self._queries.total() / lookups if lookups else 0.0
+
+    def hits(self, key: str = '') -> dict[str, int]:
+        with self._lock:
+            return dict(self._hits.get(key, Counter()).most_common())
+
+    def order(self, selectors: list[str], key: str = '') -> list[str]:
+        with self._lock:
+            rank = self._ranks.get(key, {})
+            explore = len(selectors) > 1 and self._random.random() < self.exploration
+            pick = self._random.randrange(1, len(selectors)) if explore else 0
+        ordered = sorted(selectors, key=lambda selector: rank.get(selector, len(rank)))
+        if pick:
+            ordered.insert(0, ordered.pop(pick))
+        return ordered
+
+    def record(self, selector: str | None, queries: int, key: str = '') -> None:
+        """Count one lookup of `key` that matched `selector` (None: no selector matched) after `queries` queries."""
+        with self._lock:
+            if selector is not None:
+                self._hits.setdefault(key, Counter())[selector] += 1
+            self._lookups[key] += 1
+            self._queries[key] += queries
+            if self._lookups[key] % self.resort_every == 0 or key not in self._ranks:
+                self._rerank(key)
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            keys = {
+                key: {'lookups': lookups, 'queries': self._queries[key], 'hits': dict(self._hits.get(key, {}))}
+                for key, lookups in self._lookups.items()
+            }
+        data = {'format': FORMAT, 'version': VERSION, 'keys': keys}
+        path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+    @classmethod
+    def load(cls, path: Path, **kwargs: Any) -> 'SelectorStats':
+        """Stats saved by `save()`, ranked from the loaded counts; keyword arguments go to the constructor."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data.get('format') != FORMAT or data.get('version') != VERSION:
+                raise SelectorStatsError(f'Not a DKIM selector stats file: {path}')
+            stats = cls(**kwargs)
+            for key, entry in data['keys'].items():
+                stats._hits[key] = Counter({selector: int(count) for selector, count in entry['hits'].items()})
+                stats._lookups[key] = int(entry['lookups'])
+                stats._queries[key] = int(entry['queries'])
+                stats._rerank(key)
+            return stats
+        except (OSError, KeyError, AttributeError, TypeError, ValueError) as e:
+            raise SelectorStatsError(f'Cannot read DKIM selector stats: {path}') from e
+
+    def _rerank(self, key: str) -> None:
+        hits = self._hits.get(key, Counter())
+        self._ranks[key] = {selector: position for position, (selector, _) in enumerate(hits.most_common())}
@@ -0,0 +1,382 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import partial
+from typing import Any
+
+import dns.resolver
+
+from .cache import DomainReportCache
+from .exceptions import RequestError
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import ValidationMetrics
+from .models import EmailDomainValidationResult, ValidationOptions
+from .pipeline import POLICIES
+from .runner import validate_email_and_domain
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 16 * 1024 * 1024
+KEEPALIVE_TIMEOUT = 30
+# Seconds a per-domain report is served from the shared domain cache, at most its DNS TTL.
+DEFAULT_REPORT_MAX_AGE = 900
+_READ_CHUNK = 64 * 1024
+
+_REASONS: dict[int, str] = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Content Too Large',
+    500: 'Internal Server Error',
+}
+
+# Only JSON scalar options can be set per request; the resolver, domain cache and metrics are owned by the server.
+_REQUEST_OPTIONS: dict[str, type] = {
+    f.name: type(f.default) for f in fields(ValidationOptions) if type(f.default) in (bool, int, float, str)
+}
+# Options that change what a check reports for a domain: requests overriding them bypass the shared domain cache.
+_REPORT_OPTIONS = ('timeout', 'dkim_narrow_selectors', 'dmarc_org_fallback')
+
+
+class _Body:
+    """A request body of known length, read from the connection only when the handler asks for it."""
+
+    def __init__(self, reader: asyncio.StreamReader, length: int) -> None:
+        self._reader = reader
+        self.remaining = length
+
+    async def read(self) -> bytes:
+        body = await asyncio.wait_for(self._reader.readexactly(self.remaining), KEEPALIVE_TIMEOUT)
+        self.remaining = 0
+        return body
+
+    async def lines(self) -> AsyncIterator[bytes]:
+        # Bounded by the remaining length, so a final line without a newline never reads into the next request.
+        buffer = b''
+        while self.remaining:
+            *complete, buffer = (buffer + await self._chunk()).split(b'\n')
+            for line in complete:
+                yield line
+        if buffer:
+            yield buffer
+
+    async def discard(self) -> None:
+        while self.remaining:
+            await self._chunk()
+
+    async def _chunk(self) -> bytes:
+        chunk = await asyncio.wait_for(self._reader.read(min(self.remaining, _READ_CHUNK)), KEEPALIVE_TIMEOUT)
+        if not chunk:
+            raise asyncio.IncompleteReadError(chunk, self.remaining)
+        self.remaining -= len(chunk)
+        return chunk
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    version: str
+    keep_alive: bool
+    body: _Body
+
+
+@dataclass
+class _Job:
+    email: str
+    options: ValidationOptions
+    future: 'asyncio.Future[EmailDomainValidationResult]'
+
+
+def _parse_options(raw: Any, base: ValidationOptions) -> ValidationOptions:
+    raw = {} if raw is None else raw
+    if not isinstance(raw, dict):
+        raise RequestError(400, 'options must be an object')
+    values: dict[str, Any] = {name: getattr(base, name) for name in _REQUEST_OPTIONS}
+    for name, value in raw.items():
+        expected = _REQUEST_OPTIONS.get(name)
+        if expected is None:
+            raise RequestError(400, f'Unknown option: {name}')
+        # bool is an int subclass; keep flags and numbers strictly apart.
+        accepted = (int, float) if expected is float else expected
+        if isinstance(value, bool) is not (expected is bool) or not isinstance(value, accepted):
+            raise RequestError(400, f'Invalid value for option: {name}')
+        if name == 'policy' and value not in POLICIES:
+            raise RequestError(400, f'Unknown policy: {value}')
+        values[name] = value
+    shared = all(values[name] == getattr(base, name) for name in _REPORT_OPTIONS)
+    return ValidationOptions(
+        **values,
+        resolver=base.resolver,
+        domain_cache=base.domain_cache if shared else None,
+        metrics=base.metrics,
+    )
+
+
+def _parse_item(raw: bytes, base: ValidationOptions) -> tuple[str, ValidationOptions]:
+    try:
+        item = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise RequestError(400, 'Body must be valid JSON') from e
+    if not isinstance(item, dict) or not isinstance(item.get('email'), str):
+        raise RequestError(400, 'email must be a string')
+    return item['email'], _parse_options(item.get('options'), base)
+
+
+def _encode_result(result: EmailDomainValidationResult) -> bytes:
+    return json.dumps(result.to_dict()).encode('utf-8')
+
+
+def _encode_error(message: str) -> bytes:
+    return json.dumps({'error': message}).encode('utf-8')
+
+
+async def _read_request(reader: asyncio.StreamReader, max_body: int) -> _Request | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    except ValueError as e:
+        raise RequestError(400, 'Malformed request line') from e
+    headers: dict[str, str] = {}
+    while True:
+        header = await reader.readline()
+        if header in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = header.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    if 'transfer-encoding' in headers:
+        raise RequestError(411, 'Chunked request bodies are not supported')
+    try:
+        length = int(headers.get('content-length', '0'))
+    except ValueError as e:
+        raise RequestError(400, 'Invalid Content-Length') from e
+    if length < 0:
+        raise RequestError(400, 'Invalid Content-Length')
+    if length > max_body:
+        raise RequestError(413, 'Request body too large')
+    return _Request(
+        method=method.upper(),
+        path=target.split('?', 1)[0],
+        version=version,
+        keep_alive=keep_alive,
+        body=_Body(reader, length),
+    )
+
+
+def _head(status: int, keep_alive: bool, content_type: str, extra: str) -> bytes:
+    connection = 'keep-alive' if keep_alive else 'close'
+    return (
+        f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Connection: {connection}\r\n'
+        f'{extra}\r\n'
+    ).encode('latin-1')
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes,
+    keep_alive: bool,
+    content_type: str = 'application/json',
+) -> None:
+    writer.write(_head(status, keep_alive, content_type, f'Content-Length: {len(body)}\r\n') + body)
+    await writer.drain()
+
+
+class ValidationServer:  # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 8,
+        queue_size: int = 64,
+        timeout: int = 5,
+        cache_size: int = 100_000,
+        report_max_age: float = DEFAULT_REPORT_MAX_AGE,
+        max_body: int = MAX_BODY_BYTES,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._workers = workers
+        self._queue_size = queue_size
+        self._max_body = max_body
+        # One long-lived resolver: its TTL-aware cache stays warm across requests and connections.
+        resolver = dns.resolver.Resolver()
+        resolver.cache = dns.resolver.LRUCache(max_size=cache_size)
+        resolver.lifetime = timeout
+        self.metrics = ValidationMetrics()
+        # Per-domain reports are shared by every request and batch line, like run_batch does within one input.
+        self._defaults = ValidationOptions(
+            timeout=timeout,
+            resolver=resolver,
+            domain_cache=DomainReportCache(max_age=report_max_age),
+            metrics=self.metrics,
+        )
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._server: asyncio.Server | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        # Bounded queue: once full, handlers stop reading from their sockets until workers catch up.
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='validator')
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def submit(self, email: str, options: ValidationOptions) -> EmailDomainValidationResult:
+        return await (await self._enqueue(email, options))
+
+    async def _enqueue(self, email: str, options: ValidationOptions) -> 'asyncio.Future[EmailDomainValidationResult]':
+        assert self._queue is not None
+        future: asyncio.Future[EmailDomainValidationResult] = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Job(email=email, options=options, future=future))
+        return future
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(
+                    self._executor, partial(validate_email_and_domain, job.email, options=job.options)
+                )
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader, self._max_body), KEEPALIVE_TIMEOUT)
+                except RequestError as e:
+                    await _write_response(writer, e.status, _encode_error(str(e)), keep_alive=False)
+                    return
+                except TimeoutError, asyncio.IncompleteReadError, ValueError:
+                    return
+                if request is None:
+                    return
+                await self._dispatch(request, writer)
+                keep_alive = request.keep_alive
+                if keep_alive:
+                    # Skip whatever the handler left unread, so the next request starts at its request line.
+                    await request.body.discard()
+        except ConnectionError, asyncio.IncompleteReadError, TimeoutError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        try:
+            if request.path not in ('/validate', '/batch', '/metrics'):
+                raise RequestError(404, 'Not found')
+            if request.path == '/metrics':
+                if request.method != 'GET':
+                    raise RequestError(405, 'Method not allowed')
+                body = self.metrics.render().encode('utf-8')
+                await _write_response(writer, 200, body, request.keep_alive, METRICS_CONTENT_TYPE)
+                return
+            if request.method != 'POST':
+                raise RequestError(405, 'Method not allowed')
+            if request.path == '/batch':
+                await self._handle_batch(request, writer)
+                return
+            email, options = _parse_item(await request.body.read(), self._defaults)
+            result = await self.submit(email, options)
+            await _write_response(writer, 200, _encode_result(result), request.keep_alive)
+        except RequestError as e:
+            await _write_response(writer, e.status, _encode_error(str(e)), request.keep_alive)
+        except asyncio.IncompleteReadError, TimeoutError:
+            # The body never arrived in full, so there is no complete request to answer.
+            request.keep_alive = False
+        except Exception:  # pylint: disable=broad-exception-caught
+            await _write_response(writer, 500, _encode_error('Validation failed'), request.keep_alive)
+
+    async def _handle_batch(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        # Results stream back as NDJSON in input order while later lines are still being read and queued.
+        pending: asyncio.Queue[asyncio.Future[EmailDomainValidationResult] | bytes | None] = asyncio.Queue(
+            maxsize=self._queue_size
+        )
+
+        async def produce() -> None:
+            try:
+                async for line in request.body.lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        email, options = _parse_item(line, self._defaults)
+                    except RequestError as e:
+                        await pending.put(_encode_error(str(e)))
+                        continue
+                    await pending.put(await self._enqueue(email, options))
+            except asyncio.IncompleteReadError, TimeoutError:
+                # The client went away or stalled mid-body: answer what arrived, then close.
+                request.keep_alive = False
+            await pending.put(None)
+
+        # HTTP/1.0 clients cannot parse chunked bodies: theirs is delimited by closing the connection.
+        chunked = request.version == 'HTTP/1.1'
+        if not chunked:
+            request.keep_alive = False
+        producer = asyncio.create_task(produce())
+        extra = 'Transfer-Encoding: chunked\r\n' if chunked else ''
+        writer.write(_head(200, request.keep_alive, 'application/x-ndjson', extra))
+        try:
+            while (item := await pending.get()) is not None:
+                if isinstance(item, bytes):
+                    line = item
+                else:
+                    try:
+                        line = _encode_result(await item)
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        line = _encode_error('Validation failed')
+                line += b'\n'
+                writer.write(f'{len(line):x}\r\n'.encode('latin-1') + line + b'\r\n' if chunked else line)
+                await writer.drain()
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+                await writer.drain()
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+
+async def serve(**kwargs: Any) -> None:
+    await ValidationServer(**kwargs).serve_forever()
@@ -2,12 +2,14 @@ import socket
 import ssl
 from collections.abc import Iterable
 from datetime import datetime, timezone
+from time import perf_counter
 from typing import cast
 
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.x509.extensions import ExtensionNotFound
 
+from .instrumentation import Probe, TLSProbeEvent, current_probe
 from .models import SSLCertInfo, SSLVerificationReport
 
 DEFAULT_PORT = 443
@@ -66,11 +68,64 @@ def _get_cert_info(host: str, cert: x509.Certificate, resolved_ip: str, tls_vers
     )
 
 
-def _get_cert(host: str, timeout: int, port: int = DEFAULT_PORT) -> tuple[x509.Certificate, str, str]:
+def _report_probe(  # pylint: disable=too-many-arguments
+    probe: Probe,
+    *,
+    host: str,
+    port: int,
+    started: float,
+    connected: float | None,
+    handshaken: float | None,
+    ssl_sock: ssl.SSLSocket | None,
+    cert_der: bytes | None,
+    error: Exception | None,
+) -> None:
+    now = perf_counter()
+    connect_end = connected if connected is not None else now
+    handshake_end = handshaken if handshaken is not None else now
+    event = TLSProbeEvent(
+        check=probe.check,
+        domain=probe.domain,
+        host=host,
+        ip=ssl_sock.getpeername()[0] if ssl_sock is not None else None,
+        port=port,
+        duration_ms=round((now - started) * 1000, 3),
+        connect_ms=round((connect_end - started) * 1000, 3),
+        handshake_ms=round((handshake_end - connect_end) * 1000, 3),
+        tls_version=ssl_sock.version() if ssl_sock is not None else None,
+        outcome='ok' if error is None else 'timeout' if isinstance(error, TimeoutError) else 'error',
+    )
+    probe.record_tls(event, cert_bytes=len(cert_der) if cert_der else 0)
+
+
+def _get_cert(  # pylint: disable=too-many-locals
+    host: str, timeout: int, port: int = DEFAULT_PORT
+) -> tuple[x509.Certificate, str, str]:
     # TLS 1.2 → 1.1 → 1.0 fallback; hostname/cert verification disabled to only retrieve cert.
+    probe = current_probe()
+    if probe is not None and not probe.observed:
+        probe = None
+    started = perf_counter()
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.settimeout(timeout)
-    sock.connect((host, port))
+    try:
+        sock.connect((host, port))
+    except OSError as e:
+        if probe is not None:
+            _report_probe(
+                probe,
+                host=host,
+                port=port,
+                started=started,
+                connected=None,
+                handshaken=None,
+                ssl_sock=None,
+                cert_der=None,
+                error=e,
+            )
+        sock.close()
+        raise
+    connected = perf_counter()
     # Legacy TLS fallback intentional to probe cert across server-supported versions.
     tls_versions = [
         (ssl.PROTOCOL_TLSv1_2, 'TLS 1.2'),
@@ -86,17 +141,42 @@ def _get_cert(host: str, timeout: int, port: int = DEFAULT_PORT) -> tuple[x509.C
             context.verify_mode = ssl.CERT_NONE  # NOSONAR
             ssl_sock = context.wrap_socket(sock, server_hostname=host)  # NOSONAR
             ssl_sock.do_handshake()
+            handshaken = perf_counter()
             cert_der = ssl_sock.getpeercert(binary_form=True)
             if cert_der is None:
                 raise ssl.SSLError('Certificate not available in binary form')
             cert = x509.load_der_x509_certificate(cert_der, default_backend())
             resolved_ip = socket.gethostbyname(host)
+            if probe is not None:
+                _report_probe(
+                    probe,
+                    host=host,
+                    port=port,
+                    started=started,
+                    connected=connected,
+                    handshaken=handshaken,
+                    ssl_sock=ssl_sock,
+                    cert_der=cert_der,
+                    error=None,
+                )
             ssl_sock.close()
             sock.close()
             return cert, resolved_ip, tls_version
         except (ssl.CertificateError, OSError) as e:
             last_error = e
             continue
+    if probe is not None:
+        _report_probe(
+            probe,
+            host=host,
+            port=port,
+            started=started,
+            connected=connected,
+            handshaken=None,
+            ssl_sock=None,
+            cert_der=None,
+            error=last_error,
+        )
     sock.close()
     raise ssl.SSLError('Failed to establish SSL connection with any supported TLS version') from last_error
 
@@ -1,13 +1,19 @@
 import re
-from typing import TYPE_CHECKING
+from collections.abc import Iterable
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any
 
+import dns.name
 import dns.resolver
+from dns.rdataclass import RdataClass
 from dns.rdatatype import RdataType
 
-from .exceptions import DomainPolicyError
+from .exceptions import DomainPolicyError, DomainPolicyLookupError
+from .instrumentation import current_probe
 
 if TYPE_CHECKING:
-    from dns.resolver import Resolver
+    from dns.message import Message
+    from dns.resolver import Answer, Resolver
 
 
 def _is_policy_version_valid(policy_record: str, marker: str) -> bool:
@@ -19,6 +25,101 @@ def _is_policy_version_valid(policy_record: str, marker: str) -> bool:
     return len(instances) == 1
 
 
+def parse_tag_list(record: str) -> dict[str, str]:
+    """Tags of a DKIM/DMARC-style record ('tag=value; ...'; RFC 6376, section 3.2), lowercased; first one wins."""
+    tags: dict[str, str] = {}
+    for part in record.split(';'):
+        name, sep, value = part.partition('=')
+        if sep:
+            tags.setdefault(name.strip().lower(), value.strip())
+    return tags
+
+
+def _is_cached(res: 'Resolver', name: str, rdtype: RdataType) -> bool:
+    cache = getattr(res, 'cache', None)
+    if not isinstance(cache, dns.resolver.Cache | dns.resolver.LRUCache):
+        return False
+    return cache.get((dns.name.from_text(name), rdtype, RdataClass.IN)) is not None
+
+
+def _negative_ttl(responses: 'Iterable[Message | None]') -> int | None:
+    # RFC 2308: a negative answer is cached for the lesser of the SOA record's TTL and its MINIMUM field.
+    ttls = [
+        min(rrset.ttl, rrset[0].minimum)
+        for response in responses
+        if response is not None
+        for rrset in response.authority
+        if rrset.rdtype == RdataType.SOA and len(rrset)
+    ]
+    return min(ttls, default=None)
+
+
+def _remaining_ttl(answer: 'Answer') -> int | None:
+    # Answers served from the resolver's cache keep the TTL they were fetched with; their expiration tells how long
+    # they stay valid from now.
+    if answer.rrset is None:
+        return None
+    return max(0, round(answer.expiration - time()))
+
+
+def resolve_record(res: 'Resolver', name: str, rdtype: RdataType, timeout: float) -> 'Answer':
+    # Single choke point for the package's DNS queries, so stats and hooks see every one of them.
+    probe = current_probe()
+    if probe is None:
+        return res.resolve(qname=name, rdtype=rdtype, lifetime=timeout)
+    # Checking the resolver's cache costs a name parse and a lookup; only stats, hooks and metrics report it.
+    cached = probe.observed and _is_cached(res, name, rdtype)
+    answer: Answer | None = None
+    outcome = 'error'
+    ttl: int | None = None
+    start = perf_counter()
+    try:
+        answer = res.resolve(qname=name, rdtype=rdtype, lifetime=timeout)
+        outcome = 'ok'
+        ttl = _remaining_ttl(answer)
+        return answer
+    except dns.resolver.LifetimeTimeout:
+        outcome = 'timeout'
+        raise
+    except dns.resolver.NXDOMAIN as e:
+        outcome = 'nxdomain'
+        ttl = _negative_ttl(e.kwargs.get('responses', {}).values())
+        raise
+    except dns.resolver.NoAnswer as e:
+        outcome = 'no_answer'
+        ttl = _negative_ttl([e.kwargs.get('response')])
+        raise
+    except dns.resolver.NoNameservers:
+        outcome = 'no_nameservers'
+        raise
+    finally:
+        probe.record_dns(
+            name=name,
+            rdtype=rdtype.name,
+            cached=cached,
+            answer=answer,
+            outcome=outcome,
+            ttl=ttl,
+            duration_ms=round((perf_counter() - start) * 1000, 3),
+        )
+
+
+class AccountedResolver(dns.resolver.Resolver):
+    """
+    Resolver facade for third-party code (email_validator's MX lookup) that routes queries through resolve_record.
+    """
+
+    def __init__(self, resolver: 'Resolver', timeout: float) -> None:
+        super().__init__(configure=False)
+        self._resolver = resolver
+        self._timeout = timeout
+
+    def resolve(self, qname: 'dns.name.Name | str', *args: Any, **kwargs: Any) -> 'Answer':
+        # Only the query name and type matter; lifetime and the rest come from the wrapped resolver.
+        rdtype = args[0] if args else kwargs.get('rdtype', RdataType.A)
+        return resolve_record(self._resolver, str(qname), RdataType.make(rdtype), self._timeout)
+
+
 def get_domain_policy_record(
     name: str,
     marker: str,
@@ -27,14 +128,11 @@ def get_domain_policy_record(
 ) -> str:
     res = resolver or dns.resolver.get_default_resolver()
     try:
-        txt_records = res.resolve(qname=name, rdtype=RdataType.TXT, lifetime=timeout)
-    except (
-        dns.resolver.NoAnswer,
-        dns.resolver.NXDOMAIN,
-        dns.resolver.LifetimeTimeout,
-        dns.resolver.NoNameservers,
-    ) as e:
+        txt_records = resolve_record(res, name, RdataType.TXT, timeout)
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN) as e:
         raise DomainPolicyError('Domain policy record not found') from e
+    except (dns.resolver.LifetimeTimeout, dns.resolver.NoNameservers) as e:
+        raise DomainPolicyLookupError('Domain policy lookup failed') from e
     for record in txt_records:
         record_text = ''.join(a.decode('utf-8') for a in record.strings)
         if marker in record_text and _is_policy_version_valid(record_text, marker):
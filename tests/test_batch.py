@@ -0,0 +1,152 @@
+import io
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.batch import BatchCheckpoint, _seed_domain_cache, run_batch
+from src.cache import DomainReportCache
+from src.cli import main
+from src.exceptions import CheckpointError
+from src.models import (
+    DKIMVerificationReport,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFVerificationReport,
+    SSLVerificationReport,
+    ValidationOptions,
+)
+
+_MOCK_TARGET = 'src.runner.validate_email_and_domain'
+
+
+def _fake_validate(email: str, options: ValidationOptions | None = None) -> EmailDomainValidationResult:
+    assert options is not None and options.domain_cache is not None
+    domain = email.split('@')[-1]
+    dmarc = options.domain_cache.get_or_compute(
+        'dmarc', domain, lambda: DMARCVerificationReport(valid=True, record='v=DMARC1; p=none')
+    )
+    return EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email=email,
+        domain=domain,
+        mx=MXVerificationReport(valid=True, records=[f'mx.{domain}']),
+        spf=SPFVerificationReport(valid=False, info=None),
+        dmarc=dmarc,
+        dkim=DKIMVerificationReport(valid=False, record=None),
+        ssl=SSLVerificationReport(valid=False, info=None),
+    )
+
+
+def _write_input(tmp_path: Path, count: int) -> Path:
+    path = tmp_path / 'emails.txt'
+    path.write_text(''.join(f'user{i}@d{i % 3}.com\n' for i in range(count)) + '\n', encoding='utf-8')
+    return path
+
+
+def test_batch_writes_ndjson_in_order(tmp_path: Path) -> None:
+    input_path = _write_input(tmp_path, 5)
+    output_path = tmp_path / 'out.ndjson'
+    with patch(_MOCK_TARGET, side_effect=_fake_validate), open(output_path, 'wb') as output:
+        assert run_batch(input_path, output, window=2) == 5
+    lines = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+    assert [line['normalized_email'] for line in lines] == [f'user{i}@d{i % 3}.com' for i in range(5)]
+
+
+def test_batch_to_in_memory_output(tmp_path: Path) -> None:
+    output = io.BytesIO()
+    with patch(_MOCK_TARGET, side_effect=_fake_validate):
+        assert run_batch(_write_input(tmp_path, 3), output) == 3
+    assert len(output.getvalue().splitlines()) == 3
+
+
+def test_resume_after_interruption(tmp_path: Path) -> None:
+    input_path = _write_input(tmp_path, 10)
+    output_path = tmp_path / 'out.ndjson'
+    checkpoint_path = tmp_path / 'batch.ckpt'
+
+    calls: list[str] = []
+
+    def crash_after_seven(email: str, options: ValidationOptions | None = None) -> EmailDomainValidationResult:
+        if len(calls) == 7:
+            raise MemoryError('killed')
+        calls.append(email)
+        return _fake_validate(email, options)
+
+    with patch(_MOCK_TARGET, side_effect=crash_after_seven), open(output_path, 'w+b') as output:
+        with pytest.raises(MemoryError):
+            run_batch(input_path, output, window=1, checkpoint_path=checkpoint_path, checkpoint_every=3)
+    checkpoint = BatchCheckpoint.load(checkpoint_path)
+    assert checkpoint.records_done == 6
+    assert checkpoint.complete is False
+
+    seeded: list[int] = []
+
+    def resumed(email: str, options: ValidationOptions | None = None) -> EmailDomainValidationResult:
+        assert options is not None and options.domain_cache is not None
+        seeded.append(len(options.domain_cache))
+        calls.append(email)
+        return _fake_validate(email, options)
+
+    with patch(_MOCK_TARGET, side_effect=resumed), open(output_path, 'r+b') as output:
+        written = run_batch(input_path, output, window=1, checkpoint_path=checkpoint_path, resume=True)
+    assert written == 4
+    # Domains resolved before the crash are served from the seeded cache.
+    assert seeded[0] > 0
+    lines = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+    assert [line['normalized_email'] for line in lines] == [f'user{i}@d{i % 3}.com' for i in range(10)]
+    assert BatchCheckpoint.load(checkpoint_path).complete is True
+
+
+def test_seed_domain_cache_keeps_only_successful_reports() -> None:
+    source = ValidationOptions(domain_cache=DomainReportCache())
+    results = [_fake_validate(email, source) for email in ('a@example.com', 'b@failed.org', 'c@x.io')]
+    results[1] = replace(results[1], dmarc=DMARCVerificationReport(valid=False, record=None))
+    lines = [json.dumps(result.to_dict()).encode() + b'\n' for result in results]
+    options = ValidationOptions(domain_cache=DomainReportCache())
+    # Lines past the checkpoint's output size are not read.
+    _seed_domain_cache(io.BytesIO(b''.join(lines)), len(lines[0]) + len(lines[1]), options)
+    assert options.domain_cache is not None
+    assert options.domain_cache.get('mx', 'failed.org') == results[1].mx
+    assert options.domain_cache.get('dmarc', 'failed.org') is None
+    assert options.domain_cache.get('dmarc', 'example.com') == results[0].dmarc
+    assert options.domain_cache.get('spf', 'example.com') is None
+    assert options.domain_cache.get('mx', 'x.io') is None
+
+
+def test_resume_rejects_other_input(tmp_path: Path) -> None:
+    checkpoint_path = tmp_path / 'batch.ckpt'
+    BatchCheckpoint(input='other.txt', records_done=1).save(checkpoint_path)
+    with open(tmp_path / 'out.ndjson', 'w+b') as output, pytest.raises(CheckpointError):
+        run_batch(_write_input(tmp_path, 1), output, checkpoint_path=checkpoint_path, resume=True)
+
+
+@pytest.mark.parametrize('every', [0, -5])
+def test_checkpoint_every_must_be_positive(tmp_path: Path, every: int, capsys: pytest.CaptureFixture[str]) -> None:
+    input_path = _write_input(tmp_path, 1)
+    with open(tmp_path / 'out.ndjson', 'w+b') as output, pytest.raises(ValueError):
+        run_batch(input_path, output, checkpoint_path=tmp_path / 'c', checkpoint_every=every)
+    argv = ['--input', str(input_path), '--output', str(tmp_path / 'out.ndjson'), '--checkpoint-every', str(every)]
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    assert exit_info.value.code == 2
+    assert f'must be at least 1: {every}' in capsys.readouterr().err
+
+
+def test_cli_batch_requires_output_for_checkpoint(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit):
+        main(['--input', str(_write_input(tmp_path, 1)), '--checkpoint', str(tmp_path / 'c')])
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_cli_batch(tmp_path: Path) -> None:
+    input_path = _write_input(tmp_path, 4)
+    output_path = tmp_path / 'out.ndjson'
+    argv = ['--input', str(input_path), '--output', str(output_path), '--checkpoint', str(tmp_path / 'c')]
+    with patch(_MOCK_TARGET, side_effect=_fake_validate):
+        main([*argv, '--no-ssl'])
+    assert len(output_path.read_text(encoding='utf-8').splitlines()) == 4
@@ -0,0 +1,99 @@
+import json
+import pickle
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.blocklist import BlocklistIndex, build_blocklist_index
+from src.cli import main
+from src.exceptions import BlocklistError
+from src.models import BlocklistReport, ValidationOptions
+from src.runner import validate_email_and_domain, validate_lazily
+
+
+@pytest.fixture(name='index_path')
+def _index_path(tmp_path: Path) -> Path:
+    first = tmp_path / 'disposable.txt'
+    first.write_text('# disposable providers\nmailinator.com\n*.tempmail.example\nBücher.example  # IDN\n\n')
+    second = tmp_path / 'extra.txt'
+    second.write_text('.guerrillamail.org\nmailinator.com\n')
+    path = tmp_path / 'blocklist.idx'
+    assert build_blocklist_index([first, second], path) == 4
+    return path
+
+
+def test_exact_and_parent_domain_matches(index_path: Path) -> None:
+    with BlocklistIndex(index_path) as index:
+        assert index.entries == 4
+        assert index.match('mailinator.com') == 'mailinator.com'
+        assert index.match('a.b.Mailinator.COM.') == 'mailinator.com'
+        assert index.match('x.tempmail.example') == 'tempmail.example'
+        assert index.match('mail.bücher.example') == 'xn--bcher-kva.example'
+        assert 'guerrillamail.org' in index
+        assert 'notmailinator.com' not in index
+        assert index.match('com') is None
+
+
+def test_empty_index(tmp_path: Path) -> None:
+    path = tmp_path / 'empty.idx'
+    assert build_blocklist_index([], path) == 0
+    index = BlocklistIndex(path)
+    assert index.match('example.com') is None
+    # An empty index still enables the check: truthiness must not depend on the entry count.
+    assert index
+
+
+def test_invalid_index_rejected(tmp_path: Path, index_path: Path) -> None:
+    with pytest.raises(BlocklistError):
+        BlocklistIndex(tmp_path / 'missing.idx')
+    (tmp_path / 'other.idx').write_bytes(b'not an index file')
+    with pytest.raises(BlocklistError):
+        BlocklistIndex(tmp_path / 'other.idx')
+    (tmp_path / 'short.idx').write_bytes(index_path.read_bytes()[:-3])
+    with pytest.raises(BlocklistError):
+        BlocklistIndex(tmp_path / 'short.idx')
+
+
+def test_pickled_as_path(index_path: Path) -> None:
+    index = pickle.loads(pickle.dumps(BlocklistIndex(index_path)))
+    assert index.path == index_path
+    assert index.match('mx.mailinator.com') == 'mailinator.com'
+
+
+@patch('src.mx.extract_mx_record_info')
+def test_listed_domain_skips_dns_checks(mock_mx: MagicMock, index_path: Path) -> None:
+    opts = ValidationOptions(blocklist=BlocklistIndex(index_path))
+    result = validate_email_and_domain('user@eu.mailinator.com', options=opts)
+    mock_mx.assert_not_called()
+    assert result.extra == {'blocklist': BlocklistReport(valid=False, match='mailinator.com')}
+    assert result.skipped == ['mx', 'spf', 'dmarc', 'dkim', 'ssl']
+    assert result.to_dict()['extra']['blocklist'] == {'valid': False, 'match': 'mailinator.com'}
+    lazy = validate_lazily('user@eu.mailinator.com', options=opts)
+    assert lazy.mx.valid is None
+    assert lazy.skipped == ['mx']
+    mock_mx.assert_not_called()
+
+
+@patch('src.mx.extract_mx_record_info')
+def test_unlisted_domain_runs_checks(mock_mx: MagicMock, index_path: Path) -> None:
+    opts = ValidationOptions(
+        blocklist=BlocklistIndex(index_path), run_spf=False, run_dmarc=False, run_dkim=False, run_ssl=False
+    )
+    result = validate_email_and_domain('user@example.com', options=opts)
+    mock_mx.assert_called_once()
+    assert result.extra == {'blocklist': BlocklistReport(valid=True)}
+    assert not result.skipped
+
+
+def test_cli_build_and_use_blocklist(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    source = tmp_path / 'list.txt'
+    source.write_text('mailinator.com\n')
+    index_path = tmp_path / 'list.idx'
+    main(['build-blocklist', str(index_path), str(source)])
+    assert 'indexed 1 domains' in capsys.readouterr().err
+    main(['user@mailinator.com', '--blocklist', str(index_path), '--compact'])
+    output = json.loads(capsys.readouterr().out)
+    assert output['extra'] == {'blocklist': {'valid': False, 'match': 'mailinator.com'}}
+    with pytest.raises(SystemExit):
+        main(['build-blocklist', str(index_path), str(tmp_path / 'missing.txt')])
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from src.cache import DomainReportCache
+from src.models import MXVerificationReport, SSLVerificationReport
+
+
+def test_get_or_compute_caches_result() -> None:
+    cache = DomainReportCache()
+    calls: list[str] = []
+
+    def compute() -> str:
+        calls.append('x')
+        return 'report'
+
+    for _ in range(3):
+        report = cache.get_or_compute('spf', 'example.com', compute)
+    assert report == 'report'
+    assert calls == ['x']
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_concurrent_lookups_share_one_computation() -> None:
+    cache = DomainReportCache()
+    calls: list[int] = []
+
+    def compute() -> str:
+        calls.append(1)
+        time.sleep(0.05)
+        return 'report'
+
+    results: list[str] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute('dkim', 'example.com', compute)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['report'] * 4
+    assert len(calls) == 1
+
+
+def test_failed_computation_not_cached() -> None:
+    cache = DomainReportCache()
+
+    def boom() -> str:
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('ssl', 'example.com', boom)
+    assert cache.get('ssl', 'example.com') is None
+    assert cache.get_or_compute('ssl', 'example.com', lambda: 'ok') == 'ok'
+
+
+def test_lru_eviction() -> None:
+    cache = DomainReportCache(max_entries=2)
+    cache.put('spf', 'a.com', 'a')
+    cache.put('spf', 'b.com', 'b')
+    assert cache.get('spf', 'a.com') == 'a'
+    cache.put('spf', 'c.com', 'c')
+    assert cache.get('spf', 'b.com') is None
+    assert cache.get('spf', 'a.com') == 'a'
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_max_age_or_report_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr('src.cache.time.monotonic', lambda: now[0])
+    cache = DomainReportCache(max_age=60)
+    cache.put('ssl', 'example.com', SSLVerificationReport(valid=True, info=None))
+    cache.put('mx', 'example.com', MXVerificationReport(valid=True, records=['mx.example.com'], ttl=30))
+    now[0] += 30
+    assert cache.get('mx', 'example.com') is None
+    assert cache.get('ssl', 'example.com') is not None
+    now[0] += 30
+    assert cache.get('ssl', 'example.com') is None
+    assert len(cache) == 0
+    assert cache.get_or_compute('ssl', 'example.com', lambda: 'fresh') == 'fresh'
+
+
+def test_entries_without_max_age_do_not_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr('src.cache.time.monotonic', lambda: now[0])
+    cache = DomainReportCache()
+    cache.put('mx', 'example.com', MXVerificationReport(valid=True, records=['mx.example.com'], ttl=30))
+    now[0] += 86_400
+    assert cache.get('mx', 'example.com') is not None
@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+from dataclasses import replace
+
+import pytest
+
+from src.columnar import CSV_COLUMNS, ResultTable
+from src.models import (
+    CatchAllSecurityLevel,
+    CheckStats,
+    DKIMVerificationReport,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFRecordInfo,
+    SPFVerificationReport,
+    SSLCertInfo,
+    SSLVerificationReport,
+)
+
+
+def _result(local: str = 'user', domain: str = 'example.com') -> EmailDomainValidationResult:
+    return EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email=f'{local}@{domain}',
+        domain=domain,
+        mx=MXVerificationReport(valid=True, records=[f'mx1.{domain}', f'mx2.{domain}']),
+        spf=SPFVerificationReport(
+            valid=True,
+            info=SPFRecordInfo(
+                record='v=spf1 include:_spf.google.com ~all',
+                catchall=CatchAllSecurityLevel.MEDIUM,
+                deprecated_mechanism=False,
+                ip_addresses=False,
+                includes=['_spf.google.com'],
+            ),
+        ),
+        dmarc=DMARCVerificationReport(valid=False, record=None),
+        dkim=DKIMVerificationReport(valid=True, record='v=DKIM1; k=rsa; p=abc'),
+        ssl=SSLVerificationReport(
+            valid=True,
+            info=SSLCertInfo(
+                host=domain,
+                resolved_ip='1.2.3.4',
+                tls_version='TLS 1.2',
+                issued_to=domain,
+                issued_o=None,
+                issuer_c='US',
+                issuer_o='Test CA',
+                issuer_ou='Web',
+                issuer_cn='Test CA',
+                cert_sn='1',
+                cert_alg='1.2.840.113549.1.1.11',
+                cert_ver=2,
+                cert_sans=[domain, f'www.{domain}'],
+                cert_exp=False,
+                cert_age=5,
+                valid_from='2025-01-01',
+                valid_till='2026-01-01',
+                validity_days=365,
+                days_left=10,
+            ),
+        ),
+    )
+
+
+def _invalid(email: str) -> EmailDomainValidationResult:
+    return replace(
+        _result(domain=email.rpartition('@')[2]),
+        email_valid=False,
+        normalized_email=None,
+        mx=MXVerificationReport(valid=False, records=None),
+        ssl=SSLVerificationReport(valid=False, info=None),
+        skipped=['mx', 'ssl'],
+    )
+
+
+def _results() -> list[EmailDomainValidationResult]:
+    with_stats = replace(
+        _result('c', 'other.org'),
+        stats={'syntax': CheckStats(wall_time_ms=0.5), 'mx': CheckStats(wall_time_ms=12.25, dns_queries=3)},
+        extra={'score': {'value': 7}},
+    )
+    return [_result('a'), _result('b'), with_stats, _invalid('broken@example.com'), _result('d', 'other.org')]
+
+
+def test_rows_round_trip() -> None:
+    results = _results()
+    table = ResultTable(results)
+    assert len(table) == len(results)
+    assert list(table) == results
+    assert table[-1] == results[-1]
+    with pytest.raises(IndexError):
+        _ = table[len(results)]
+
+
+def test_equal_reports_of_a_domain_are_stored_once() -> None:
+    table = ResultTable([_result('a'), _result('b'), _result('c', 'other.org')])
+    assert table[0].mx is table[1].mx
+    assert table[0].ssl is table[1].ssl
+    assert table[0].mx is not table[2].mx
+
+
+def _fetched(local: str, fetched_at: float) -> EmailDomainValidationResult:
+    result = _result(local)
+    return replace(
+        result,
+        mx=replace(result.mx, fetched_at=fetched_at, ttl=300),
+        ssl=replace(result.ssl, fetched_at=fetched_at),
+    )
+
+
+def test_reports_differing_in_stamps_are_stored_once() -> None:
+    results = [_fetched('a', 1_800_000_000.5), _fetched('b', 1_800_000_060.25), _result('c')]
+    table = ResultTable(results)
+    assert [table[row].mx.fetched_at for row in range(3)] == [1_800_000_000.5, 1_800_000_060.25, None]
+    assert [table[row].mx.ttl for row in range(3)] == [300, 300, None]
+    assert table[1].ssl.fetched_at == 1_800_000_060.25
+    # Rows with stamps are rebuilt around the one stored report, so its contents are shared.
+    assert table[0].ssl.info is table[1].ssl.info is table[2].ssl.info
+    output = io.BytesIO()
+    table.write_ndjson(output)
+    assert output.getvalue().decode('utf-8').splitlines() == [json.dumps(result.to_dict()) for result in results]
+    csv_output = io.StringIO()
+    table.write_csv(csv_output)
+    rows = list(csv.DictReader(io.StringIO(csv_output.getvalue())))
+    assert [(row['mx_fetched_at'], row['mx_ttl']) for row in rows] == [
+        ('1800000000.5', '300'),
+        ('1800000060.25', '300'),
+        ('', ''),
+    ]
+
+
+def test_count_valid_uses_flags() -> None:
+    table = ResultTable(_results())
+    assert table.count_valid() == 4
+    assert table.count_valid('mx') == 4
+    assert table.count_valid('dmarc') == 0
+
+
+def test_write_ndjson_matches_to_dict() -> None:
+    results = _results()
+    output = io.BytesIO()
+    assert ResultTable(results).write_ndjson(output) == len(results)
+    lines = output.getvalue().decode('utf-8').splitlines()
+    assert lines == [json.dumps(result.to_dict()) for result in results]
+
+
+def test_write_csv_flattens_reports() -> None:
+    output = io.StringIO()
+    ResultTable(_results()).write_csv(output)
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert list(rows[0]) == list(CSV_COLUMNS)
+    assert rows[0]['mx_records'] == 'mx1.example.com mx2.example.com'
+    assert rows[0]['spf_catchall'] == 'medium'
+    assert rows[0]['ssl_issuer_o'] == 'Test CA'
+    assert rows[3]['normalized_email'] == ''
+    assert rows[3]['ssl_valid'] == 'False'
+    assert rows[3]['ssl_host'] == ''
+    assert rows[3]['skipped'] == 'mx ssl'
+
+
+def test_read_ndjson() -> None:
+    results = _results()
+    lines = [json.dumps(result.to_dict()) + '\n' for result in results] + ['\n']
+    assert list(ResultTable.read_ndjson(lines)) == results
@@ -1,10 +1,15 @@
+import base64
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 from dns.resolver import Resolver
 
-from src.dkim import extract_dkim_record_info
+from src.dkim import extract_dkim_record_info, parse_dkim_record
 from src.exceptions import DomainPolicyError
-from src.models import DKIM_MARKER
+from src.models import DKIM_MARKER, DKIMKeyInfo
+from src.selector_stats import SelectorStats
 
 _MOCK_TARGET = 'src.dkim.get_domain_policy_record'
 _VALID_RECORD = 'v=DKIM1; k=rsa; p=MIIBIjANBgkqhkiG9w0BAQEFAAOCAQ8A...'
@@ -62,3 +67,48 @@ def test_defaults_to_dkim_selectors_list() -> None:
     # First selector hit -> valid
     assert result.valid is True
     assert result.record == _VALID_RECORD
+
+
+def test_stats_order_and_record_hit() -> None:
+    stats = SelectorStats(exploration=0)
+    stats.record('b', 2, key='google')
+    with patch(_MOCK_TARGET, side_effect=[_VALID_RECORD]) as mock:
+        result = extract_dkim_record_info('example.com', selectors=['a', 'b'], stats=stats, stats_key='google')
+    assert result.valid is True
+    mock.assert_called_once_with('b._domainkey.example.com', DKIM_MARKER, resolver=None, timeout=5)
+    assert stats.hits('google') == {'b': 2}
+    assert stats.queries_per_lookup == 1.5
+
+
+def test_stats_record_miss() -> None:
+    stats = SelectorStats()
+    with patch(_MOCK_TARGET, side_effect=DomainPolicyError('')):
+        extract_dkim_record_info('example.com', selectors=['a', 'b', 'c'], stats=stats)
+    assert not stats.hits()
+    assert stats.queries_per_lookup == 3.0
+
+
+def _public_key(key: Any) -> str:
+    der = key.public_key().public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+    return base64.b64encode(der).decode('ascii')
+
+
+def test_parse_dkim_record() -> None:
+    rsa_key = _public_key(rsa.generate_private_key(public_exponent=65537, key_size=1024))
+    info = parse_dkim_record(f'v=DKIM1; h=sha256; t=y:s; k=rsa; p={rsa_key[:40]} {rsa_key[40:]}')
+    assert info == DKIMKeyInfo(
+        key_type='rsa', key_bits=1024, revoked=False, hash_algorithms=['sha256'], flags=['y', 's']
+    )
+    raw = ed25519.Ed25519PrivateKey.generate().public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    ed_info = parse_dkim_record(f'v=DKIM1; k=ed25519; p={base64.b64encode(raw).decode("ascii")}')
+    assert (ed_info.key_type, ed_info.key_bits) == ('ed25519', 256)
+    assert parse_dkim_record('v=DKIM1; p=').revoked is True
+    assert parse_dkim_record(_VALID_RECORD).key_bits is None
+    assert parse_dkim_record('v=DKIM1; p=bm90IGEga2V5').key_bits is None
+
+
+def test_record_parsed_at_fetch_time() -> None:
+    with patch(_MOCK_TARGET, return_value='v=DKIM1; k=ed25519; p=') as mock:
+        result = extract_dkim_record_info('example.com', selectors=['sel1'])
+    mock.assert_called_once()
+    assert result.info is not None and (result.info.key_type, result.info.revoked) == ('ed25519', True)
@@ -2,9 +2,11 @@ from unittest.mock import MagicMock, patch
 
 from dns.resolver import Resolver
 
-from src.dmarc import extract_dmarc_record_info
-from src.exceptions import DomainPolicyError
-from src.models import DMARC_MARKER
+from src.cache import DomainReportCache
+from src.dmarc import extract_dmarc_record_info, parse_dmarc_record
+from src.exceptions import DomainPolicyError, DomainPolicyLookupError
+from src.instrumentation import Probe, current_probe, probing
+from src.models import DMARC_MARKER, DMARCRecordInfo
 
 _MOCK_TARGET = 'src.dmarc.get_domain_policy_record'
 
@@ -55,3 +57,99 @@ def test_resolver_forwarded() -> None:
     with patch(_MOCK_TARGET, return_value='v=DMARC1; p=none') as mock:
         extract_dmarc_record_info('example.com', resolver=sentinel_resolver, timeout=3)
     mock.assert_called_once_with('_dmarc.example.com', DMARC_MARKER, resolver=sentinel_resolver, timeout=3)
+
+
+def _org_record(name: str, *_args: object, **_kwargs: object) -> str:
+    if name == '_dmarc.example.co.uk':
+        return 'v=DMARC1; p=quarantine'
+    raise DomainPolicyError()
+
+
+def test_org_domain_fallback() -> None:
+    with patch(_MOCK_TARGET, side_effect=_org_record) as mock:
+        result = extract_dmarc_record_info('mail.corp.example.co.uk', org_domain='example.co.uk')
+    assert (result.valid, result.record, result.org_domain) == (True, 'v=DMARC1; p=quarantine', 'example.co.uk')
+    assert [call.args[0] for call in mock.call_args_list] == ['_dmarc.mail.corp.example.co.uk', '_dmarc.example.co.uk']
+
+
+def test_org_domain_fallback_without_record() -> None:
+    with patch(_MOCK_TARGET, side_effect=DomainPolicyError()) as mock:
+        result = extract_dmarc_record_info('mail.example.com', org_domain='example.com')
+        extract_dmarc_record_info('example.com', org_domain='example.com')
+    assert (result.valid, result.record, result.org_domain) == (False, None, None)
+    assert mock.call_count == 3
+
+
+def test_org_domain_lookup_shared_through_cache() -> None:
+    cache = DomainReportCache()
+    with patch(_MOCK_TARGET, side_effect=_org_record) as mock:
+        for domain in ('a.example.co.uk', 'b.example.co.uk'):
+            result = extract_dmarc_record_info(domain, org_domain='example.co.uk', cache=cache)
+            assert result.org_domain == 'example.co.uk'
+    assert [call.args[0] for call in mock.call_args_list].count('_dmarc.example.co.uk') == 1
+
+
+def test_failed_lookup_does_not_fall_back() -> None:
+    with patch(_MOCK_TARGET, side_effect=DomainPolicyLookupError()) as mock:
+        result = extract_dmarc_record_info('mail.example.com', org_domain='example.com')
+    assert (result.valid, result.org_domain) == (False, None)
+    assert mock.call_count == 1
+
+
+def test_failed_org_domain_lookup_not_cached() -> None:
+    cache = DomainReportCache()
+    with patch(_MOCK_TARGET, side_effect=[DomainPolicyError(), DomainPolicyLookupError()]):
+        assert extract_dmarc_record_info('a.example.co.uk', org_domain='example.co.uk', cache=cache).valid is False
+    with patch(_MOCK_TARGET, side_effect=_org_record):
+        result = extract_dmarc_record_info('b.example.co.uk', org_domain='example.co.uk', cache=cache)
+    assert result.org_domain == 'example.co.uk'
+
+
+def test_org_domain_fallback_ttl() -> None:
+    ttls = {'_dmarc.example.co.uk': 3600, '_dmarc.a.example.co.uk': 300, '_dmarc.b.example.co.uk': 7200}
+
+    def record(name: str, *args: object, **kwargs: object) -> str:
+        probe = current_probe()
+        assert probe is not None
+        probe.record_dns(
+            name=name, rdtype='TXT', cached=False, answer=None, outcome='ok', ttl=ttls[name], duration_ms=0.0
+        )
+        return _org_record(name, *args, **kwargs)
+
+    cache = DomainReportCache()
+    with patch(_MOCK_TARGET, side_effect=record):
+        with probing(Probe(check='dmarc')):
+            first = extract_dmarc_record_info('a.example.co.uk', org_domain='example.co.uk', cache=cache)
+        # A cache hit still expires with the organizational record, before the subdomain's negative answer.
+        with probing(Probe(check='dmarc')):
+            second = extract_dmarc_record_info('b.example.co.uk', org_domain='example.co.uk', cache=cache)
+    assert (first.ttl, second.ttl) == (300, 3600)
+
+
+def test_parse_dmarc_record() -> None:
+    info = parse_dmarc_record(
+        'v=DMARC1; p=Reject; sp=none; pct=25; rua=mailto:a@example.com, mailto:b@example.net; adkim=s'
+    )
+    assert info == DMARCRecordInfo(
+        policy='reject',
+        subdomain_policy='none',
+        pct=25,
+        rua=['mailto:a@example.com', 'mailto:b@example.net'],
+        ruf=[],
+        adkim='s',
+        aspf='r',
+    )
+    defaults = parse_dmarc_record('v=DMARC1;p=quarantine;pct=abc;aspf=x')
+    assert (defaults.policy, defaults.subdomain_policy, defaults.pct, defaults.aspf) == (
+        'quarantine',
+        'quarantine',
+        100,
+        'r',
+    )
+    assert parse_dmarc_record('v=DMARC1; p=bogus').policy is None
+
+
+def test_record_parsed_at_fetch_time() -> None:
+    with patch(_MOCK_TARGET, return_value='v=DMARC1; p=reject'):
+        result = extract_dmarc_record_info('example.com')
+    assert result.info is not None and result.info.policy == 'reject'
@@ -1,4 +1,9 @@
-from src.email_validation import get_domain_from_email, normalize_email
+from unittest.mock import patch
+
+import pytest
+from email_validator import EmailNotValidError, validate_email
+
+from src.email_validation import _normalize_syntax, canonical_domain, get_domain_from_email, normalize_email
 
 
 def test_normalize_email_valid() -> None:
@@ -15,3 +20,31 @@ def test_normalize_email_invalid_raises() -> None:
 def test_get_domain_from_email() -> None:
     assert get_domain_from_email('user@gmail.com') == 'gmail.com'
     assert get_domain_from_email('  a@b.co  ') == 'b.co'
+
+
+def test_canonical_domain() -> None:
+    assert canonical_domain('GMAIL.COM') == 'gmail.com'
+    assert canonical_domain(' gmail.com. ') == 'gmail.com'
+    assert canonical_domain('Bücher.Example') == 'xn--bcher-kva.example'
+    assert canonical_domain('xn--bcher-kva.example') == 'xn--bcher-kva.example'
+    assert canonical_domain('straße.de') == 'xn--strae-oqa.de'
+    assert canonical_domain('exä mple.com') == 'exä mple.com'
+
+
+@pytest.mark.parametrize('email', ['', 'no-at-sign', '@example.com', 'user@', 'a@b@example.com', 'us er@example.com'])
+def test_trivially_invalid_skips_validator(email: str) -> None:
+    with pytest.raises(EmailNotValidError):
+        validate_email(email, check_deliverability=False)
+    _normalize_syntax.cache_clear()
+    with patch('src.email_validation.validate_email') as validator:
+        assert normalize_email(email) is None
+    validator.assert_not_called()
+
+
+def test_normalization_is_memoized() -> None:
+    _normalize_syntax.cache_clear()
+    with patch('src.email_validation.validate_email', wraps=validate_email) as validator:
+        first = normalize_email('memo@example.com')
+        second = normalize_email('  memo@example.com ')
+    assert first == second == 'memo@example.com'
+    assert validator.call_count == 1
@@ -1,4 +1,4 @@
-from src.exceptions import DomainPolicyError
+from src.exceptions import DomainPolicyError, DomainPolicyLookupError, RequestError
 
 
 class TestDomainPolicyError:
@@ -9,3 +9,20 @@ class TestDomainPolicyError:
     def test_default_message_when_empty(self) -> None:
         err = DomainPolicyError()
         assert str(err) == 'Policy not found'
+
+    def test_lookup_error_is_a_policy_error(self) -> None:
+        err = DomainPolicyLookupError()
+        assert isinstance(err, DomainPolicyError)
+        assert str(err) == 'Policy lookup failed'
+
+
+class TestRequestError:
+    def test_status_and_message(self) -> None:
+        err = RequestError(404, 'Not found')
+        assert err.status == 404
+        assert str(err) == 'Not found'
+
+    def test_defaults(self) -> None:
+        err = RequestError()
+        assert err.status == 400
+        assert str(err) == 'Bad request'
@@ -0,0 +1,34 @@
+from src.metrics import ValidationMetrics
+
+
+def test_counter_and_gauge_render() -> None:
+    metrics = ValidationMetrics()
+    metrics.dns_queries.inc('TXT', 'ok')
+    metrics.dns_queries.inc('TXT', 'ok')
+    metrics.dns_timeouts.inc('MX')
+    with metrics.checks_in_flight.track('spf'):
+        assert metrics.checks_in_flight.value('spf') == 1
+    text = metrics.render()
+    assert '# TYPE email_domain_validator_dns_queries counter' in text
+    assert 'email_domain_validator_dns_queries_total{rdtype="TXT",outcome="ok"} 2' in text
+    assert 'email_domain_validator_dns_timeouts_total{rdtype="MX"} 1' in text
+    assert 'email_domain_validator_checks_in_flight{check="spf"} 0' in text
+    assert text.endswith('\n')
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    metrics = ValidationMetrics(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        metrics.check_duration.observe(value, 'mx')
+    lines = [line for line in metrics.render().splitlines() if 'check_duration_seconds' in line]
+    assert 'email_domain_validator_check_duration_seconds_bucket{check="mx",le="0.1"} 2' in lines
+    assert 'email_domain_validator_check_duration_seconds_bucket{check="mx",le="1"} 3' in lines
+    assert 'email_domain_validator_check_duration_seconds_bucket{check="mx",le="+Inf"} 4' in lines
+    assert 'email_domain_validator_check_duration_seconds_sum{check="mx"} 3.65' in lines
+    assert 'email_domain_validator_check_duration_seconds_count{check="mx"} 4' in lines
+
+
+def test_label_values_escaped() -> None:
+    metrics = ValidationMetrics()
+    metrics.checks_in_flight.inc('a"b\\c\nd')
+    assert 'check="a\\"b\\\\c\\nd"' in metrics.render()
@@ -0,0 +1,118 @@
+from dataclasses import replace
+
+from src.models import (
+    CatchAllSecurityLevel,
+    DKIMKeyInfo,
+    DKIMVerificationReport,
+    DMARCRecordInfo,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFRecordInfo,
+    SPFVerificationReport,
+    SSLCertInfo,
+    SSLVerificationReport,
+)
+
+
+def _result() -> EmailDomainValidationResult:
+    return EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email='user@example.com',
+        domain='example.com',
+        mx=MXVerificationReport(valid=True, records=['mx1.example.com']),
+        spf=SPFVerificationReport(
+            valid=True,
+            info=SPFRecordInfo(
+                record='v=spf1 -all',
+                catchall=CatchAllSecurityLevel.HIGH,
+                deprecated_mechanism=False,
+                ip_addresses=True,
+                includes=[],
+            ),
+        ),
+        dmarc=DMARCVerificationReport(valid=False, record=None),
+        dkim=DKIMVerificationReport(valid=True, record='v=DKIM1; p=abc'),
+        ssl=SSLVerificationReport(
+            valid=True,
+            info=SSLCertInfo(
+                host='example.com',
+                resolved_ip='1.2.3.4',
+                tls_version='TLS 1.2',
+                issued_to='example.com',
+                issued_o=None,
+                issuer_c='US',
+                issuer_o='Test CA',
+                issuer_ou=None,
+                issuer_cn='Test CA',
+                cert_sn='1',
+                cert_alg='1.2.840.113549.1.1.11',
+                cert_ver=2,
+                cert_sans=['example.com'],
+                cert_exp=False,
+                cert_age=1,
+                valid_from='2025-01-01',
+                valid_till='2026-01-01',
+                validity_days=365,
+                days_left=10,
+            ),
+        ),
+        extra={'custom': {'score': 1}},
+    )
+
+
+def test_from_dict_round_trip() -> None:
+    result = _result()
+    restored = EmailDomainValidationResult.from_dict(result.to_dict())
+    assert restored == result
+    assert restored.spf.info is not None
+    assert restored.spf.info.catchall is CatchAllSecurityLevel.HIGH
+
+
+def test_from_dict_invalid_reports() -> None:
+    data = _result().to_dict()
+    data['spf'] = {'valid': False, 'info': None}
+    data['ssl'] = {'valid': False, 'info': None}
+    restored = EmailDomainValidationResult.from_dict(data)
+    assert restored.spf.info is None
+    assert restored.ssl.info is None
+
+
+def test_from_dict_parsed_records() -> None:
+    dmarc_info = DMARCRecordInfo(
+        policy='reject', subdomain_policy='none', pct=50, rua=['mailto:a@example.com'], ruf=[], adkim='s', aspf='r'
+    )
+    dkim_info = DKIMKeyInfo(key_type='rsa', key_bits=2048, revoked=False, hash_algorithms=['sha256'], flags=['y'])
+    result = replace(
+        _result(),
+        dmarc=DMARCVerificationReport(
+            valid=True, record='v=DMARC1; p=reject', org_domain='example.com', info=dmarc_info
+        ),
+        dkim=DKIMVerificationReport(valid=True, record='v=DKIM1; p=abc', info=dkim_info),
+    )
+    restored = EmailDomainValidationResult.from_dict(result.to_dict())
+    assert restored == result
+    assert restored.dmarc.info == dmarc_info
+    # Results written before records were parsed still load.
+    data = result.to_dict()
+    for name in ('info', 'org_domain', 'fetched_at', 'ttl'):
+        data['dmarc'].pop(name)
+    assert EmailDomainValidationResult.from_dict(data).dmarc.info is None
+
+
+def test_models_use_slots() -> None:
+    result = _result()
+    for model in (result, result.mx, result.spf, result.spf.info, result.ssl, result.ssl.info):
+        assert not hasattr(model, '__dict__')
+
+
+def test_repeated_strings_are_interned() -> None:
+    # Built at runtime so the two strings start out as distinct objects.
+    host = ''.join(['aspmx.l.', 'google.com'])
+    first = MXVerificationReport(valid=True, records=[host])
+    second = MXVerificationReport.from_dict({'valid': True, 'records': [''.join(['aspmx.l.google', '.com'])]})
+    assert first.records is not None and second.records is not None
+    assert first.records[0] is second.records[0]
+    original, reloaded = _result().ssl.info, EmailDomainValidationResult.from_dict(_result().to_dict()).ssl.info
+    assert original is not None and reloaded is not None
+    assert reloaded.issuer_o is original.issuer_o
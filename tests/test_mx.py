@@ -1,58 +1,75 @@
 from unittest.mock import MagicMock, patch
 
-from email_validator import EmailNotValidError
+from email_validator import EmailUndeliverableError
 
 from src.mx import extract_mx_record_info
 
-_MOCK_TARGET = 'src.mx.validate_email'
+_MOCK_TARGET = 'src.mx.validate_email_deliverability'
 
 
 def test_happy_path_single_mx() -> None:
-    validated = MagicMock()
-    validated.mx = [(10, 'mail.example.com')]
-    with patch(_MOCK_TARGET, return_value=validated) as mock:
+    with patch(_MOCK_TARGET, return_value={'mx': [(10, 'mail.example.com')]}) as mock:
         result = extract_mx_record_info('user@example.com', timeout=3)
     assert result.valid is True
     assert result.records == ['mail.example.com']
-    mock.assert_called_once_with('user@example.com', check_deliverability=True, timeout=3)
+    mock.assert_called_once_with('example.com', 'example.com', timeout=3)
 
 
 def test_multiple_mx_records() -> None:
-    validated = MagicMock()
-    validated.mx = [(10, 'mx1.example.com'), (20, 'mx2.example.com')]
-    with patch(_MOCK_TARGET, return_value=validated):
+    with patch(_MOCK_TARGET, return_value={'mx': [(10, 'mx1.example.com'), (20, 'mx2.example.com')]}):
         result = extract_mx_record_info('user@example.com')
     assert result.valid is True
     assert result.records == ['mx1.example.com', 'mx2.example.com']
 
 
 def test_no_mx_attribute_returns_invalid() -> None:
-    validated = MagicMock(spec=[])  # spec=[] means no attributes at all
-    with patch(_MOCK_TARGET, return_value=validated):
+    with patch(_MOCK_TARGET, return_value={'unknown-deliverability': 'timeout'}):
         result = extract_mx_record_info('user@example.com')
     assert result.valid is False
     assert result.records is None
 
 
 def test_email_not_valid_error_returns_invalid() -> None:
-    with patch(_MOCK_TARGET, side_effect=EmailNotValidError('bad')):
+    with patch(_MOCK_TARGET, side_effect=EmailUndeliverableError('bad')):
+        result = extract_mx_record_info('user@example.com')
+    assert result.valid is False
+    assert result.records is None
+
+
+def test_invalid_syntax_skips_lookups() -> None:
+    with patch(_MOCK_TARGET) as mock:
         result = extract_mx_record_info('bad-email')
     assert result.valid is False
     assert result.records is None
+    mock.assert_not_called()
 
 
 def test_whitespace_stripped() -> None:
-    validated = MagicMock()
-    validated.mx = [(10, 'mail.example.com')]
-    with patch(_MOCK_TARGET, return_value=validated) as mock:
-        extract_mx_record_info('  user@example.com  ')
-    mock.assert_called_once_with('user@example.com', check_deliverability=True, timeout=5)
+    with patch(_MOCK_TARGET, return_value={'mx': [(10, 'mail.example.com')]}) as mock:
+        extract_mx_record_info('  user@Example.COM  ')
+    mock.assert_called_once_with('example.com', 'example.com', timeout=5)
+
+
+def test_normalized_email_reused() -> None:
+    with (
+        patch('src.mx.normalize_email') as normalize,
+        patch(_MOCK_TARGET, return_value={'mx': [(10, 'mail.xn--bcher-kva.example')]}) as mock,
+    ):
+        extract_mx_record_info('User@Bücher.example', normalized_email='User@bücher.example')
+    normalize.assert_not_called()
+    mock.assert_called_once_with('xn--bcher-kva.example', 'bücher.example', timeout=5)
 
 
 def test_empty_mx_list() -> None:
-    validated = MagicMock()
-    validated.mx = []
-    with patch(_MOCK_TARGET, return_value=validated):
+    with patch(_MOCK_TARGET, return_value={'mx': []}):
         result = extract_mx_record_info('user@example.com')
     assert result.valid is True
     assert result.records == []
+
+
+def test_resolver_forwarded_instead_of_timeout() -> None:
+    sentinel_resolver = MagicMock()
+    with patch(_MOCK_TARGET, return_value={'mx': [(10, 'mail.example.com')]}) as mock:
+        result = extract_mx_record_info('user@example.com', timeout=3, resolver=sentinel_resolver)
+    assert result.valid is True
+    mock.assert_called_once_with('example.com', 'example.com', dns_resolver=sentinel_resolver)
@@ -0,0 +1,225 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from src.exceptions import PipelineError
+from src.models import CheckErrorReport, MXVerificationReport, ValidationOptions
+from src.pipeline import BUILTIN_CHECKS, Check, CheckContext, OnDemandChecks, ValidationPolicy, run_checks
+from src.runner import validate_email_and_domain
+
+
+def _context(**inputs: Any) -> CheckContext:
+    return CheckContext(
+        email='user@example.com',
+        domain='example.com',
+        options=ValidationOptions(),
+        inputs={'email': 'user@example.com', 'domain': 'example.com', **inputs},
+    )
+
+
+def test_dependent_check_receives_published_input() -> None:
+    seen: list[Any] = []
+    producer = Check(name='producer', run=lambda ctx: 'value', provides={'thing': lambda r: r})
+    consumer = Check(name='consumer', run=lambda ctx: seen.append(ctx.inputs['thing']), requires=('thing',))
+    reports = run_checks(_context(), [consumer, producer])
+    assert set(reports) == {'producer', 'consumer'}
+    assert seen == ['value']
+
+
+def test_check_skipped_when_prerequisite_fails() -> None:
+    producer = Check(name='producer', run=lambda ctx: None, provides={'thing': lambda r: r})
+    consumer = Check(name='consumer', run=lambda ctx: 'ran', requires=('thing',))
+    downstream = Check(name='downstream', run=lambda ctx: 'ran', requires=('other',))
+    skipped: list[str] = []
+    reports = run_checks(_context(), [producer, consumer, downstream], skipped=skipped)
+    assert set(reports) == {'producer'}
+    assert skipped == ['consumer', 'downstream']
+
+
+def test_optional_input_awaited_but_not_required() -> None:
+    seen: dict[str, Any] = {}
+    producer = Check(name='producer', run=lambda ctx: 'value', provides={'thing': lambda r: r})
+    failing = Check(name='failing', run=lambda ctx: None, provides={'other': lambda r: r})
+    consumer = Check(
+        name='consumer',
+        run=lambda ctx: seen.update(thing=ctx.inputs.get('thing'), other=ctx.inputs.get('other')),
+        uses=('thing', 'other'),
+    )
+    reports = run_checks(_context(), [consumer, producer, failing], max_workers=3)
+    assert set(reports) == {'producer', 'failing', 'consumer'}
+    assert seen == {'thing': 'value', 'other': None}
+
+
+def _listed(_ctx: CheckContext) -> MXVerificationReport:
+    return MXVerificationReport(valid=False, records=None)
+
+
+def test_failed_precheck_skips_the_other_checks() -> None:
+    checks = [Check(name='a', run=lambda ctx: 'ran'), Check(name='gate', run=_listed)]
+    assert set(run_checks(_context(), checks)) == {'a', 'gate'}
+    checks[1] = replace(checks[1], precheck=True)
+    skipped: list[str] = []
+    assert set(run_checks(_context(), checks, skipped=skipped)) == {'gate'}
+    assert skipped == ['a']
+
+
+def test_independent_checks_run_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    checks = [Check(name=name, run=lambda ctx: barrier.wait()) for name in ('a', 'b')]
+    reports = run_checks(_context(), checks, max_workers=2)
+    assert set(reports) == {'a', 'b'}
+
+
+def _broken(_ctx: CheckContext) -> str:
+    raise ValueError('boom')
+
+
+def test_raising_check_reports_error() -> None:
+    broken = Check(name='broken', run=_broken, provides={'thing': lambda r: r})
+    checks = [broken, Check(name='consumer', run=lambda ctx: 'ran', requires=('thing',)), Check('other', lambda c: 1)]
+    skipped: list[str] = []
+    reports = run_checks(_context(), checks, skipped=skipped)
+    assert reports == {'broken': CheckErrorReport(valid=False, error='ValueError: boom'), 'other': 1}
+    assert skipped == ['consumer']
+    opts = ValidationOptions(run_spf=False, run_dmarc=False, run_dkim=False, run_ssl=False, checks=[broken])
+    with patch('src.mx.extract_mx_record_info', side_effect=OSError('down')):
+        result = validate_email_and_domain('user@example.com', options=opts)
+    assert result.mx == MXVerificationReport(valid=False, records=None)
+    assert result.extra == {
+        'mx': CheckErrorReport(valid=False, error='OSError: down'),
+        'broken': CheckErrorReport(valid=False, error='ValueError: boom'),
+    }
+
+
+def test_checks_run_on_a_shared_executor() -> None:
+    checks = [Check(name=name, run=lambda ctx: threading.current_thread().name) for name in ('a', 'b')]
+    first, second = run_checks(_context(), checks), run_checks(_context(), checks)
+    assert all(name.startswith('check') for name in [*first.values(), *second.values()])
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='own') as executor:
+        ctx = replace(_context(), options=ValidationOptions(check_executor=executor))
+        assert all(name.startswith('own') for name in run_checks(ctx, checks).values())
+
+
+def test_cycle_is_skipped() -> None:
+    a = Check(name='a', run=lambda ctx: 1, requires=('from_b',), provides={'from_a': lambda r: r})
+    b = Check(name='b', run=lambda ctx: 1, requires=('from_a',), provides={'from_b': lambda r: r})
+    assert not run_checks(_context(), [a, b])
+
+
+def test_on_demand_checks_run_dependencies_once_and_skip_cycles() -> None:
+    runs: list[str] = []
+
+    def produce(_ctx: CheckContext) -> str:
+        runs.append('producer')
+        return 'value'
+
+    producer = Check(name='producer', run=produce, provides={'thing': str})
+    consumer = Check(name='consumer', run=lambda ctx: ctx.inputs['thing'], requires=('thing',))
+    a = Check(name='a', run=lambda ctx: 1, requires=('from_b',), provides={'from_a': lambda r: r})
+    b = Check(name='b', run=lambda ctx: 1, requires=('from_a',), provides={'from_b': lambda r: r})
+    checks = OnDemandChecks(_context(), [a, consumer, producer, b])
+    assert checks.report('consumer') == 'value'
+    assert checks.report('producer') == 'value'
+    assert runs == ['producer']
+    assert checks.report('a') is None
+    assert checks.reports() == {'consumer': 'value', 'producer': 'value'}
+    assert checks.skipped == ['a', 'b']
+
+
+def test_disabled_builtin_not_run() -> None:
+    ctx = _context(normalized_email='user@example.com')
+    ctx.options = ValidationOptions(run_mx=False, run_spf=False, run_dmarc=False, run_dkim=False, run_ssl=False)
+    assert not run_checks(ctx, BUILTIN_CHECKS)
+
+
+def test_duplicate_names_rejected() -> None:
+    with pytest.raises(PipelineError):
+        run_checks(_context(), [Check(name='mx', run=lambda ctx: None), *BUILTIN_CHECKS])
+
+
+def test_user_check_uses_mx_hosts_and_reports_in_extra() -> None:
+    def mx_count(ctx: CheckContext) -> int:
+        return len(ctx.inputs['mx_hosts'])
+
+    opts = ValidationOptions(
+        run_spf=False,
+        run_dmarc=False,
+        run_dkim=False,
+        run_ssl=False,
+        checks=[Check(name='mx_count', run=mx_count, requires=('mx_hosts',))],
+    )
+    mx = MXVerificationReport(valid=True, records=['mx1.example.com', 'mx2.example.com'])
+    with patch('src.mx.extract_mx_record_info', return_value=mx):
+        r = validate_email_and_domain('user@example.com', options=opts)
+    assert r.mx.valid is True
+    assert r.extra == {'mx_count': 2}
+    assert r.to_dict()['extra'] == {'mx_count': 2}
+
+
+def test_user_check_skipped_when_syntax_invalid() -> None:
+    opts = ValidationOptions(
+        run_mx=True,
+        run_spf=False,
+        run_dmarc=False,
+        run_dkim=False,
+        run_ssl=False,
+        checks=[Check(name='needs_mx', run=lambda ctx: 'ran', requires=('mx_hosts',))],
+    )
+    r = validate_email_and_domain('not-an-email', options=opts)
+    assert r.mx.valid is None
+    assert not r.extra
+    assert r.skipped == ['mx', 'needs_mx']
+
+
+def _checks(ran: list[str], **valid: bool) -> list[Check]:
+    def run(name: str, _ctx: CheckContext) -> MXVerificationReport:
+        ran.append(name)
+        return MXVerificationReport(valid=valid[name], records=None)
+
+    return [Check(name=name, run=partial(run, name)) for name in valid]
+
+
+def test_syntax_policy_skips_everything_for_invalid_syntax() -> None:
+    ctx = _context()
+    ctx.options = ValidationOptions(policy='syntax')
+    ran: list[str] = []
+    skipped: list[str] = []
+    assert not run_checks(ctx, _checks(ran, a=True, b=True), skipped=skipped)
+    assert not ran
+    assert skipped == ['a', 'b']
+    assert set(run_checks(_context(normalized_email='user@example.com'), _checks(ran, a=True, b=True))) == {'a', 'b'}
+
+
+def test_gated_check_waits_for_and_needs_a_valid_gate() -> None:
+    policy = ValidationPolicy('custom', gates={'expensive': ('cheap',), 'other': ('missing',)})
+    for cheap_valid, expected in ((True, ['cheap', 'expensive', 'other']), (False, ['cheap', 'other'])):
+        ctx = _context()
+        ctx.options = ValidationOptions(policy=policy)
+        ran: list[str] = []
+        skipped: list[str] = []
+        run_checks(ctx, _checks(ran, expensive=True, cheap=cheap_valid, other=True), max_workers=1, skipped=skipped)
+        assert ran == expected
+        assert skipped == ([] if cheap_valid else ['expensive'])
+
+
+def test_fail_fast_skips_checks_not_started() -> None:
+    ctx = _context(normalized_email='user@example.com')
+    ctx.options = ValidationOptions(policy='fail_fast')
+    ran: list[str] = []
+    skipped: list[str] = []
+    reports = run_checks(ctx, _checks(ran, a=True, b=False, c=True, d=True), max_workers=1, skipped=skipped)
+    assert ran == ['a', 'b']
+    assert set(reports) == {'a', 'b'}
+    assert skipped == ['c', 'd']
+
+
+def test_unknown_policy_rejected() -> None:
+    ctx = _context()
+    ctx.options = ValidationOptions(policy='nope')
+    with pytest.raises(PipelineError):
+        run_checks(ctx, [])
@@ -0,0 +1,115 @@
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+
+from src.cli import main
+from src.instrumentation import CheckEvent, DNSQueryEvent, TLSProbeEvent
+from src.profiling import Profiler
+
+
+def _dns(check: str, domain: str, name: str, rdtype: str = 'TXT', duration_ms: float = 1.0) -> DNSQueryEvent:
+    return DNSQueryEvent(
+        check=check,
+        domain=domain,
+        name=name,
+        rdtype=rdtype,
+        upstream=None,
+        duration_ms=duration_ms,
+        outcome='ok',
+        ttl=300,
+        cached=False,
+    )
+
+
+def _tls(outcome: str, connect_ms: float, handshake_ms: float, duration_ms: float) -> TLSProbeEvent:
+    return TLSProbeEvent(
+        check='ssl',
+        domain='example.com',
+        host='example.com',
+        ip=None,
+        port=443,
+        duration_ms=duration_ms,
+        connect_ms=connect_ms,
+        handshake_ms=handshake_ms,
+        tls_version=None,
+        outcome=outcome,
+    )
+
+
+def test_steps_are_labelled_per_include_selector_and_record_type() -> None:
+    profiler = Profiler()
+    profiler.on_dns_query(_dns('spf', 'example.com', 'example.com', duration_ms=2.0))
+    profiler.on_dns_query(_dns('spf', 'example.com', '_spf.google.com', duration_ms=5.0))
+    profiler.on_dns_query(_dns('dkim', 'example.com', 'google._domainkey.example.com'))
+    profiler.on_dns_query(_dns('mx', 'example.com', 'example.com.', rdtype='MX'))
+    profiler.on_dns_query(_dns('dmarc', 'example.com', '_dmarc.example.com'))
+    stages = profiler.snapshot()['stages']
+    assert list(stages) == ['mx', 'spf', 'dmarc', 'dkim']
+    assert list(stages['spf']['steps']) == ['include _spf.google.com', 'record']
+    assert list(stages['dkim']['steps']) == ['selector google']
+    assert list(stages['mx']['steps']) == ['MX']
+    assert list(stages['dmarc']['steps']) == ['record']
+
+
+def test_aggregates_across_validations() -> None:
+    profiler = Profiler()
+    for domain in ('a.com', 'b.com'):
+        profiler.on_check(CheckEvent(check='syntax', domain=domain, duration_ms=0.5))
+        profiler.on_check(CheckEvent(check='spf', domain=domain, duration_ms=10.0))
+        profiler.on_dns_query(_dns('spf', domain, 'mailgun.org', duration_ms=4.0))
+    snapshot = profiler.snapshot()
+    assert snapshot['validations'] == 2
+    assert snapshot['stages']['spf']['calls'] == 2
+    assert snapshot['stages']['spf']['total_ms'] == 20.0
+    assert snapshot['stages']['spf']['steps']['include mailgun.org'] == {'calls': 2, 'total_ms': 8.0, 'mean_ms': 4.0}
+
+
+def test_tls_probe_split_into_connect_handshake_and_parse() -> None:
+    profiler = Profiler()
+    profiler.on_tls_probe(_tls('ok', connect_ms=10.0, handshake_ms=30.0, duration_ms=45.0))
+    profiler.on_tls_probe(_tls('timeout', connect_ms=100.0, handshake_ms=0.0, duration_ms=100.0))
+    steps = profiler.snapshot()['stages']['ssl']['steps']
+    assert steps['connect'] == {'calls': 2, 'total_ms': 110.0, 'mean_ms': 55.0}
+    assert steps['handshake']['calls'] == 1
+    assert steps['parse']['total_ms'] == 5.0
+
+
+def test_custom_checks_follow_builtin_stages() -> None:
+    profiler = Profiler()
+    profiler.on_check(CheckEvent(check='blocklist', domain='example.com', duration_ms=1.0))
+    profiler.on_check(CheckEvent(check='ssl', domain='example.com', duration_ms=1.0))
+    profiler.on_check(CheckEvent(check='syntax', domain='example.com', duration_ms=1.0))
+    assert list(profiler.snapshot()['stages']) == ['syntax', 'ssl', 'blocklist']
+
+
+def test_render_lists_stages_and_steps() -> None:
+    profiler = Profiler()
+    profiler.on_check(CheckEvent(check='syntax', domain='example.com', duration_ms=0.25))
+    profiler.on_check(CheckEvent(check='dkim', domain='example.com', duration_ms=12.0))
+    profiler.on_dns_query(_dns('dkim', 'example.com', 's1._domainkey.example.com', duration_ms=12.0))
+    lines = profiler.render().splitlines()
+    assert lines[0].split() == ['stage', 'calls', 'total', 'ms', 'mean', 'ms']
+    assert lines[1].split() == ['syntax', '1', '0.25', '0.25']
+    assert lines[3].split() == ['selector', 's1', '1', '12.00', '12.00']
+    assert lines[-1] == '1 validation(s)'
+
+
+def test_cli_profile_outputs(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    sidecar, dump = tmp_path / 'profile.json', tmp_path / 'run.pstats'
+    checks = ['--no-mx', '--no-spf', '--no-dmarc', '--no-dkim', '--no-ssl']
+    main(['user@example.com', *checks, '--profile', '--profile-json', str(sidecar), '--pstats', str(dump)])
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)['email_valid'] is True
+    assert captured.err.splitlines()[1].split()[:2] == ['syntax', '1']
+    assert json.loads(sidecar.read_text())['validations'] == 1
+    assert pstats.Stats(str(dump)).get_stats_profile().func_profiles
+
+
+def test_cli_profile_aggregates_batch(tmp_path: Path) -> None:
+    emails, sidecar = tmp_path / 'emails.txt', tmp_path / 'profile.json'
+    emails.write_text('a@example.com\nb@example.com\nnot-an-email\n')
+    checks = ['--no-mx', '--no-spf', '--no-dmarc', '--no-dkim', '--no-ssl']
+    main(['--input', str(emails), '--output', str(tmp_path / 'out.ndjson'), *checks, '--profile-json', str(sidecar)])
+    assert json.loads(sidecar.read_text())['stages']['syntax']['calls'] == 3
@@ -0,0 +1,37 @@
+from src.models import DKIM_SELECTORS
+from src.providers import detect_providers, prioritize_selectors
+
+
+def test_detect_from_mx_and_spf() -> None:
+    providers = detect_providers(
+        mx_hosts=['ALT1.ASPMX.L.GOOGLE.COM.', 'aspmx.l.google.com'],
+        spf_includes=['sendgrid.net', '_spf.google.com', 'spf.protection.outlook.com'],
+    )
+    assert [provider.name for provider in providers] == ['google', 'sendgrid', 'microsoft']
+
+
+def test_suffix_match_is_label_aligned() -> None:
+    assert not detect_providers(mx_hosts=['mail.notgoogle.com'], spf_includes=['fakesendgrid.net'])
+
+
+def test_microsoft_selectors_first() -> None:
+    selectors = prioritize_selectors(mx_hosts=['contoso-com.mail.protection.outlook.com'])
+    assert selectors[:2] == ['selector1', 'selector2']
+    assert sorted(selectors) == sorted(set(DKIM_SELECTORS) | {'selector1'})
+    assert len(selectors) == len(set(selectors))
+
+
+def test_provider_selectors_outside_default_list_are_probed() -> None:
+    selectors = prioritize_selectors(mx_hosts=['mail.protonmail.ch'])
+    assert selectors[:3] == ['protonmail', 'protonmail2', 'protonmail3']
+    assert set(DKIM_SELECTORS) < set(selectors)
+
+
+def test_narrow() -> None:
+    assert prioritize_selectors(spf_includes=['sendgrid.net'], narrow=True) == ['s1', 's2', 'sendgrid', 'smtpapi']
+    assert prioritize_selectors(spf_includes=['unknown.example'], narrow=True) == DKIM_SELECTORS
+
+
+def test_no_signals_keep_default_order() -> None:
+    assert prioritize_selectors() == DKIM_SELECTORS
+    assert prioritize_selectors(selectors=['a', 'b']) == ['a', 'b']
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from src.blocklist import build_blocklist_index
+from src.exceptions import PublicSuffixError
+from src.public_suffix import PublicSuffixIndex, bundled_public_suffixes, compile_public_suffix_list
+
+_RULES = """// ===BEGIN ICANN DOMAINS===
+uk
+co.uk
+*.ck
+!www.ck
+jp
+*.kawasaki.jp
+!city.kawasaki.jp
+// IDN rules are stored IDNA-encoded
+公司.cn
+"""
+
+
+@pytest.fixture(name='suffixes')
+def _suffixes(tmp_path: Path) -> PublicSuffixIndex:
+    source = tmp_path / 'public_suffix_list.dat'
+    source.write_text(_RULES, encoding='utf-8')
+    assert compile_public_suffix_list(source, tmp_path / 'psl.idx') == 8
+    return PublicSuffixIndex(tmp_path / 'psl.idx')
+
+
+@pytest.mark.parametrize(
+    ('domain', 'suffix', 'org'),
+    [
+        ('mail.corp.example.co.uk', 'co.uk', 'example.co.uk'),
+        ('example.uk', 'uk', 'example.uk'),
+        ('co.uk', 'co.uk', 'co.uk'),
+        ('a.b.ck', 'b.ck', 'a.b.ck'),
+        ('a.www.ck', 'ck', 'www.ck'),
+        ('x.y.kawasaki.jp', 'y.kawasaki.jp', 'x.y.kawasaki.jp'),
+        ('x.city.kawasaki.jp', 'kawasaki.jp', 'city.kawasaki.jp'),
+        ('mail.example.公司.cn', 'xn--55qx5d.cn', 'example.xn--55qx5d.cn'),
+        ('Mail.Example.COM.', 'com', 'example.com'),
+    ],
+)
+def test_public_suffix_rules(suffixes: PublicSuffixIndex, domain: str, suffix: str, org: str) -> None:
+    assert suffixes.public_suffix(domain) == suffix
+    assert suffixes.organizational_domain(domain) == org
+
+
+def test_bundled_index() -> None:
+    assert bundled_public_suffixes() is bundled_public_suffixes()
+    assert bundled_public_suffixes().organizational_domain('user.mail.example.co.uk') == 'example.co.uk'
+
+
+def test_invalid_index_rejected(tmp_path: Path) -> None:
+    with pytest.raises(PublicSuffixError):
+        compile_public_suffix_list(tmp_path / 'missing.dat', tmp_path / 'psl.idx')
+    source = tmp_path / 'list.txt'
+    source.write_text('example.com\n')
+    build_blocklist_index([source], tmp_path / 'blocklist.idx')
+    with pytest.raises(PublicSuffixError):
+        PublicSuffixIndex(tmp_path / 'blocklist.idx')
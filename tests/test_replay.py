@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+from typing import cast
+from unittest.mock import MagicMock, patch
+
+import dns.message
+import dns.resolver
+import dns.rrset
+import pytest
+from dns.rdataclass import RdataClass
+from dns.rdatatype import RdataType
+
+from src.cli import main
+from src.exceptions import RecordingError
+from src.replay import RecordedQuery, RecordingResolver, ReplayResolver, save_recording
+from src.utils import get_domain_policy_record
+
+
+def _answer(name: str, rdtype: str, *rdata: str) -> dns.resolver.Answer:
+    query = dns.message.make_query(name, rdtype)
+    response = dns.message.make_response(query)
+    response.answer.append(dns.rrset.from_text_list(name, 300, 'IN', rdtype, list(rdata)))
+    # Round-trip through the wire format, as a resolver would see it.
+    parsed = cast(dns.message.QueryMessage, dns.message.from_wire(response.to_wire()))
+    return dns.resolver.Answer(dns.name.from_text(name), RdataType.make(rdtype), RdataClass.IN, parsed)
+
+
+def _record(tmp_path: Path) -> Path:
+    inner = MagicMock()
+
+    def resolve(qname: str, *_args: object, **_kwargs: object) -> dns.resolver.Answer:
+        if qname == 'example.com':
+            return _answer('example.com.', 'TXT', '"v=spf1 -all"')
+        if qname == '_dmarc.example.com':
+            raise dns.resolver.NXDOMAIN()
+        raise dns.resolver.LifetimeTimeout(timeout=1.0, errors={})
+
+    inner.resolve.side_effect = resolve
+    recorder = RecordingResolver(inner)
+    assert get_domain_policy_record('example.com', 'v=spf1', resolver=recorder) == 'v=spf1 -all'
+    for name in ('_dmarc.example.com', 'slow.example.com'):
+        with pytest.raises(dns.resolver.NXDOMAIN if name.startswith('_dmarc') else dns.resolver.LifetimeTimeout):
+            recorder.resolve(name, 'TXT')
+    recorder.resolve('example.com', RdataType.TXT)
+    assert recorder.recorded == 3
+    path = tmp_path / 'dns.ndjson.gz'
+    recorder.save(path)
+    return path
+
+
+def test_replay_serves_recorded_answers_and_errors(tmp_path: Path) -> None:
+    replay = ReplayResolver(_record(tmp_path))
+    assert get_domain_policy_record('example.com', 'v=spf1', resolver=replay) == 'v=spf1 -all'
+    assert replay.resolve('EXAMPLE.com.', 'TXT').rrset is not None
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        replay.resolve('_dmarc.example.com', 'TXT')
+    with pytest.raises(dns.resolver.LifetimeTimeout):
+        replay.resolve('slow.example.com', 'TXT')
+    assert replay.misses == 0
+
+
+def test_replay_miss_counted(tmp_path: Path) -> None:
+    replay = ReplayResolver(_record(tmp_path))
+    with pytest.raises(dns.resolver.NoNameservers):
+        replay.resolve('example.com', 'MX')
+    assert replay.misses == 1
+
+
+def test_replay_latency(tmp_path: Path) -> None:
+    path = tmp_path / 'dns.ndjson.gz'
+    save_recording(path, [RecordedQuery('example.com', 'MX', 'no_answer', 250.0)])
+    with patch('src.replay.time.sleep') as sleep, pytest.raises(dns.resolver.NoAnswer):
+        ReplayResolver(path, latency=True).resolve('example.com', 'MX')
+    sleep.assert_called_once_with(0.25)
+
+
+def test_invalid_recording(tmp_path: Path) -> None:
+    path = tmp_path / 'bad.gz'
+    path.write_text('not gzip', encoding='utf-8')
+    with pytest.raises(RecordingError):
+        ReplayResolver(path)
+
+
+def test_cli_replay(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    path = _record(tmp_path)
+    main(['user@example.com', '--no-mx', '--no-dkim', '--no-ssl', '--replay-dns', str(path), '--compact'])
+    result = json.loads(capsys.readouterr().out)
+    assert result['spf']['valid'] is True
+    assert result['dmarc']['valid'] is False
+
+
+def test_cli_record(tmp_path: Path) -> None:
+    path = tmp_path / 'dns.ndjson.gz'
+    with patch('src.replay.dns.resolver.get_default_resolver') as default:
+        default.return_value.resolve.side_effect = dns.resolver.NoAnswer()
+        main(['user@example.com', '--no-mx', '--no-dkim', '--no-ssl', '--record-dns', str(path)])
+    replay = ReplayResolver(path)
+    with pytest.raises(dns.resolver.NoAnswer):
+        replay.resolve('_dmarc.example.com', 'TXT')
@@ -0,0 +1,174 @@
+import io
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.cli import main
+from src.models import (
+    DKIMVerificationReport,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFVerificationReport,
+    SSLCertInfo,
+    SSLVerificationReport,
+    ValidationOptions,
+)
+from src.revalidate import DAY, iter_revalidate, run_revalidation, stale_checks
+
+NOW = 1_800_000_000.0
+
+
+def _cert(days_left: int) -> SSLCertInfo:
+    return SSLCertInfo(
+        host='example.com',
+        resolved_ip='1.2.3.4',
+        tls_version='TLS 1.3',
+        issued_to='example.com',
+        issued_o=None,
+        issuer_cn='Test CA',
+        issuer_o='Test CA',
+        issuer_ou=None,
+        issuer_c='US',
+        cert_sn='7',
+        cert_alg='1.2.840.113549.1.1.11',
+        cert_ver=2,
+        cert_sans=['example.com'],
+        cert_exp=False,
+        cert_age=10,
+        valid_from='2027-01-01',
+        valid_till='2027-04-01',
+        validity_days=90,
+        days_left=days_left,
+    )
+
+
+def _previous(email: str = 'user@example.com', age_days: float = 7, days_left: int = 60) -> EmailDomainValidationResult:
+    fetched_at = NOW - age_days * DAY
+    domain = email.rpartition('@')[2]
+    return EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email=email,
+        domain=domain,
+        mx=MXVerificationReport(valid=True, records=[f'mx.{domain}'], fetched_at=fetched_at),
+        spf=SPFVerificationReport(valid=False, info=None, fetched_at=fetched_at),
+        dmarc=DMARCVerificationReport(valid=True, record='v=DMARC1; p=none', fetched_at=fetched_at),
+        dkim=DKIMVerificationReport(valid=False, record=None, fetched_at=fetched_at),
+        ssl=SSLVerificationReport(valid=True, info=_cert(days_left), fetched_at=fetched_at),
+    )
+
+
+def test_stale_checks() -> None:
+    assert not stale_checks(_previous(), NOW)
+    assert stale_checks(_previous(age_days=31), NOW) == ['mx', 'spf', 'dmarc', 'dkim', 'ssl']
+    assert stale_checks(_previous(), NOW, max_age={'dkim': 3 * DAY}) == ['dkim']
+    # 20 days left a week ago: inside the 14-day margin now.
+    assert stale_checks(_previous(days_left=20), NOW) == ['ssl']
+    unfetched = replace(_previous(), dkim=DKIMVerificationReport(valid=False, record=None))
+    assert stale_checks(unfetched, NOW) == ['dkim']
+
+
+def test_stale_checks_honor_ttl() -> None:
+    previous = _previous()
+    previous = replace(previous, dmarc=replace(previous.dmarc, ttl=3600), mx=replace(previous.mx, ttl=30 * DAY))
+    assert not stale_checks(previous, NOW)
+    assert stale_checks(previous, NOW, honor_ttl=True) == ['dmarc']
+
+
+@patch('src.ssl_.extract_ssl_cert_info')
+@patch('src.mx.extract_mx_record_info')
+def test_only_stale_checks_rerun_once_per_domain(mock_mx: MagicMock, mock_ssl: MagicMock) -> None:
+    mock_ssl.return_value = SSLVerificationReport(valid=True, info=replace(_cert(85), valid_till='2027-07-01'))
+    previous = [_previous('a@example.com', days_left=20), _previous('b@example.com', days_left=20)]
+    revalidations = list(iter_revalidate(previous, now=NOW))
+    mock_mx.assert_not_called()
+    mock_ssl.assert_called_once_with('example.com', timeout=5)
+    first = revalidations[0]
+    assert first.rechecked == ['ssl']
+    assert first.result.mx is previous[0].mx
+    assert first.result.ssl.info == mock_ssl.return_value.info
+    assert first.result.ssl.fetched_at is not None
+    assert first.changes == {'ssl': {'info.valid_till': ['2027-04-01', '2027-07-01']}}
+    assert [r.result.normalized_email for r in revalidations] == ['a@example.com', 'b@example.com']
+
+
+@patch('src.dkim.extract_dkim_record_info', return_value=DKIMVerificationReport(valid=True, record='v=DKIM1; p=x'))
+def test_rerun_check_uses_carried_inputs_and_skips_disabled(mock_dkim: MagicMock) -> None:
+    previous = replace(
+        _previous(),
+        mx=MXVerificationReport(valid=True, records=['aspmx.l.google.com'], fetched_at=NOW),
+        dkim=DKIMVerificationReport(valid=False, record=None),
+    )
+    options = ValidationOptions(run_ssl=False)
+    [revalidation] = iter_revalidate(
+        [replace(previous, ssl=SSLVerificationReport(valid=False, info=None))], options=options, now=NOW
+    )
+    assert revalidation.rechecked == ['dkim']
+    assert mock_dkim.call_args.kwargs['selectors'][0] == 'google'
+    assert revalidation.changes == {'dkim': {'valid': [False, True], 'record': [None, 'v=DKIM1; p=x']}}
+
+
+@patch('src.ssl_.extract_ssl_cert_info', return_value=SSLVerificationReport(valid=True, info=_cert(60)))
+@patch('src.dkim.extract_dkim_record_info', return_value=DKIMVerificationReport(valid=True, record='v=DKIM1; p=x'))
+@patch('src.mx.extract_mx_record_info', return_value=MXVerificationReport(valid=True, records=['mx.example.com']))
+def test_tiered_gates_see_carried_reports(mock_mx: MagicMock, mock_dkim: MagicMock, mock_ssl: MagicMock) -> None:
+    previous = replace(
+        _previous(),
+        mx=MXVerificationReport(valid=False, records=[], fetched_at=NOW),
+        dkim=DKIMVerificationReport(valid=None, record=None),
+        ssl=SSLVerificationReport(valid=None, info=None),
+        skipped=['dkim', 'ssl'],
+    )
+    options = ValidationOptions(policy='tiered')
+    [revalidation] = iter_revalidate([previous], options=options, now=NOW)
+    mock_mx.assert_not_called()
+    mock_dkim.assert_not_called()
+    mock_ssl.assert_not_called()
+    assert revalidation.rechecked == []
+    assert revalidation.result.skipped == ['dkim', 'ssl']
+
+    # Once MX is re-run and passes, the gated checks run again.
+    [revalidation] = iter_revalidate([previous], options=options, max_age={'mx': 0}, now=NOW)
+    mock_mx.assert_called_once()
+    assert revalidation.rechecked == ['mx', 'dkim', 'ssl']
+    assert revalidation.result.skipped == []
+    assert revalidation.result.dkim.valid and revalidation.result.ssl.valid
+
+
+def test_run_revalidation_writes_results_and_diff(tmp_path: Path) -> None:
+    previous_path = tmp_path / 'previous.ndjson'
+    previous = [_previous('a@example.com'), _previous('b@example.com'), _previous('c@other.org')]
+    previous_path.write_text(''.join(json.dumps(r.to_dict()) + '\n' for r in previous), encoding='utf-8')
+    output, diff = io.BytesIO(), io.BytesIO()
+    changed = DMARCVerificationReport(valid=True, record='v=DMARC1; p=reject')
+    with patch('src.dmarc.extract_dmarc_record_info', return_value=changed), patch('src.revalidate.time.time') as now:
+        now.return_value = NOW
+        summary = run_revalidation(previous_path, output, diff=diff, max_age={'dmarc': 0})
+    assert summary.results == 3
+    assert summary.rechecked == {'dmarc': 3}
+    assert summary.changed_domains == 2
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r['dmarc']['record'] for r in results] == ['v=DMARC1; p=reject'] * 3
+    assert results[0]['mx'] == previous[0].to_dict()['mx']
+    diffs = [json.loads(line) for line in diff.getvalue().splitlines()]
+    assert [d['domain'] for d in diffs] == ['example.com', 'other.org']
+    assert diffs[0]['changes'] == {'dmarc': {'record': ['v=DMARC1; p=none', 'v=DMARC1; p=reject']}}
+
+
+def test_cli_revalidate(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    previous_path = tmp_path / 'previous.ndjson'
+    previous_path.write_text(json.dumps(_previous().to_dict()) + '\n', encoding='utf-8')
+    output_path, diff_path = tmp_path / 'out.ndjson', tmp_path / 'diff.ndjson'
+    argv = ['--revalidate', str(previous_path), '--output', str(output_path), '--diff', str(diff_path)]
+    with patch('src.revalidate.time.time', return_value=NOW):
+        main(argv)
+    assert json.loads(output_path.read_text(encoding='utf-8')) == _previous().to_dict()
+    assert not diff_path.read_text(encoding='utf-8')
+    assert 'rechecked: none' in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        main(['user@example.com', '--revalidate', str(previous_path)])
+    with pytest.raises(SystemExit):
+        main(['user@example.com', '--diff', str(diff_path)])
@@ -1,8 +1,20 @@
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import replace
 from unittest.mock import MagicMock, patch
 
+import dns.message
 import dns.resolver
+import dns.rrset
 
+from src.cache import DomainReportCache
+from src.instrumentation import CheckEvent, DNSQueryEvent, ValidationHooks
+from src.metrics import ValidationMetrics
 from src.models import (
+    DKIM_SELECTORS,
     CatchAllSecurityLevel,
     DKIMVerificationReport,
     DMARCVerificationReport,
@@ -14,7 +26,9 @@ from src.models import (
     SSLVerificationReport,
     ValidationOptions,
 )
-from src.runner import validate_email_and_domain
+from src.pipeline import Check, CheckContext
+from src.runner import iter_validate, validate_email_and_domain, validate_lazily
+from src.selector_stats import SelectorStats
 
 _MOCK_MX = MXVerificationReport(valid=True, records=['mx1.example.com'])
 _MOCK_SPF = SPFVerificationReport(
@@ -95,11 +109,11 @@ def test_validate_email_and_domain_options_disable_checks() -> None:
     assert r.ssl.valid is False
 
 
-@patch('src.runner.extract_ssl_cert_info', return_value=_MOCK_SSL)
-@patch('src.runner.extract_dkim_record_info', return_value=_MOCK_DKIM)
-@patch('src.runner.extract_dmarc_record_info', return_value=_MOCK_DMARC)
-@patch('src.runner.extract_spf_record_info', return_value=_MOCK_SPF)
-@patch('src.runner.extract_mx_record_info', return_value=_MOCK_MX)
+@patch('src.ssl_.extract_ssl_cert_info', return_value=_MOCK_SSL)
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.dmarc.extract_dmarc_record_info', return_value=_MOCK_DMARC)
+@patch('src.spf.extract_spf_record_info', return_value=_MOCK_SPF)
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
 def test_all_checks_succeed(
     mock_mx: MagicMock,
     mock_spf: MagicMock,
@@ -121,18 +135,18 @@ def test_all_checks_succeed(
     assert r.dkim.record == _MOCK_DKIM.record
     assert r.ssl.valid is True
     assert r.ssl.info == _MOCK_SSL.info
-    mock_mx.assert_called_once_with('user@example.com', timeout=5)
+    mock_mx.assert_called_once_with('user@example.com', timeout=5, resolver=None, normalized_email='user@example.com')
     mock_spf.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5)
+    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5, org_domain='example.com', cache=None)
+    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5, selectors=DKIM_SELECTORS)
     mock_ssl.assert_called_once_with('example.com', timeout=5)
 
 
-@patch('src.runner.extract_ssl_cert_info', return_value=SSLVerificationReport(valid=False, info=None))
-@patch('src.runner.extract_dkim_record_info', return_value=_MOCK_DKIM)
-@patch('src.runner.extract_dmarc_record_info', return_value=DMARCVerificationReport(valid=False, record=None))
-@patch('src.runner.extract_spf_record_info', return_value=_MOCK_SPF)
-@patch('src.runner.extract_mx_record_info', return_value=_MOCK_MX)
+@patch('src.ssl_.extract_ssl_cert_info', return_value=SSLVerificationReport(valid=False, info=None))
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.dmarc.extract_dmarc_record_info', return_value=DMARCVerificationReport(valid=False, record=None))
+@patch('src.spf.extract_spf_record_info', return_value=_MOCK_SPF)
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
 def test_mixed_results(
     mock_mx: MagicMock,
     mock_spf: MagicMock,
@@ -148,18 +162,18 @@ def test_mixed_results(
     assert r.dkim.valid is True
     assert r.ssl.valid is False
     assert r.ssl.info is None
-    mock_mx.assert_called_once_with('user@example.com', timeout=5)
+    mock_mx.assert_called_once_with('user@example.com', timeout=5, resolver=None, normalized_email='user@example.com')
     mock_spf.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5)
+    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5, org_domain='example.com', cache=None)
+    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5, selectors=DKIM_SELECTORS)
     mock_ssl.assert_called_once_with('example.com', timeout=5)
 
 
-@patch('src.runner.extract_ssl_cert_info', return_value=_MOCK_SSL)
-@patch('src.runner.extract_dkim_record_info', return_value=_MOCK_DKIM)
-@patch('src.runner.extract_dmarc_record_info', return_value=_MOCK_DMARC)
-@patch('src.runner.extract_spf_record_info', return_value=_MOCK_SPF)
-@patch('src.runner.extract_mx_record_info', return_value=_MOCK_MX)
+@patch('src.ssl_.extract_ssl_cert_info', return_value=_MOCK_SSL)
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.dmarc.extract_dmarc_record_info', return_value=_MOCK_DMARC)
+@patch('src.spf.extract_spf_record_info', return_value=_MOCK_SPF)
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
 def test_default_options_runs_all_checks(
     mock_mx: MagicMock,
     mock_spf: MagicMock,
@@ -174,8 +188,313 @@ def test_default_options_runs_all_checks(
     assert r.dmarc.valid is True
     assert r.dkim.valid is True
     assert r.ssl.valid is True
-    mock_mx.assert_called_once_with('user@example.com', timeout=5)
+    mock_mx.assert_called_once_with('user@example.com', timeout=5, resolver=None, normalized_email='user@example.com')
     mock_spf.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5)
-    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5)
+    mock_dmarc.assert_called_once_with('example.com', resolver=None, timeout=5, org_domain='example.com', cache=None)
+    mock_dkim.assert_called_once_with('example.com', resolver=None, timeout=5, selectors=DKIM_SELECTORS)
     mock_ssl.assert_called_once_with('example.com', timeout=5)
+
+
+def test_package_import_defers_heavy_dependencies() -> None:
+    heavy = ['dns.resolver', 'email_validator', 'cryptography.x509', 'ssl']
+    code = f'import sys, src; print([m for m in {heavy!r} if m in sys.modules])'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
+
+
+def test_disabled_checks_do_not_import_their_modules() -> None:
+    code = (
+        'import sys\n'
+        'from src.models import ValidationOptions\n'
+        'from src.runner import iter_validate, validate_email_and_domain\n'
+        'validate_email_and_domain("a@b.co", options=ValidationOptions(run_mx=False, run_spf=False, '
+        'run_dmarc=False, run_dkim=False, run_ssl=False))\n'
+        'print([m for m in ("src.ssl_", "src.dkim", "cryptography.x509", "dns.resolver") if m in sys.modules])\n'
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
+
+
+def _fake_validate(
+    email: str,
+    options: ValidationOptions | None = None,  # pylint: disable=unused-argument
+) -> EmailDomainValidationResult:
+    # Earlier inputs finish later, so completion order differs from input order.
+    time.sleep(0.01 * (5 - int(email.split('@')[0][1:])))
+    return EmailDomainValidationResult(
+        email_valid=True,
+        normalized_email=email,
+        domain='example.com',
+        mx=_MOCK_MX,
+        spf=_MOCK_SPF,
+        dmarc=_MOCK_DMARC,
+        dkim=_MOCK_DKIM,
+        ssl=_MOCK_SSL,
+    )
+
+
+@patch('src.runner.validate_email_and_domain', side_effect=_fake_validate)
+def test_iter_validate_preserves_input_order(_mock: MagicMock) -> None:
+    emails = [f'u{i}@example.com' for i in range(5)]
+    results = list(iter_validate(emails, window=3))
+    assert [r.normalized_email for r in results] == emails
+
+
+@patch('src.runner.validate_email_and_domain', side_effect=_fake_validate)
+def test_iter_validate_completion_order(_mock: MagicMock) -> None:
+    emails = [f'u{i}@example.com' for i in range(5)]
+    results = [str(r.normalized_email) for r in iter_validate(emails, window=5, ordered=False)]
+    assert sorted(results) == sorted(emails)
+    assert results != emails
+
+
+@patch('src.runner.validate_email_and_domain', side_effect=_fake_validate)
+def test_iter_validate_pulls_input_lazily(_mock: MagicMock) -> None:
+    pulled: list[str] = []
+
+    def source() -> Iterator[str]:
+        for i in range(5):
+            pulled.append(f'u{i}@example.com')
+            yield pulled[-1]
+
+    stream = iter_validate(source(), window=2)
+    first = next(stream)
+    assert first.normalized_email == 'u0@example.com'
+    assert len(pulled) == 2
+    stream.close()
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_collect_stats_per_check(_mock_mx: MagicMock) -> None:
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), run_ssl=False, collect_stats=True)
+    r = validate_email_and_domain('user@example.com', options=opts)
+    assert r.stats is not None
+    assert set(r.stats) == {'syntax', 'mx', 'spf', 'dmarc', 'dkim'}
+    assert r.stats['dmarc'].dns_queries == 1
+    assert 'stats' in r.to_dict()
+
+
+def test_stats_absent_by_default() -> None:
+    opts = ValidationOptions(run_mx=False, run_spf=False, run_dmarc=False, run_dkim=False, run_ssl=False)
+    r = validate_email_and_domain('a@b.co', options=opts)
+    assert r.stats is None
+    assert 'stats' not in r.to_dict()
+
+
+class _RecordingHooks(ValidationHooks):
+    def __init__(self) -> None:
+        self.checks: list[CheckEvent] = []
+        self.dns: list[DNSQueryEvent] = []
+
+    def on_check(self, event: CheckEvent) -> None:
+        self.checks.append(event)
+
+    def on_dns_query(self, event: DNSQueryEvent) -> None:
+        self.dns.append(event)
+
+
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.mx.extract_mx_record_info', return_value=MXVerificationReport(valid=True, records=['aspmx.l.google.com']))
+def test_dkim_probes_detected_provider_selectors_first(_mock_mx: MagicMock, mock_dkim: MagicMock) -> None:
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), run_ssl=False)
+    validate_email_and_domain('user@example.com', options=opts)
+    assert mock_dkim.call_args.kwargs['selectors'][0] == 'google'
+    validate_email_and_domain('user@example.com', options=replace(opts, dkim_narrow_selectors=True))
+    assert 'selector1' not in mock_dkim.call_args.kwargs['selectors']
+    stats = SelectorStats()
+    validate_email_and_domain('user@example.com', options=replace(opts, dkim_selector_stats=stats))
+    assert mock_dkim.call_args.kwargs['stats'] is stats
+    assert mock_dkim.call_args.kwargs['stats_key'] == 'google'
+
+
+@patch('src.ssl_.extract_ssl_cert_info', return_value=_MOCK_SSL)
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.mx.extract_mx_record_info', return_value=MXVerificationReport(valid=False, records=None))
+def test_tiered_policy_skips_dkim_and_ssl_without_mx(
+    _mock_mx: MagicMock, mock_dkim: MagicMock, mock_ssl: MagicMock
+) -> None:
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), policy='tiered')
+    r = validate_email_and_domain('user@example.com', options=opts)
+    mock_dkim.assert_not_called()
+    mock_ssl.assert_not_called()
+    assert r.skipped == ['dkim', 'ssl']
+    assert r.to_dict()['skipped'] == ['dkim', 'ssl']
+    # Skipped is not invalid: the reports carry valid=None, while the checks that ran keep their verdict.
+    assert r.to_dict()['dkim'] == {'valid': None, 'record': None, 'info': None, 'fetched_at': None, 'ttl': None}
+    assert r.ssl.valid is None
+    assert r.mx.valid is False
+    assert validate_email_and_domain('bad-email', options=opts).skipped == ['mx', 'spf', 'dmarc', 'dkim', 'ssl']
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_hooks_receive_dns_events_per_check(_mock_mx: MagicMock) -> None:
+    hooks = _RecordingHooks()
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), run_dkim=False, run_ssl=False, hooks=hooks)
+    r = validate_email_and_domain('user@example.com', options=opts)
+    assert r.stats is None
+    events = {e.check: e for e in hooks.dns}
+    assert set(events) == {'spf', 'dmarc'}
+    assert events['dmarc'].name == '_dmarc.example.com'
+    assert events['dmarc'].rdtype == 'TXT'
+    assert events['dmarc'].outcome == 'no_answer'
+    assert events['spf'].upstream is None
+    assert events['spf'].domain == 'example.com'
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_hooks_receive_check_events(_mock_mx: MagicMock) -> None:
+    hooks = _RecordingHooks()
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), run_dkim=False, run_ssl=False, hooks=hooks)
+    validate_email_and_domain('user@example.com', options=opts)
+    assert sorted(e.check for e in hooks.checks) == ['dmarc', 'mx', 'spf', 'syntax']
+    assert {e.domain for e in hooks.checks} == {'example.com'}
+    assert all(e.duration_ms >= 0 for e in hooks.checks)
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_equivalent_domains_share_one_lookup(_mock_mx: MagicMock) -> None:
+    cache = DomainReportCache()
+    opts = ValidationOptions(
+        resolver=_resolver_that_raises_no_answer(), run_dkim=False, run_ssl=False, domain_cache=cache
+    )
+    emails = ['a@bücher.example', 'B@BÜCHER.EXAMPLE', 'c@xn--bcher-kva.example', 'd@xn--bcher-kva.example.']
+    results = [validate_email_and_domain(email, options=opts) for email in emails]
+    assert {r.domain for r in results} == {'xn--bcher-kva.example'}
+    # One miss per per-domain check (mx, spf, dmarc), then hits; the trailing-dot address fails syntax and skips MX.
+    assert cache.misses == 3
+    assert cache.hits == 3 * (len(emails) - 1) - 1
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_metrics_updated_by_runner_and_checks(_mock_mx: MagicMock) -> None:
+    metrics = ValidationMetrics()
+    opts = ValidationOptions(
+        resolver=_resolver_that_raises_no_answer(),
+        run_dkim=False,
+        run_ssl=False,
+        metrics=metrics,
+        domain_cache=DomainReportCache(),
+    )
+    validate_email_and_domain('a@example.com', options=opts)
+    validate_email_and_domain('b@example.com', options=opts)
+    assert metrics.validations.value('true') == 2
+    assert metrics.validation_duration.count() == 2
+    assert metrics.validations_in_flight.value() == 0
+    assert metrics.check_duration.count('dmarc') == 2
+    assert metrics.dns_queries.value('TXT', 'no_answer') == 2
+    assert metrics.domain_cache_lookups.value('spf', 'miss') == 1
+    assert metrics.domain_cache_lookups.value('spf', 'hit') == 1
+
+
+@patch('src.ssl_.extract_ssl_cert_info', return_value=_MOCK_SSL)
+@patch('src.dkim.extract_dkim_record_info', return_value=_MOCK_DKIM)
+@patch('src.dmarc.extract_dmarc_record_info', return_value=_MOCK_DMARC)
+@patch('src.spf.extract_spf_record_info', return_value=_MOCK_SPF)
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_lazy_result_runs_checks_on_first_access(
+    mock_mx: MagicMock,
+    mock_spf: MagicMock,
+    mock_dmarc: MagicMock,
+    mock_dkim: MagicMock,
+    mock_ssl: MagicMock,
+) -> None:
+    lazy = validate_lazily('user@example.com')
+    assert lazy.email_valid is True
+    assert lazy.domain == 'example.com'
+    mock_mx.assert_not_called()
+    assert lazy.mx == _MOCK_MX
+    assert lazy.mx == _MOCK_MX
+    mock_mx.assert_called_once()
+    mock_spf.assert_not_called()
+    # DKIM waits for the MX and SPF reports it orders its selectors by.
+    assert lazy.dkim == _MOCK_DKIM
+    mock_spf.assert_called_once()
+    mock_dmarc.assert_not_called()
+    mock_ssl.assert_not_called()
+    result = lazy.materialize()
+    assert result == validate_email_and_domain('user@example.com')
+    assert mock_dkim.call_count == 2
+    assert mock_ssl.call_count == 2
+    assert lazy.to_dict() == result.to_dict()
+
+
+@patch('src.mx.extract_mx_record_info', return_value=MXVerificationReport(valid=False, records=None))
+def test_lazy_result_defaults_for_disabled_and_skipped_checks(_mock_mx: MagicMock) -> None:
+    opts = ValidationOptions(run_spf=False, run_dmarc=False, policy='tiered')
+    lazy = validate_lazily('user@example.com', options=opts)
+    assert lazy.spf == SPFVerificationReport(valid=False, info=None)
+    assert lazy.ssl == SSLVerificationReport(valid=None, info=None)
+    assert lazy.skipped == ['ssl']
+    assert lazy.materialize().skipped == ['dkim', 'ssl']
+    invalid = validate_lazily('bad-email', options=opts)
+    assert invalid.email_valid is False
+    assert invalid.materialize().skipped == ['mx', 'dkim', 'ssl']
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_lazy_result_prefetch(mock_mx: MagicMock) -> None:
+    started = threading.Event()
+
+    def custom(_ctx: CheckContext) -> str:
+        started.set()
+        return 'done'
+
+    opts = ValidationOptions(
+        resolver=_resolver_that_raises_no_answer(),
+        run_dkim=False,
+        run_ssl=False,
+        collect_stats=True,
+        checks=[Check(name='custom', run=custom, requires=('mx_hosts',))],
+    )
+    lazy = validate_lazily('user@example.com', options=opts, prefetch=True)
+    assert started.wait(5)
+    result = lazy.materialize()
+    mock_mx.assert_called_once()
+    assert result.extra == {'custom': 'done'}
+    assert result.stats is not None
+    assert set(result.stats) == {'syntax', 'mx', 'spf', 'dmarc', 'custom'}
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_reports_stamped_with_fetch_time(_mock_mx: MagicMock) -> None:
+    opts = ValidationOptions(resolver=_resolver_that_raises_no_answer(), run_dkim=False, run_ssl=False)
+    before = time.time()
+    r = validate_email_and_domain('user@example.com', options=opts)
+    assert r.mx.fetched_at is not None and before <= r.mx.fetched_at <= time.time()
+    assert r.dmarc.fetched_at is not None
+    assert r.dkim.fetched_at is None
+    assert _MOCK_MX.fetched_at is None
+    restored = EmailDomainValidationResult.from_dict(r.to_dict())
+    assert restored.mx.fetched_at == r.mx.fetched_at
+
+
+class _NegativeTTLResolver(dns.resolver.Resolver):
+    def resolve(self, *_args: object, **_kwargs: object) -> dns.resolver.Answer:
+        response = dns.message.make_response(dns.message.make_query('example.com', 'TXT'))
+        soa = 'ns1.example.com. hostmaster.example.com. 1 7200 3600 1209600 120'
+        response.authority.append(dns.rrset.from_text('example.com.', 3600, 'IN', 'SOA', soa))
+        raise dns.resolver.NoAnswer(response=response)
+
+
+@patch('src.mx.extract_mx_record_info', return_value=_MOCK_MX)
+def test_reports_carry_ttl_of_negative_answers(_mock_mx: MagicMock) -> None:
+    opts = ValidationOptions(resolver=_NegativeTTLResolver(), run_dkim=False, run_ssl=False)
+    r = validate_email_and_domain('user@example.com', options=opts)
+    assert (r.spf.valid, r.spf.ttl) == (False, 120)
+    assert (r.dmarc.valid, r.dmarc.ttl) == (False, 120)
+    # No DNS answer was seen for the mocked MX check.
+    assert r.mx.ttl is None
+    assert r.to_dict()['dmarc']['ttl'] == 120
+
+
+@patch('src.dmarc.extract_dmarc_record_info', return_value=_MOCK_DMARC)
+def test_dmarc_org_domain_from_public_suffixes(mock_dmarc: MagicMock) -> None:
+    cache = DomainReportCache()
+    opts = ValidationOptions(run_mx=False, run_spf=False, run_dkim=False, run_ssl=False, domain_cache=cache)
+    validate_email_and_domain('user@mail.corp.example.co.uk', options=opts)
+    mock_dmarc.assert_called_once_with(
+        'mail.corp.example.co.uk', resolver=None, timeout=5, org_domain='example.co.uk', cache=cache
+    )
+    mock_dmarc.reset_mock()
+    validate_email_and_domain('user@example.org', options=replace(opts, dmarc_org_fallback=False, domain_cache=None))
+    mock_dmarc.assert_called_once_with('example.org', resolver=None, timeout=5)
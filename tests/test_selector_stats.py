@@ -0,0 +1,91 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.cli import main
+from src.exceptions import SelectorStatsError
+from src.selector_stats import SelectorStats
+
+_SELECTORS = ['google', 'selector1', 's1', 'k1']
+
+
+def test_order_unchanged_without_hits() -> None:
+    assert SelectorStats(exploration=0).order(_SELECTORS) == _SELECTORS
+
+
+def test_order_ranked_by_hits() -> None:
+    stats = SelectorStats(exploration=0)
+    for selector in ['k1', 's1', 'k1']:
+        stats.record(selector, 4)
+    # The first lookup of a key ranks it at once; later counts wait for the next re-sort.
+    assert stats.order(_SELECTORS) == ['k1', 'google', 'selector1', 's1']
+    stats = SelectorStats(exploration=0, resort_every=3)
+    for selector in ['k1', 's1', 's1']:
+        stats.record(selector, 4)
+    assert stats.order(_SELECTORS) == ['s1', 'k1', 'google', 'selector1']
+    assert stats.hits() == {'s1': 2, 'k1': 1}
+
+
+def test_keys_ranked_separately() -> None:
+    stats = SelectorStats(exploration=0)
+    stats.record('selector2', 2, key='microsoft')
+    assert stats.order(_SELECTORS + ['selector2'], key='microsoft')[0] == 'selector2'
+    assert stats.order(_SELECTORS) == _SELECTORS
+
+
+def test_exploration_promotes_a_later_selector() -> None:
+    stats = SelectorStats(exploration=1, seed=1)
+    stats.record('google', 1)
+    firsts = {stats.order(_SELECTORS)[0] for _ in range(50)}
+    assert 'google' not in firsts
+    assert firsts <= set(_SELECTORS[1:])
+    assert sorted(stats.order(_SELECTORS)) == sorted(_SELECTORS)
+
+
+def test_queries_per_lookup() -> None:
+    stats = SelectorStats()
+    assert stats.queries_per_lookup == 0.0
+    stats.record('google', 1)
+    stats.record(None, 5)
+    assert stats.lookups == 2
+    assert stats.queries_per_lookup == 3.0
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    path = tmp_path / 'stats.json'
+    stats = SelectorStats(exploration=0)
+    stats.record('s1', 3)
+    stats.record(None, 4, key='google')
+    stats.save(path)
+    loaded = SelectorStats.load(path, exploration=0)
+    assert loaded.hits() == {'s1': 1}
+    assert loaded.lookups == 2
+    assert loaded.queries_per_lookup == 3.5
+    assert loaded.order(_SELECTORS) == ['s1', 'google', 'selector1', 'k1']
+
+
+def test_load_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / 'stats.json'
+    path.write_text('{"format": "other"}', encoding='utf-8')
+    with pytest.raises(SelectorStatsError):
+        SelectorStats.load(path)
+    path.write_text('not json', encoding='utf-8')
+    with pytest.raises(SelectorStatsError):
+        SelectorStats.load(path)
+
+
+def test_cli_dkim_stats_persisted_across_runs(tmp_path: Path) -> None:
+    path = tmp_path / 'stats.json'
+
+    def record(name: str, *_: object, **__: object) -> str | None:
+        return 'v=DKIM1; p=abc' if name.startswith('k1.') else None
+
+    argv = ['user@example.com', '--no-mx', '--no-spf', '--no-dmarc', '--no-ssl', '--dkim-stats', str(path)]
+    with patch('src.dkim.get_domain_policy_record', side_effect=record) as lookup:
+        main(argv)
+        first_run = lookup.call_count
+        lookup.reset_mock()
+        main(argv)
+    assert SelectorStats.load(path).hits() == {'k1': 2}
+    assert lookup.call_count == 1 < first_run
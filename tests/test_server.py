@@ -0,0 +1,244 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from src.cache import DomainReportCache
+from src.exceptions import RequestError
+from src.models import (
+    DKIMVerificationReport,
+    DMARCVerificationReport,
+    EmailDomainValidationResult,
+    MXVerificationReport,
+    SPFVerificationReport,
+    SSLVerificationReport,
+    ValidationOptions,
+)
+from src.server import ValidationServer, _parse_item, _parse_options
+
+_MOCK_TARGET = 'src.server.validate_email_and_domain'
+
+
+def _fake_validate(email: str, options: ValidationOptions | None = None) -> EmailDomainValidationResult:
+    domain = email.split('@')[-1]
+    return EmailDomainValidationResult(
+        email_valid='@' in email,
+        normalized_email=email if '@' in email else None,
+        domain=domain,
+        mx=MXVerificationReport(valid=bool(options and options.run_mx), records=None),
+        spf=SPFVerificationReport(valid=False, info=None),
+        dmarc=DMARCVerificationReport(valid=False, record=None),
+        dkim=DKIMVerificationReport(valid=False, record=None),
+        ssl=SSLVerificationReport(valid=False, info=None),
+    )
+
+
+async def _request(port: int, payloads: list[bytes]) -> list[tuple[int, dict[str, str], bytes]]:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    for payload in payloads:
+        writer.write(payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) != b'\r\n':
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while (size := int((await reader.readline()).strip(), 16)) > 0:
+                body += await reader.readexactly(size)
+                await reader.readline()
+            await reader.readline()
+        else:
+            body = await reader.readexactly(int(headers['content-length']))
+        responses.append((int(status_line.split()[1]), headers, body))
+    writer.close()
+    return responses
+
+
+def _post(path: str, body: bytes, connection: str = 'keep-alive') -> bytes:
+    head = f'POST {path} HTTP/1.1\r\nHost: x\r\nConnection: {connection}\r\nContent-Length: {len(body)}\r\n\r\n'
+    return head.encode() + body
+
+
+def _serve(client: Callable[[int], Awaitable[Any]]) -> Any:
+    async def scenario() -> Any:
+        server = ValidationServer(port=0, workers=2, queue_size=2)
+        await server.start()
+        try:
+            return await client(server.port)
+        finally:
+            await server.close()
+
+    with patch(_MOCK_TARGET, side_effect=_fake_validate):
+        return asyncio.run(scenario())
+
+
+def _run(payloads: list[bytes]) -> list[tuple[int, dict[str, str], bytes]]:
+    responses: list[tuple[int, dict[str, str], bytes]] = _serve(partial(_request, payloads=payloads))
+    return responses
+
+
+class TestParseOptions:
+    def test_defaults_and_resolver_from_base(self) -> None:
+        base = ValidationOptions(timeout=7, resolver=None)
+        opts = _parse_options(None, base)
+        assert opts.timeout == 7
+        assert opts.run_ssl is True
+
+    def test_overrides(self) -> None:
+        opts = _parse_options({'run_dkim': False, 'timeout': 2}, ValidationOptions())
+        assert opts.run_dkim is False
+        assert opts.timeout == 2
+
+    def test_unknown_option_rejected(self) -> None:
+        with pytest.raises(RequestError) as exc:
+            _parse_options({'resolver': '8.8.8.8'}, ValidationOptions())
+        assert exc.value.status == 400
+
+    def test_bool_not_accepted_as_int(self) -> None:
+        with pytest.raises(RequestError):
+            _parse_options({'timeout': True}, ValidationOptions())
+
+    def test_policy_by_name(self) -> None:
+        assert _parse_options({'policy': 'tiered'}, ValidationOptions()).policy == 'tiered'
+        with pytest.raises(RequestError):
+            _parse_options({'policy': 'nope'}, ValidationOptions())
+
+    def test_domain_cache_shared_unless_reports_differ(self) -> None:
+        base = ValidationOptions(domain_cache=DomainReportCache())
+        assert _parse_options({'run_ssl': False, 'policy': 'tiered'}, base).domain_cache is base.domain_cache
+        assert _parse_options({'timeout': base.timeout}, base).domain_cache is base.domain_cache
+        assert _parse_options({'timeout': 9}, base).domain_cache is None
+        assert _parse_options({'dkim_narrow_selectors': True}, base).domain_cache is None
+
+    def test_item_requires_email(self) -> None:
+        with pytest.raises(RequestError):
+            _parse_item(b'{"options": {}}', ValidationOptions())
+        with pytest.raises(RequestError):
+            _parse_item(b'not json', ValidationOptions())
+
+
+class TestServer:
+    def test_validate_with_keep_alive(self) -> None:
+        responses = _run(
+            [
+                _post('/validate', b'{"email": "a@example.com"}'),
+                _post('/validate', b'{"email": "b@example.org", "options": {"run_mx": false}}', 'close'),
+            ]
+        )
+        assert [status for status, _, _ in responses] == [200, 200]
+        assert responses[0][1]['connection'] == 'keep-alive'
+        first, second = (json.loads(body) for _, _, body in responses)
+        assert first['domain'] == 'example.com'
+        assert first['mx']['valid'] is True
+        assert second['domain'] == 'example.org'
+        assert second['mx']['valid'] is False
+
+    def test_batch_streams_ndjson_in_order(self) -> None:
+        lines = [json.dumps({'email': f'user{i}@d{i}.com'}).encode() for i in range(6)]
+        body = b'\n'.join(lines[:3] + [b'{broken'] + lines[3:])
+        ((status, headers, payload),) = _run([_post('/batch', body, 'close')])
+        assert status == 200
+        assert headers['content-type'] == 'application/x-ndjson'
+        out = [json.loads(line) for line in payload.splitlines()]
+        assert [item.get('domain') for item in out] == [
+            'd0.com',
+            'd1.com',
+            'd2.com',
+            None,
+            'd3.com',
+            'd4.com',
+            'd5.com',
+        ]
+        assert out[3] == {'error': 'Body must be valid JSON'}
+
+    def test_batch_answers_before_body_is_complete(self) -> None:
+        first, second = (json.dumps({'email': f'user@d{i}.com'}).encode() + b'\n' for i in range(2))
+
+        async def scenario(port: int) -> list[bytes]:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            head = f'POST /batch HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(first) + len(second)}\r\n\r\n'
+            writer.write(head.encode() + first)
+            while await reader.readline() != b'\r\n':
+                pass
+            # The first result arrives while the rest of the body is still unsent.
+            await reader.readline()
+            streamed = await reader.readline()
+            writer.write(second)
+            rest = await reader.read()
+            writer.close()
+            return [streamed, rest]
+
+        streamed, rest = _serve(scenario)
+        assert json.loads(streamed)['domain'] == 'd0.com'
+        assert b'"d1.com"' in rest
+        assert rest.endswith(b'0\r\n\r\n')
+
+    def test_batch_http10_is_not_chunked(self) -> None:
+        body = b'{"email": "a@example.com"}\n{"email": "b@example.org"}'
+
+        async def scenario(port: int) -> bytes:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'POST /batch HTTP/1.0\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+            response = await reader.read()
+            writer.close()
+            return response
+
+        head, _, payload = _serve(scenario).partition(b'\r\n\r\n')
+        assert b'Transfer-Encoding' not in head
+        assert b'Connection: close' in head
+        assert [json.loads(line)['domain'] for line in payload.splitlines()] == ['example.com', 'example.org']
+
+    def test_unread_body_skipped_on_keep_alive(self) -> None:
+        responses = _run([_post('/nope', b'{"email": "a@example.com"}'), _post('/validate', b'{"email": "b@x.org"}')])
+        assert [status for status, _, _ in responses] == [404, 200]
+
+    def test_requests_share_domain_reports(self) -> None:
+        only_dmarc = {'run_mx': False, 'run_spf': False, 'run_dkim': False, 'run_ssl': False}
+        lines = [json.dumps({'email': f'{local}@example.com', 'options': only_dmarc}).encode() for local in 'abc']
+
+        async def scenario() -> list[tuple[int, dict[str, str], bytes]]:
+            server = ValidationServer(port=0, workers=2, queue_size=2)
+            await server.start()
+            try:
+                return await _request(
+                    server.port, [_post('/validate', lines[0]), _post('/batch', b'\n'.join(lines[1:]), 'close')]
+                )
+            finally:
+                await server.close()
+
+        report = DMARCVerificationReport(valid=True, record='v=DMARC1; p=none')
+        with patch('src.dmarc.extract_dmarc_record_info', return_value=report) as mock_dmarc:
+            responses = asyncio.run(scenario())
+        assert [status for status, _, _ in responses] == [200, 200]
+        assert [json.loads(line)['dmarc']['valid'] for line in responses[1][2].splitlines()] == [True, True]
+        mock_dmarc.assert_called_once()
+
+    def test_errors(self) -> None:
+        responses = _run(
+            [
+                _post('/nope', b''),
+                b'GET /validate HTTP/1.1\r\nContent-Length: 0\r\n\r\n',
+                _post('/validate', b'{"email": 1}', 'close'),
+            ]
+        )
+        assert [status for status, _, _ in responses] == [404, 405, 400]
+
+    def test_metrics_endpoint(self) -> None:
+        responses = _run(
+            [
+                b'GET /metrics HTTP/1.1\r\nContent-Length: 0\r\n\r\n',
+                _post('/metrics', b'', 'close'),
+            ]
+        )
+        (status, headers, body), (post_status, _, _) = responses
+        assert status == 200
+        assert headers['content-type'].startswith('text/plain; version=0.0.4')
+        assert '# TYPE email_domain_validator_check_duration_seconds histogram' in body.decode()
+        assert post_status == 405
@@ -7,6 +7,8 @@ import pytest
 from cryptography import x509
 from cryptography.x509.extensions import ExtensionNotFound
 
+from src.instrumentation import Probe, ValidationHooks, collect_stats, probing
+from src.models import CheckStats
 from src.ssl_ import (
     _get_cert,
     _get_cert_info,
@@ -208,6 +210,59 @@ class TestGetCert:
         mock_sock.settimeout.assert_called_once_with(5)
         mock_sock.connect.assert_called_once_with(('example.com', 443))
 
+    @patch('src.ssl_.socket.gethostbyname', return_value='1.2.3.4')
+    @patch('src.ssl_.x509.load_der_x509_certificate')
+    @patch('src.ssl_.ssl.create_default_context')
+    @patch('src.ssl_.socket.socket')
+    def test_stats_collected(
+        self, mock_socket_cls: MagicMock, mock_ctx_fn: MagicMock, _mock_load_cert: MagicMock, _mock_resolve: MagicMock
+    ) -> None:
+        mock_sock, _mock_ssl_sock, mock_context = self._setup_socket_mocks(b'\x30\x03abc')
+        mock_socket_cls.return_value = mock_sock
+        mock_ctx_fn.return_value = mock_context
+        with collect_stats(CheckStats()) as stats:
+            _get_cert('example.com', 5)
+        assert stats.bytes_received == 5
+        assert stats.dns_queries == 2
+        assert stats.timeouts == 0
+
+    @patch('src.ssl_.socket.gethostbyname', return_value='1.2.3.4')
+    @patch('src.ssl_.x509.load_der_x509_certificate')
+    @patch('src.ssl_.ssl.create_default_context')
+    @patch('src.ssl_.socket.socket')
+    def test_hooks_receive_tls_event(
+        self, mock_socket_cls: MagicMock, mock_ctx_fn: MagicMock, _mock_load_cert: MagicMock, _mock_resolve: MagicMock
+    ) -> None:
+        mock_sock, mock_ssl_sock, mock_context = self._setup_socket_mocks(b'\x30\x00')
+        mock_ssl_sock.getpeername.return_value = ('93.184.216.34', 443)
+        mock_ssl_sock.version.return_value = 'TLSv1.3'
+        mock_socket_cls.return_value = mock_sock
+        mock_ctx_fn.return_value = mock_context
+        hooks = MagicMock(spec=ValidationHooks)
+        with probing(Probe(check='ssl', hooks=hooks)):
+            _get_cert('example.com', 5)
+        event = hooks.on_tls_probe.call_args.args[0]
+        assert (event.check, event.host, event.ip, event.port) == ('ssl', 'example.com', '93.184.216.34', 443)
+        assert (event.tls_version, event.outcome) == ('TLSv1.3', 'ok')
+        assert event.duration_ms >= event.connect_ms + event.handshake_ms
+        assert event.handshake_ms >= 0
+
+    @patch('src.ssl_.socket.socket')
+    def test_hooks_receive_connect_timeout(self, mock_socket_cls: MagicMock) -> None:
+        mock_socket_cls.return_value.connect.side_effect = TimeoutError()
+        hooks = MagicMock(spec=ValidationHooks)
+        with probing(Probe(check='ssl', hooks=hooks)), pytest.raises(TimeoutError):
+            _get_cert('slow.com', 1)
+        event = hooks.on_tls_probe.call_args.args[0]
+        assert (event.ip, event.tls_version, event.outcome) == (None, None, 'timeout')
+
+    @patch('src.ssl_.socket.socket')
+    def test_connect_timeout_counted(self, mock_socket_cls: MagicMock) -> None:
+        mock_socket_cls.return_value.connect.side_effect = TimeoutError()
+        with collect_stats(CheckStats()) as stats, pytest.raises(TimeoutError):
+            _get_cert('slow.com', 1)
+        assert stats.timeouts == 1
+
     @patch('src.ssl_.ssl.create_default_context')
     @patch('src.ssl_.socket.socket')
     def test_all_tls_versions_fail(self, mock_socket_cls: MagicMock, mock_ctx_fn: MagicMock) -> None:
@@ -1,10 +1,18 @@
-from unittest.mock import MagicMock
+import time
+from unittest.mock import MagicMock, patch
 
+import dns.message
+import dns.name
 import dns.resolver
+import dns.rrset
 import pytest
+from dns.rdataclass import RdataClass
+from dns.rdatatype import RdataType
 
-from src.exceptions import DomainPolicyError
-from src.utils import _is_policy_version_valid, get_domain_policy_record
+from src.exceptions import DomainPolicyError, DomainPolicyLookupError
+from src.instrumentation import Probe, ValidationHooks, collect_stats, probing
+from src.models import CheckStats
+from src.utils import _is_policy_version_valid, get_domain_policy_record, parse_tag_list, resolve_record
 
 
 def test_is_policy_version_valid() -> None:
@@ -50,7 +58,7 @@ def test_get_domain_policy_record_lifetime_timeout(monkeypatch: pytest.MonkeyPat
         raise dns.resolver.LifetimeTimeout(timeout=5.0, errors=[])
 
     monkeypatch.setattr(dns.resolver.Resolver, 'resolve', raise_timeout)
-    with pytest.raises(DomainPolicyError):
+    with pytest.raises(DomainPolicyLookupError):
         get_domain_policy_record('example.com', 'v=spf1', resolver=dns.resolver.Resolver(), timeout=1)
 
 
@@ -59,7 +67,7 @@ def test_get_domain_policy_record_no_nameservers(monkeypatch: pytest.MonkeyPatch
         raise dns.resolver.NoNameservers()
 
     monkeypatch.setattr(dns.resolver.Resolver, 'resolve', raise_no_nameservers)
-    with pytest.raises(DomainPolicyError):
+    with pytest.raises(DomainPolicyLookupError):
         get_domain_policy_record('example.com', 'v=spf1', resolver=dns.resolver.Resolver(), timeout=1)
 
 
@@ -99,3 +107,123 @@ def test_get_domain_policy_record_matching_marker_multiple_records() -> None:
     mock_resolver.resolve.return_value = mock_answer
     result = get_domain_policy_record('example.com', 'v=spf1', resolver=mock_resolver, timeout=1)
     assert result == 'v=spf1 include:_spf.google.com'
+
+
+def test_resolve_record_without_stats_passes_through() -> None:
+    mock_resolver = MagicMock()
+    assert resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3) is mock_resolver.resolve.return_value
+    mock_resolver.resolve.assert_called_once_with(qname='example.com', rdtype=RdataType.TXT, lifetime=3)
+
+
+def test_resolve_record_counts_queries_and_cache_hits() -> None:
+    mock_resolver = MagicMock()
+    mock_resolver.cache = dns.resolver.LRUCache()
+    mock_resolver.resolve.return_value.response.to_wire.return_value = b'x' * 42
+    mock_resolver.resolve.return_value.expiration = time.time() + 300
+    with collect_stats(CheckStats()) as stats:
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+        mock_resolver.cache.put(
+            (dns.name.from_text('example.com'), RdataType.TXT, RdataClass.IN), mock_resolver.resolve.return_value
+        )
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+    assert stats.dns_queries == 1
+    assert stats.cache_hits == 1
+    assert stats.bytes_received == 42
+    assert stats.wall_time_ms >= 0
+
+
+def test_resolve_record_counts_timeouts() -> None:
+    mock_resolver = MagicMock()
+    mock_resolver.resolve.side_effect = dns.resolver.LifetimeTimeout(timeout=1.0, errors=[])
+    with collect_stats(CheckStats()) as stats:
+        with pytest.raises(DomainPolicyError):
+            get_domain_policy_record('example.com', 'v=spf1', resolver=mock_resolver, timeout=1)
+    assert stats.timeouts == 1
+    assert stats.dns_queries == 1
+
+
+def test_resolve_record_reports_event_to_hooks() -> None:
+    hooks = MagicMock(spec=ValidationHooks)
+    mock_resolver = MagicMock()
+    mock_resolver.resolve.return_value.nameserver = '192.0.2.53'
+    mock_resolver.resolve.return_value.expiration = time.time() + 300
+    with probing(Probe(check='spf', hooks=hooks)):
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+    event = hooks.on_dns_query.call_args.args[0]
+    assert (event.check, event.name, event.rdtype) == ('spf', 'example.com', 'TXT')
+    assert (event.upstream, event.ttl, event.outcome, event.cached) == ('192.0.2.53', 300, 'ok', False)
+    assert event.duration_ms >= 0
+
+
+def test_resolve_record_reports_failure_outcome() -> None:
+    hooks = MagicMock(spec=ValidationHooks)
+    mock_resolver = MagicMock()
+    mock_resolver.resolve.side_effect = dns.resolver.NXDOMAIN()
+    with probing(Probe(check='dmarc', hooks=hooks)), pytest.raises(dns.resolver.NXDOMAIN):
+        resolve_record(mock_resolver, '_dmarc.example.com', RdataType.TXT, 3)
+    event = hooks.on_dns_query.call_args.args[0]
+    assert (event.outcome, event.upstream, event.ttl) == ('nxdomain', None, None)
+
+
+def test_resolve_record_reports_remaining_ttl_of_cached_answers() -> None:
+    hooks = MagicMock(spec=ValidationHooks)
+    mock_resolver = MagicMock()
+    mock_resolver.cache = dns.resolver.LRUCache()
+    answer = mock_resolver.resolve.return_value
+    # The cache itself expires entries by the real clock; only the TTL computation sees the advanced one.
+    start = time.time()
+    answer.expiration = start + 300
+    with probing(Probe(check='spf', hooks=hooks)), patch('src.utils.time', return_value=start) as now:
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+        mock_resolver.cache.put((dns.name.from_text('example.com'), RdataType.TXT, RdataClass.IN), answer)
+        now.return_value = start + 120
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+        now.return_value = start + 400
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+    events = [call.args[0] for call in hooks.on_dns_query.call_args_list]
+    assert [(event.ttl, event.cached) for event in events] == [(300, False), (180, True), (0, True)]
+
+
+def test_bare_probe_skips_cache_check() -> None:
+    mock_resolver = MagicMock()
+    mock_resolver.resolve.return_value.expiration = time.time() + 300
+    with probing(Probe(check='spf')) as probe, patch('src.utils._is_cached') as is_cached:
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+    is_cached.assert_not_called()
+    assert probe.ttl is not None and 0 < probe.ttl <= 300
+
+
+def _negative_response(name: str, soa_ttl: int, minimum: int) -> dns.message.Message:
+    response = dns.message.make_response(dns.message.make_query(name, RdataType.TXT))
+    soa = f'ns1.example.com. hostmaster.example.com. 1 7200 3600 1209600 {minimum}'
+    response.authority.append(dns.rrset.from_text('example.com.', soa_ttl, 'IN', 'SOA', soa))
+    return response
+
+
+def test_resolve_record_keeps_lowest_ttl_including_negative_answers() -> None:
+    hooks = MagicMock(spec=ValidationHooks)
+    mock_resolver = MagicMock()
+    mock_resolver.resolve.return_value.expiration = time.time() + 300
+    qname = dns.name.from_text('_dmarc.example.com')
+    missing = dns.resolver.NXDOMAIN(
+        qnames=[qname], responses={qname: _negative_response('_dmarc.example.com', 900, 600)}
+    )
+    with probing(Probe(check='spf', hooks=hooks)) as probe:
+        resolve_record(mock_resolver, 'example.com', RdataType.TXT, 3)
+        mock_resolver.resolve.side_effect = missing
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            resolve_record(mock_resolver, '_dmarc.example.com', RdataType.TXT, 3)
+        assert probe.ttl == 300
+        mock_resolver.resolve.side_effect = dns.resolver.NoAnswer(response=_negative_response('example.com', 60, 3600))
+        with pytest.raises(dns.resolver.NoAnswer):
+            resolve_record(mock_resolver, 'example.com', RdataType.MX, 3)
+    assert [call.args[0].ttl for call in hooks.on_dns_query.call_args_list] == [300, 600, 60]
+    assert probe.ttl == 60
+
+
+def test_parse_tag_list() -> None:
+    assert parse_tag_list('v=DMARC1;  P = reject ; rua=mailto:a@example.com;p=none; junk;') == {
+        'v': 'DMARC1',
+        'p': 'reject',
+        'rua': 'mailto:a@example.com',
+    }